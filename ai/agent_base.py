@@ -0,0 +1,130 @@
+# Fichier : ai/agent_base.py
+# Base commune des agents locaux (mode algorithmique et Ollama) : suspicion, état
+# sauvegardé et messages tirés des templates
+# Note : Commentaires en anglais pour uniformité avec ai/rules.py.
+
+from __future__ import annotations
+import random
+from dataclasses import dataclass
+from typing import List, Mapping, Optional
+
+from ai.rules import PublicState, choose_action_for_villager, choose_action_for_wolf, pick_target_weighted
+from ai.suspicion import MessageAnalysis, SuspicionRow, SuspicionScanner
+from ai.templates import TemplateBank, TemplateIndex
+
+# Data class for agent configuration
+@dataclass
+class AgentConfig:
+    name: str
+    role: str  # "villageois" | "loup"
+    personality: str = "neutre"  # pour plus tard
+
+
+# State and behaviour shared by the local agents; each mode adds how it speaks
+class BaseAgent:
+    # Initializes the agent with configuration, templates, and optional seed
+    def __init__(self, cfg: AgentConfig, templates: dict, seed: Optional[int] = None,
+                 suspicion: Optional[SuspicionRow] = None, template_bank: Optional[TemplateBank] = None):
+        self.name = cfg.name
+        self.role = cfg.role
+        self.personality = cfg.personality
+        self.rng = random.Random(seed)
+
+        self.templates = templates
+
+        # Indexed template bank, shared with the engine when provided
+        self.template_bank = template_bank or TemplateBank(TemplateIndex(templates))
+
+        # Suspicion levels towards other players: a row of the engine's shared
+        # matrix when provided (updated as messages are published), else a local dict
+        self.suspicion: Mapping[str, float] = suspicion if suspicion is not None else {}
+        self._shared_suspicion = suspicion is not None
+
+        # Scanner used only when the engine does not provide cached analyses
+        self._scanner: Optional[SuspicionScanner] = None
+
+        # Number of public messages already observed (each one is analysed once)
+        self._history_cursor = 0
+
+    # Update suspicion based on the messages published since the last call
+    def observe_public(self, state: PublicState):
+        # the engine already folded every published message into the matrix
+        if self._shared_suspicion:
+            self._history_cursor = len(state.chat_history)
+            return
+
+        # init suspicion keys
+        for n in state.alive_names:
+            if n != self.name and n not in self.suspicion:
+                self.suspicion[n] = 0.0
+
+        # analyse each new message exactly once
+        for analysis in self._new_analyses(state):
+            speaker = analysis.speaker
+
+            # speaker suspicion increase if they use suspect words
+            if speaker != self.name and analysis.has_keyword:
+                self._bump(speaker, 0.15)
+
+            # mentions of other players increase their suspicion
+            for target in analysis.mentions:
+                if target in self.suspicion:
+                    self._bump(target, 0.10)
+
+        self._history_cursor = len(state.chat_history)
+
+    # Agent state as plain data (saved games); a shared suspicion row is saved by the engine
+    def snapshot_state(self) -> dict:
+        return {
+            "rng": self.rng.getstate(),
+            "history_cursor": self._history_cursor,
+            "suspicion": None if self._shared_suspicion else dict(self.suspicion),
+        }
+
+    def restore_state(self, state: dict) -> None:
+        self.rng.setstate(state["rng"])
+        self._history_cursor = state["history_cursor"]
+        if state["suspicion"] is not None and not self._shared_suspicion:
+            self.suspicion = dict(state["suspicion"])
+
+    # Increase suspicion towards a player, clamped between 0.0 and 5.0
+    def _bump(self, name: str, amount: float):
+        self.suspicion[name] = max(0.0, min(5.0, self.suspicion.get(name, 0.0) + amount))
+
+    # Analyses of the messages not observed yet: cached ones from the engine,
+    # or a local scan as a fallback (e.g. when the agent is driven without an engine)
+    def _new_analyses(self, state: PublicState) -> List[MessageAnalysis]:
+        start = self._history_cursor
+        if len(state.analyses) == len(state.chat_history):
+            return state.analyses[start:]
+
+        names = set(state.alive_names) | set(self.suspicion)
+        if self._scanner is None or set(self._scanner.names) != names:
+            self._scanner = SuspicionScanner(names)
+        return [self._scanner.analyse(speaker, text) for speaker, text in state.chat_history[start:]]
+
+    # Message drawn from the templates: an action from the suspicion levels, then a target
+    def _generate_from_templates(self, candidates: List[str]) -> str:
+        if self.role == "villageois":
+            action = choose_action_for_villager(self.rng, self.suspicion)
+            section = "villageois"
+        else:
+            action = choose_action_for_wolf(self.rng, self.suspicion)
+            section = "loup"
+        category = f"{section}.{action}"
+        if not self.template_bank.index.has(category):
+            category = f"{section}.hedge"
+
+        # choose target based on action type (random or weighted suspicion)
+        if action in ("hedge",):
+            target = self.rng.choice(candidates)
+        else:
+            target = pick_target_weighted(self.rng, self.suspicion, candidates) or self.rng.choice(candidates)
+
+        # pick a template without recent repetition and embellish the message
+        return self.template_bank.render(category, self.rng, target=target)
+
+    # Choose a night victim if the agent is a wolf
+    def choose_night_victim(self, alive_names: List[str]) -> Optional[str]:
+        candidates = [n for n in alive_names if n != self.name]
+        return self.rng.choice(candidates) if candidates else None
@@ -5,73 +5,52 @@
 # main par l'humain, mais l'IA ajoute des optimisations et des suggestions.
 
 from __future__ import annotations
-import json
-import random
 import asyncio
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import List, Optional
 
-from ai.rules import PublicState, choose_action_for_villager, choose_action_for_wolf, pick_target_weighted
+from ai.agent_base import AgentConfig, BaseAgent  # AgentConfig kept importable from here
+from ai.rules import PublicState
+from ai.suspicion import SuspicionRow
+from ai.templates import TemplateBank, load_template_index
 from ai.ollama_client import OllamaClient
 from config import load_ollama_config
 
-# Data class for agent configuration
-@dataclass
-class AgentConfig:
-    name: str
-    role: str  # "villageois" | "loup"
-    personality: str = "neutre"  # pour plus tard
 
-
-# Main AI agent class
-class Agent:
+# Main AI agent class: messages written by Ollama, templates as a fallback
+class Agent(BaseAgent):
     # Initializes the agent with configuration, templates, and optional seed
-    def __init__(self, cfg: AgentConfig, templates: dict, seed: Optional[int] = None):
-        self.name = cfg.name
-        self.role = cfg.role
-        self.personality = cfg.personality
-        self.rng = random.Random(seed)
-
-        self.templates = templates
-
-        # Suspicion levels towards other players
-        self.suspicion: Dict[str, float] = {}
+    def __init__(self, cfg: AgentConfig, templates: dict, seed: Optional[int] = None,
+                 suspicion: Optional[SuspicionRow] = None, template_bank: Optional[TemplateBank] = None):
+        super().__init__(cfg, templates, seed, suspicion, template_bank)
+
+        # Ollama conversation state: token context returned by the last generation
+        # and the number of public messages already sent in it
+        self._ollama_context: Optional[List[int]] = None
+        self._ollama_cursor = 0
         
         # Initialize Ollama client for LLM generation
         try:
             ollama_config = load_ollama_config()
             self.ollama_client = OllamaClient(ollama_config)
             self.ollama_model = ollama_config.model
+            self.ollama_context_budget = ollama_config.context_budget
             self.use_ollama = True
         except Exception as e:
             print(f"⚠️  Ollama not available for {self.name}: {e}")
             self.ollama_client = None
             self.use_ollama = False
 
-    # Update suspicion based on public state
-    def observe_public(self, state: PublicState):
-        # init suspicion keys
-        for n in state.alive_names:
-            if n != self.name and n not in self.suspicion:
-                self.suspicion[n] = 0.0
-
-        # analyse recent messages (last 6 messages)
-        recent = state.chat_history[-6:]
-        for speaker, text in recent:
-            low = text.lower()
-
-            # speaker suspicion increase if they use suspect words
-            if speaker != self.name and any(k in low for k in ["suspect", "louche", "cache", "bizarre"]):
-                self.suspicion[speaker] = self.suspicion.get(speaker, 0.0) + 0.15
-
-            # mentions of other players increase their suspicion
-            for target in list(self.suspicion.keys()):
-                if target in text:
-                    self.suspicion[target] = self.suspicion.get(target, 0.0) + 0.10
+    # Agent state as plain data (saved games), with the Ollama conversation
+    def snapshot_state(self) -> dict:
+        state = super().snapshot_state()
+        state["ollama_context"] = self._ollama_context
+        state["ollama_cursor"] = self._ollama_cursor
+        return state
 
-        # clamp suspicion values between 0.0 and 5.0
-        for k in list(self.suspicion.keys()):
-            self.suspicion[k] = max(0.0, min(5.0, self.suspicion[k]))
+    def restore_state(self, state: dict) -> None:
+        super().restore_state(state)
+        self._ollama_context = state["ollama_context"]
+        self._ollama_cursor = state["ollama_cursor"]
 
     # Decide on a message to send based on the public state
     def decide_message(self, state: PublicState) -> str:
@@ -80,15 +59,14 @@ class Agent:
         if not candidates:
             return "…"
 
-        # Try Ollama first - re-check availability each time
+        # Try Ollama first, unless the service monitor last saw it down (its cached
+        # status is read here: no network check on the turn)
         if self.use_ollama and self.ollama_client:
             try:
-                # Double-check Ollama is still available
-                from ai.ollama_client import check_ollama_availability
-                is_available, _ = check_ollama_availability()
-                if not is_available:
-                    print(f"⚠️  Ollama is no longer available for {self.name}")
-                    self.use_ollama = False  # Disable for this session
+                from game.service_monitor import get_service_monitor
+                status = get_service_monitor().status("ollama")
+                if status is not None and not status.available:
+                    print(f"⚠️  Ollama is not available for {self.name}: {status.message}")
                     return self._generate_from_templates(candidates)
                 
                 message = self._generate_with_ollama(state, candidates)
@@ -102,57 +80,32 @@ class Agent:
         return self._generate_from_templates(candidates)
     
     def _generate_with_ollama(self, state: PublicState, candidates: List[str]) -> Optional[str]:
-        """Generate message using Ollama LLM."""
-        # Build context for the LLM (shorter for faster generation)
-        recent_messages = "\n".join([f"{speaker}: {text}" for speaker, text in state.chat_history[-3:]])
-        
-        suspicion_info = "\n".join([
-            f"- {name}: {sus:.1f}/5"
-            for name, sus in sorted(self.suspicion.items(), key=lambda x: x[1], reverse=True)[:2]
-        ])
-        
-        # Extract accusations against this player from recent messages
-        accusations_against_me = []
-        for speaker, text in state.chat_history[-3:]:
-            if speaker != self.name and self.name.lower() in text.lower():
-                if any(word in text.lower() for word in ["suspect", "louche", "cache", "bizarre", "suspecte", "loup", "mauvais"]):
-                    accusations_against_me.append(f"{speaker}: {text}")
-        
-        accusations_text = "\n".join(accusations_against_me) if accusations_against_me else "(none)"
-        
-        # Build player list with roles (if available)
-        role_map = getattr(state, 'role_map', {})
-        player_list = ", ".join([f"{name} ({role_map.get(name, '?')})" for name in state.alive_names])
-        
-        prompt = f"""Tu es {self.name}, un joueur intelligent de Loup-Garou.
-Ton rôle VÉRITABLE: {self.role}
-Joueurs vivants: {player_list}
-
-Messages récents:
-{recent_messages}
-
-Joueurs que tu suspects (1-5):
-{suspicion_info}
-
-Accusations CONTRE toi:
-{accusations_text}
-
-INSTRUCTIONS:
-- Si tu es LOUP: défends-toi, cible les villageois innocents, sème le doute
-- Si tu es VILLAGEOIS: accuse les loups, analyse les discours, cherche la vérité
-- Réponds en UNE SEULE phrase (max 18 mots)
-- FRANÇAIS UNIQUEMENT, pas de traduction anglaise
-- Sois stratégique et persuasif, pas bête
-
-Réponse:"""
+        """Generate message using Ollama LLM, resuming the agent's previous context."""
+        # Start over when the conversation outgrows the budget (the model would truncate it)
+        if self._ollama_context and len(self._ollama_context) > self.ollama_context_budget:
+            self.reset_ollama_context()
+
+        if self._ollama_context:
+            # The role, rules and earlier messages are already in the context
+            new_messages = [(speaker, text) for speaker, text in state.chat_history[self._ollama_cursor:]
+                            if speaker != self.name]
+            prompt = self._turn_prompt(state, new_messages[-6:], header="Nouveaux messages")
+        else:
+            prompt = self._intro_prompt() + self._turn_prompt(state, state.chat_history[-3:], header="Messages récents")
 
         try:
             response = self.ollama_client.generate(
                 prompt=prompt,
                 model=self.ollama_model,
-                options={"temperature": 0.7, "num_predict": 50}
+                options={"temperature": 0.7, "num_predict": 50},
+                context=self._ollama_context,
             )
-            
+
+            # Keep the returned context (prompt + answer) for the next turn
+            if response is not None:
+                self._ollama_context = response.context
+                self._ollama_cursor = len(state.chat_history)
+
             if response and response.response:
                 message = response.response.strip()
                 
@@ -194,48 +147,71 @@ Réponse:"""
             return None
         except Exception as e:
             print(f"❌ Ollama error: {e}")
+            self.reset_ollama_context()
             return None
-    
-    def _is_mostly_english(self, text: str) -> bool:
-        """Check if text is mostly English (basic heuristic)."""
-        english_words = {"the", "a", "is", "are", "you", "they", "think", "suspect", "that", "but", "and", "or"}
-        words = text.lower().split()
-        english_count = sum(1 for w in words if w in english_words)
-        return english_count > len(words) * 0.5 if words else False
-    
-    def _generate_from_templates(self, candidates: List[str]) -> str:
-        """Generate message using template system (fallback)."""
-        if self.role == "villageois":
-            action = choose_action_for_villager(self.rng, self.suspicion)
-            bank = self.templates["villageois"].get(action, self.templates["villageois"]["hedge"])
-        else:
-            action = choose_action_for_wolf(self.rng, self.suspicion)
-            bank = self.templates["loup"].get(action, self.templates["loup"]["hedge"])
 
-        # choose target based on action type (random or weighted suspicion)
-        if action in ("hedge",):
-            target = self.rng.choice(candidates)
-        else:
-            target = pick_target_weighted(self.rng, self.suspicion, candidates) or self.rng.choice(candidates)
+    # Forget the Ollama conversation: the next prompt restates role and rules
+    def reset_ollama_context(self):
+        self._ollama_context = None
+        self._ollama_cursor = 0
+
+    # Stable part of the prompt, sent once per conversation
+    def _intro_prompt(self) -> str:
+        return f"""Tu es {self.name}, un joueur intelligent de Loup-Garou.
+Ton rôle VÉRITABLE: {self.role}
 
-        # pick a template
-        tpl = self.rng.choice(bank)
+INSTRUCTIONS:
+- Si tu es LOUP: défends-toi, cible les villageois innocents, sème le doute
+- Si tu es VILLAGEOIS: accuse les loups, analyse les discours, cherche la vérité
+- Réponds en UNE SEULE phrase (max 18 mots)
+- FRANÇAIS UNIQUEMENT, pas de traduction anglaise
+- Sois stratégique et persuasif, pas bête
+"""
 
-        # embellish the message
-        common = self.templates.get("common", {})
-        c = self.rng.choice(common.get("connectors", [""]))
-        s = self.rng.choice(common.get("softeners", [""]))
-        end = self.rng.choice(common.get("endings", [""]))
+    # Per-turn part of the prompt: what changed since the agent last spoke
+    def _turn_prompt(self, state: PublicState, messages: List[tuple[str, str]], header: str) -> str:
+        recent_messages = "\n".join([f"{speaker}: {text}" for speaker, text in messages]) or "(aucun)"
 
-        return tpl.format(target=target, c=c, s=s, e=end)
+        suspicion_info = "\n".join([
+            f"- {name}: {sus:.1f}/5"
+            for name, sus in sorted(self.suspicion.items(), key=lambda x: x[1], reverse=True)[:2]
+        ])
 
+        # Extract accusations against this player from the new messages
+        accusations_against_me = []
+        for speaker, text in messages:
+            if speaker != self.name and self.name.lower() in text.lower():
+                if any(word in text.lower() for word in ["suspect", "louche", "cache", "bizarre", "suspecte", "loup", "mauvais"]):
+                    accusations_against_me.append(f"{speaker}: {text}")
 
-    # Choose a night victim if the agent is a wolf
-    def choose_night_victim(self, alive_names: List[str]) -> Optional[str]:
-        candidates = [n for n in alive_names if n != self.name]
-        return self.rng.choice(candidates) if candidates else None
+        accusations_text = "\n".join(accusations_against_me) if accusations_against_me else "(none)"
+
+        # Build player list with roles (if available)
+        role_map = getattr(state, 'role_map', {})
+        player_list = ", ".join([f"{name} ({role_map.get(name, '?')})" for name in state.alive_names])
+
+        return f"""
+Jour {state.day}. Joueurs vivants: {player_list}
+
+{header}:
+{recent_messages}
+
+Joueurs que tu suspects (1-5):
+{suspicion_info}
+
+Accusations CONTRE toi:
+{accusations_text}
+
+Réponds en UNE SEULE phrase (max 18 mots), en français.
+Réponse:"""
+
+    def _is_mostly_english(self, text: str) -> bool:
+        """Check if text is mostly English (basic heuristic)."""
+        english_words = {"the", "a", "is", "are", "you", "they", "think", "suspect", "that", "but", "and", "or"}
+        words = text.lower().split()
+        english_count = sum(1 for w in words if w in english_words)
+        return english_count > len(words) * 0.5 if words else False
 
-# Utility function to load message templates from a JSON file
+# Utility function to load message templates from a JSON file (parsed once)
 def load_templates(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_template_index(path).raw
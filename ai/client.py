@@ -1,23 +1,60 @@
+import time
 from openai import OpenAI
 from dataclasses import dataclass
-import json
+
+from ai.journal import get_journal
+from ai.json_stream import StreamingFieldParser, repair_json_object
+from ai.response_cache import get_response_cache, make_key
+from ai.rate_limit import HedgedCaller, InflightBudget, call_with_retry, limiter_for
+
+# Fields after which a player's answer stream is cut (day / night turns)
+PLAYER_FIELDS = ("action", "reasoning", "dialogue")
+NIGHT_FIELDS = ("action", "reasoning", "dialogue", "cible")
 
 @dataclass
 class OpenRouterClientConfig:
     api_key: str
     base_url: str = "https://openrouter.ai/api/v1"
     model: str = "openai/gpt-oss-20b:free"
+    requests_per_minute: float = 20.0  # quota shared by every client using this key
+    burst: int = 8  # calls allowed at once when the quota is unused
+    max_retries: int = 3  # retries after a 429 or a transient error
+    max_in_flight: int = 8  # requests on the wire at once, hedges included
+    hedge_requests: bool = False  # duplicate slow tail calls, first answer wins (costs quota)
+    hedge_min_delay: float = 2.0  # never hedge a call younger than this (seconds)
+    json_mode: bool = True  # ask for response_format json_object (paused while the model refuses it)
+    json_mode_retry: float = 300.0  # seconds before asking for json mode again after a refusal
 
 
 # Main client class for OpenRouter API interactions
 class OpenRouterClient:
     def __init__(self, config: OpenRouterClientConfig):
+        # Retries are handled below (limiter aware), not by the SDK
         self.client = OpenAI(
             base_url=config.base_url,
             api_key=config.api_key,
+            max_retries=0,
         )
         self.model = config.model
+        self.max_retries = config.max_retries
+        self.json_mode = config.json_mode
+        self.json_mode_retry = config.json_mode_retry
+        self._json_mode_paused_until = 0.0
+
+        # One adaptive limiter per API key, shared by the threads of parallel turns
+        self.limiter = limiter_for(config.api_key, config.requests_per_minute / 60.0, config.burst)
+        self.hedger = HedgedCaller(
+            InflightBudget(config.max_in_flight),
+            self.limiter,
+            min_delay=config.hedge_min_delay,
+            enabled=config.hedge_requests,
+        )
 
+    # One completion call; the rate-limit headers of the answer feed the limiter
+    def _create(self, **params):
+        raw = self.client.chat.completions.with_raw_response.create(model=self.model, **params)
+        self.limiter.learn(raw.headers)
+        return raw.parse()
 
 
     # Method for streaming chat completion using the OpenRouter API
@@ -29,12 +66,16 @@ class OpenRouterClient:
     # - temperature: Sampling temperature for generation
     # - on_chunk: Optional callback function to handle each chunk of text
     def chat_completion_stream(self, messages, max_tokens=512, temperature=0.7, on_chunk=None):
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            stream=True,
-            max_tokens=max_tokens,
-            temperature=temperature,
+        # Streams are not hedged: chunks are forwarded as they arrive
+        response = call_with_retry(
+            lambda: self._create(
+                messages=messages,
+                stream=True,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            ),
+            self.limiter,
+            self.max_retries,
         )
         buffer = ""
         for chunk in response:
@@ -48,21 +89,77 @@ class OpenRouterClient:
 
 
     # Method for chat completion using the OpenRouter API
-    def chat_completion_player(self, messages, max_tokens=512, temperature=0.7) :
-        responseraw = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-
-            temperature=temperature,
-
-        )
-
-        response_text = responseraw.choices[0].message.content
-        if response_text is None:
+    # The answer is streamed and cut as soon as the required fields are complete
+    def chat_completion_player(self, messages, max_tokens=512, temperature=0.7, required_fields=PLAYER_FIELDS) :
+        def call():
+            parser = call_with_retry(
+                lambda: self.hedger.call(
+                    lambda: self._stream_fields(messages, max_tokens, temperature, required_fields)
+                ),
+                self.limiter,
+                self.max_retries,
+            )
+            return {"text": parser.text, "fields": parser.fields}
+
+        # Opt-in response cache (LLM_CACHE), keyed on model, messages and sampling params;
+        # the event journal (GAME_JOURNAL) records each answer under the same key
+        cache = get_response_cache()
+        journal = get_journal()
+        key = None
+        if cache is not None or journal is not None:
+            params = {"max_tokens": max_tokens, "temperature": temperature, "fields": list(required_fields)}
+            key = make_key(self.model, messages, params)
+
+        started = time.monotonic()
+        answer = cache.get_or_call(key, call, temperature) if cache is not None else call()
+        if journal is not None:
+            journal.record("llm", provider="openrouter", model=self.model, key=key, messages=messages,
+                           value=answer, seconds=round(time.monotonic() - started, 3))
+
+        if not answer["text"].strip():
             raise ValueError("Received empty response from the API")
-        formated_response = parse_response(response_text)
+        if "action" in answer["fields"]:
+            return _response_from_data(answer["fields"], answer["text"])
+        formated_response = parse_response(answer["text"])
         return formated_response
 
+    # Streams one answer into an incremental field parser (JSON mode when supported)
+    def _stream_fields(self, messages, max_tokens, temperature, required_fields) -> StreamingFieldParser:
+        params = dict(messages=messages, max_tokens=max_tokens, temperature=temperature, stream=True)
+        if self.json_mode and time.monotonic() >= self._json_mode_paused_until:
+            try:
+                stream = self._create(response_format={"type": "json_object"}, **params)
+            except Exception as e:
+                if not _rejects_json_mode(e):
+                    raise
+                # The model does not support response_format: plain requests for a while
+                self._json_mode_paused_until = time.monotonic() + self.json_mode_retry
+                stream = self._create(**params)
+        else:
+            stream = self._create(**params)
+
+        parser = StreamingFieldParser(required_fields)
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = getattr(chunk.choices[0].delta, "content", None)
+                if content and parser.feed(content):
+                    break  # fields complete: stop paying for the rest
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        return parser
+
+
+# HTTP 400 caused by response_format (other 400s, e.g. a too long context, are not)
+def _rejects_json_mode(exc: Exception) -> bool:
+    if getattr(exc, "status_code", None) != 400:
+        return False
+    text = f"{exc} {getattr(exc, 'body', '')}".lower()
+    return any(word in text for word in ("response_format", "json_object", "json mode", "json_mode"))
+
 
 @dataclass
 class ResponseFormat:
@@ -72,26 +169,23 @@ class ResponseFormat:
     cible:str
 
 def parse_response(response_text: str) -> ResponseFormat:
-    try:
-        ## if formated as markdown : ```json ... ```
-
-
-        if response_text.startswith("```json"):
-            start = response_text.find("{")
-            end = response_text.rfind("}") + 1
-            json_text = response_text[start:end]
-            data = json.loads(json_text)
-        else:
-            data = json.loads(response_text)
-
-
-        dialogue = data["dialogue"] if "dialogue" in data else ""
-        cible = data["cible"] if "cible" in data else ""
-        return ResponseFormat(
-            action=data["action"],
-            reasoning=data["reasoning"],
-            dialogue= dialogue,
-            cible= cible,
-        )
-    except (json.JSONDecodeError, KeyError) as e:
-        raise ValueError(f"Failed to parse response: {e}. Response text: {response_text}")
+    # Fenced, surrounded, truncated or slightly invalid JSON is repaired
+    # instead of costing another round-trip
+    data = repair_json_object(response_text)
+    if data is None:
+        raise ValueError(f"Failed to parse response: no JSON object. Response text: {response_text}")
+    return _response_from_data(data, response_text)
+
+
+def _response_from_data(data: dict, response_text: str) -> ResponseFormat:
+    if "action" not in data:
+        raise ValueError(f"Failed to parse response: 'action' missing. Response text: {response_text}")
+
+    dialogue = data["dialogue"] if "dialogue" in data else ""
+    cible = data["cible"] if "cible" in data else ""
+    return ResponseFormat(
+        action=str(data["action"]),
+        reasoning=str(data.get("reasoning", "")),
+        dialogue=str(dialogue),
+        cible=str(cible) if cible is not None else "",
+    )
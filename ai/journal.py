@@ -0,0 +1,176 @@
+# Fichier : ai/journal.py
+# Journal JSONL en ajout seul des événements de partie et des appels aux LLM, écrit
+# par un thread en arrière-plan
+# Note : Commentaires en anglais pour uniformité avec ai/client.py.
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from config import JournalConfig, load_journal_config
+
+
+# Records are queued by the game threads and written by one writer thread.
+# Producers only append to a deque (no lock, no I/O, no JSON encoding on the
+# game loop). Memory is bounded by `capacity`; when the queue is full the
+# "drop" policy loses the oldest records (counted in a "journal.dropped"
+# record) and the "block" policy makes producers wait for the writer.
+# The file is flushed after each batch, fsynced every `fsync_interval`
+# seconds and rotated beyond `max_bytes`. `digests` asks the engines to
+# journal a digest of their state after each call (for replays)
+class Journal:
+    poll_interval = 0.2
+
+    def __init__(self, path: str, max_bytes: int = 16 * 1024 * 1024, backups: int = 3,
+                 capacity: int = 10000, policy: str = "drop", fsync_interval: float = 2.0,
+                 digests: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.capacity = capacity
+        self.policy = policy
+        self.fsync_interval = fsync_interval
+        self.digests = digests
+
+        self._seq = itertools.count(1)
+        self._queue: deque = deque(maxlen=capacity if policy == "drop" else None)
+        self._slots = threading.Semaphore(capacity) if policy == "block" else None
+        self._dropped = 0
+        self._closed = threading.Event()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+        self._last_fsync = time.monotonic()
+
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    # Queue one record; JSON-serializable fields (anything else is written with str())
+    def record(self, kind: str, **fields: Any) -> None:
+        if self._closed.is_set():
+            return
+        if self._slots is not None:
+            self._slots.acquire()
+        elif len(self._queue) >= self.capacity:
+            self._dropped += 1
+        self._queue.append((next(self._seq), time.time(), kind, fields))
+
+    # Write what is queued, fsync and close the file
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.poll_interval):
+            self._drain()
+        self._drain()
+        self._sync()
+        self._file.close()
+
+    def _drain(self) -> None:
+        lines = []
+        while True:
+            try:
+                seq, stamp, kind, fields = self._queue.popleft()
+            except IndexError:
+                break
+            if self._slots is not None:
+                self._slots.release()
+            lines.append(_encode({"seq": seq, "t": stamp, "kind": kind, **fields}))
+
+        if self._dropped:
+            dropped, self._dropped = self._dropped, 0
+            lines.append(_encode({"seq": next(self._seq), "t": time.time(), "kind": "journal.dropped", "count": dropped}))
+        if not lines:
+            return
+
+        for line in lines:
+            self._file.write(line)
+            self._size += len(line)
+            if self._size >= self.max_bytes:
+                self._rotate()
+        self._file.flush()
+
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    # journal.jsonl -> journal.1.jsonl -> journal.2.jsonl ... (the oldest is removed)
+    def _rotate(self) -> None:
+        self._sync()
+        self._file.close()
+
+        root, ext = os.path.splitext(self.path)
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                older = f"{root}.{i}{ext}"
+                if os.path.exists(older):
+                    os.replace(older, f"{root}.{i + 1}{ext}")
+            os.replace(self.path, f"{root}.1{ext}")
+        else:
+            os.remove(self.path)
+
+        self._file = open(self.path, "ab")
+        self._size = 0
+
+
+def _encode(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+_shared: Optional[Journal] = None
+_shared_loaded = False
+_shared_lock = threading.Lock()
+
+
+# Process-wide journal from GAME_JOURNAL* variables, None when disabled (default)
+def get_journal(config: Optional[JournalConfig] = None) -> Optional[Journal]:
+    global _shared, _shared_loaded
+    if _shared_loaded and config is None:
+        return _shared
+
+    with _shared_lock:
+        if not _shared_loaded or config is not None:
+            if _shared is not None:
+                _shared.close()
+            config = config or load_journal_config()
+            _shared = None if not config.path else Journal(
+                config.path,
+                max_bytes=config.max_bytes,
+                backups=config.backups,
+                capacity=config.capacity,
+                policy=config.policy,
+                fsync_interval=config.fsync_interval,
+                digests=config.digests,
+            )
+            _shared_loaded = True
+        return _shared
+
+
+# Add a record to the process-wide journal, if enabled
+def record(kind: str, **fields: Any) -> None:
+    journal = get_journal()
+    if journal is not None:
+        journal.record(kind, **fields)
+
+
+@atexit.register
+def _close_shared() -> None:
+    if _shared is not None:
+        _shared.close()
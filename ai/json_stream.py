@@ -0,0 +1,246 @@
+# Fichier : ai/json_stream.py
+# Lecture tolérante des réponses JSON des agents : parseur incrémental des champs
+# pendant le streaming et réparation des sorties presque valides
+# Note : Commentaires en anglais pour uniformité avec ai/client.py.
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Dict, Iterable, Optional
+
+# Typographic quotes some models put around keys and values
+_SMART_QUOTES = "“”"
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_FENCE = re.compile(r"```(?:json)?", re.IGNORECASE)
+
+
+# Incremental parser of a top-level JSON object fed chunk by chunk. It records
+# each top-level field as soon as its value is complete, so the caller can stop
+# the stream once the fields it needs are known (no need to wait for the end).
+class StreamingFieldParser:
+    def __init__(self, required: Iterable[str]):
+        self.required = frozenset(required)
+        self.fields: Dict[str, object] = {}
+        self.closed = False  # the top-level object ended
+        self.text = ""  # everything received, for the fallback parse
+
+        self._state = "start"
+        self._depth = 0  # nesting inside a non-string value
+        self._buffer: list[str] = []
+        self._escape = False
+        self._in_nested_string = False
+        self._key: Optional[str] = None
+
+    # True once every required field is complete (or the object is closed)
+    @property
+    def complete(self) -> bool:
+        return self.closed or self.required <= self.fields.keys()
+
+    def feed(self, chunk: str) -> bool:
+        self.text += chunk
+        for ch in chunk:
+            if self.closed:
+                break
+            self._step(ch)
+        return self.complete
+
+    def _step(self, ch: str) -> None:
+        state = self._state
+
+        if state == "start":
+            # anything before the object (code fence, prose) is skipped
+            if ch == "{":
+                self._state = "key_or_end"
+
+        elif state == "key_or_end":
+            if ch == '"':
+                self._buffer = []
+                self._state = "key"
+            elif ch == "}":
+                self.closed = True
+
+        elif state == "key":
+            if self._escape:
+                self._buffer.append(ch)
+                self._escape = False
+            elif ch == "\\":
+                self._buffer.append(ch)
+                self._escape = True
+            elif ch == '"':
+                self._key = _decode_string("".join(self._buffer))
+                self._state = "colon"
+            else:
+                self._buffer.append(ch)
+
+        elif state == "colon":
+            if ch == ":":
+                self._state = "value"
+
+        elif state == "value":
+            if ch.isspace():
+                return
+            self._buffer = []
+            if ch == '"':
+                self._state = "string"
+            else:
+                self._buffer.append(ch)
+                self._depth = 1 if ch in "{[" else 0
+                self._state = "other"
+
+        elif state == "string":
+            if self._escape:
+                self._buffer.append(ch)
+                self._escape = False
+            elif ch == "\\":
+                self._buffer.append(ch)
+                self._escape = True
+            elif ch == '"':
+                self._store(_decode_string("".join(self._buffer)))
+                self._state = "after_value"
+            else:
+                self._buffer.append(ch)
+
+        elif state == "other":
+            self._step_other(ch)
+
+        elif state == "after_value":
+            if ch == ",":
+                self._state = "key_or_end"
+            elif ch == "}":
+                self.closed = True
+
+    # Numbers, literals and nested objects/arrays (strings inside are skipped)
+    def _step_other(self, ch: str) -> None:
+        if self._in_nested_string:
+            self._buffer.append(ch)
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_nested_string = False
+            return
+
+        if self._depth == 0 and ch in ",}":
+            self._store(_decode_other("".join(self._buffer).strip()))
+            if ch == "}":
+                self.closed = True
+            else:
+                self._state = "key_or_end"
+            return
+
+        self._buffer.append(ch)
+        if ch == '"':
+            self._in_nested_string = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self._store(_decode_other("".join(self._buffer)))
+                self._state = "after_value"
+
+    def _store(self, value: object) -> None:
+        if self._key is not None:
+            self.fields[self._key] = value
+        self._key = None
+
+
+def _decode_string(raw: str) -> str:
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return raw.replace('\\"', '"').replace("\\n", "\n")
+
+
+def _decode_other(raw: str) -> object:
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw
+
+
+# Repair pass for near-miss outputs: code fences or prose around the object,
+# typographic quotes used as delimiters, trailing commas, truncated output
+# (unclosed string or braces). Returns None when no object can be recovered.
+def repair_json_object(text: str) -> Optional[dict]:
+    cleaned = _FENCE.sub("", text).strip()
+    start = cleaned.find("{")
+    if start < 0:
+        return None
+    end = cleaned.rfind("}")
+    candidate = cleaned[start:end + 1] if end > start else cleaned[start:]
+
+    # valid JSON is read as it is: typographic quotes inside its strings are text
+    delimited = _ascii_delimiters(candidate)
+    for attempt in (candidate, delimited, _TRAILING_COMMA.sub(r"\1", delimited), _close_truncated(delimited)):
+        try:
+            data = json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+
+    # Last resort: whatever fields the incremental parser can read
+    parser = StreamingFieldParser(())
+    parser.feed(_ascii_delimiters(cleaned[start:]))
+    return parser.fields or None
+
+
+# Replaces the typographic double quotes standing where a JSON delimiter belongs
+# with ASCII quotes. Inside a string they are kept: a string opened by a
+# typographic quote ends at one followed by `:`, `,`, `}`, `]` or the end.
+def _ascii_delimiters(text: str) -> str:
+    out: list[str] = []
+    closer: Optional[str] = None  # quote ending the current string, None outside
+    escape = False
+    for i, ch in enumerate(text):
+        if closer is None:
+            if ch in _SMART_QUOTES:
+                closer, ch = _SMART_QUOTES, '"'
+            elif ch == '"':
+                closer = '"'
+        elif escape:
+            escape = False
+        elif ch == "\\":
+            escape = True
+        elif closer == '"':
+            if ch == '"':
+                closer = None
+        elif ch in _SMART_QUOTES and _ends_string(text, i + 1):
+            closer, ch = None, '"'
+        elif ch == '"':
+            ch = '\\"'
+        out.append(ch)
+    return "".join(out)
+
+
+def _ends_string(text: str, i: int) -> bool:
+    rest = text[i:].lstrip()
+    return not rest or rest[0] in ":,}]"
+
+
+# Closes an unterminated string and the open braces/brackets of a cut output
+def _close_truncated(text: str) -> str:
+    stack: list[str] = []
+    in_string = False
+    escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+
+    repaired = text + ('"' if in_string else "")
+    repaired = _TRAILING_COMMA.sub(r"\1", repaired.rstrip().rstrip(","))
+    return repaired + "".join(reversed(stack))
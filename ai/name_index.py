@@ -0,0 +1,52 @@
+# Fichier : ai/name_index.py
+# Index des noms de joueurs : recherche en O(1) insensible à la casse et aux accents,
+# avec correspondance approchée pour les noms mal orthographiés par les LLM
+# Note : Commentaires en anglais pour uniformité avec ai/rules.py.
+
+from __future__ import annotations
+
+import difflib
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+
+# Lower case, no accents, no markup: "**Gérard** " -> "gerard"
+def normalize_name(raw: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", raw)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    kept = "".join(ch if ch.isalnum() else " " for ch in stripped.casefold())
+    return " ".join(kept.split())
+
+
+# Built once per game from the player names and shared by the roster, the
+# suspicion scanner and the LLM output parsers
+class NameIndex:
+    def __init__(self, names: Iterable[str], cutoff: float = 0.8):
+        self.names: List[str] = list(dict.fromkeys(names))
+        self._exact = frozenset(self.names)
+        self.cutoff = cutoff
+        self._by_key: Dict[str, str] = {}
+        for name in self.names:
+            self._by_key.setdefault(normalize_name(name), name)
+        self._keys = list(self._by_key)
+
+        # fuzzy answers (misses included) are remembered per normalized spelling
+        self._fuzzy_cache: Dict[str, Optional[str]] = {}
+
+    def __contains__(self, raw: str) -> bool:
+        return self.resolve(raw, fuzzy=False) is not None
+
+    # Canonical player name for a spelling found in generated text, or None
+    def resolve(self, raw: str, fuzzy: bool = True) -> Optional[str]:
+        if raw in self._exact:
+            return raw
+
+        key = normalize_name(raw)
+        name = self._by_key.get(key)
+        if name is not None or not fuzzy or not key:
+            return name
+
+        if key not in self._fuzzy_cache:
+            close = difflib.get_close_matches(key, self._keys, n=1, cutoff=self.cutoff)
+            self._fuzzy_cache[key] = self._by_key[close[0]] if close else None
+        return self._fuzzy_cache[key]
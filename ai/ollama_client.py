@@ -3,19 +3,31 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
 from dataclasses import dataclass
 from typing import Any, Optional
 from urllib import error as url_error
 from urllib import request as url_request
 
+from ai.journal import get_journal
+from ai.response_cache import get_response_cache, make_key
 from config import OllamaConfig, load_ollama_config
 
+# Ollama's sampling temperature when the request does not set one
+_OLLAMA_DEFAULT_TEMPERATURE = 0.8
+
 
 @dataclass(frozen=True)
 class OllamaResponse:
     response: str
     raw: dict[str, Any]
 
+    @property
+    def context(self) -> Optional[list[int]]:
+        """Token state of prompt + answer, to pass back to the next generate() call."""
+        return self.raw.get("context")
+
 
 def check_ollama_availability(config: Optional[OllamaConfig] = None) -> tuple[bool, str]:
     """
@@ -25,6 +37,11 @@ def check_ollama_availability(config: Optional[OllamaConfig] = None) -> tuple[bo
         tuple: (is_available: bool, message: str)
     """
     config = config or load_ollama_config()
+
+    # Replay (LLM_CACHE=replay): the answers come from the recording, not from the server
+    cache = get_response_cache()
+    if cache is not None and cache.mode == "replay":
+        return True, "Réponses rejouées"
     
     try:
         # Test connection to Ollama
@@ -66,18 +83,80 @@ class OllamaClient:
     def __init__(self, config: Optional[OllamaConfig] = None):
         self.config = config or load_ollama_config()
 
-    def generate(self, prompt: str, model: Optional[str] = None, options: Optional[dict[str, Any]] = None) -> OllamaResponse:
+    def generate(self, prompt: str, model: Optional[str] = None, options: Optional[dict[str, Any]] = None,
+                 context: Optional[list[int]] = None, format: Optional[Any] = None) -> OllamaResponse:
+        """
+        Generate a completion. With `context` (from a previous response), Ollama
+        resumes from that token state and only evaluates the new prompt tokens.
+        `format` is "json" or a JSON schema the output is constrained to.
+        """
         payload: dict[str, Any] = {
             "model": model or self.config.model,
             "prompt": prompt,
             "stream": False,
+            # every request renews the session keep-alive, so the model stays
+            # loaded between days (released by release() at the end of the game)
+            "keep_alive": self.config.keep_alive,
         }
         if options:
             payload["options"] = options
-
-        data = self._post_json("/api/generate", payload)
+        if context:
+            payload["context"] = context
+        if format is not None:
+            payload["format"] = format
+
+        # Opt-in response cache (LLM_CACHE), keyed on model, prompt, context and options;
+        # the event journal (GAME_JOURNAL) records each answer under the same key
+        cache = get_response_cache()
+        journal = get_journal()
+        key = None
+        if cache is not None or journal is not None:
+            params = {"endpoint": "/api/generate", "options": options or {}, "context": context or []}
+            if format is not None:
+                params["format"] = format
+            key = make_key(payload["model"], prompt, params)
+
+        started = time.monotonic()
+        if cache is not None:
+            temperature = (options or {}).get("temperature", _OLLAMA_DEFAULT_TEMPERATURE)
+            data = cache.get_or_call(key, lambda: self._post_json("/api/generate", payload), temperature)
+        else:
+            data = self._post_json("/api/generate", payload)
+        if journal is not None:
+            journal.record("llm", provider="ollama", model=payload["model"], key=key, prompt=prompt,
+                           value=data, seconds=round(time.monotonic() - started, 3))
         return OllamaResponse(response=data.get("response", ""), raw=data)
 
+    def preload(self, model: Optional[str] = None) -> None:
+        """Load the model in memory (empty prompt) so the first turn does not pay the load time."""
+        self._post_json("/api/generate", {
+            "model": model or self.config.model,
+            "prompt": "",
+            "stream": False,
+            "keep_alive": self.config.keep_alive,
+        })
+
+    def preload_async(self, model: Optional[str] = None) -> threading.Thread:
+        """Run preload() in a daemon thread; failures are ignored (the game reports them later)."""
+        def worker() -> None:
+            try:
+                self.preload(model)
+            except (ConnectionError, ValueError):
+                pass
+
+        thread = threading.Thread(target=worker, name="ollama-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def release(self, model: Optional[str] = None) -> None:
+        """Unload the model now (keep_alive 0) to free VRAM/RAM at the end of the game."""
+        self._post_json("/api/generate", {
+            "model": model or self.config.model,
+            "prompt": "",
+            "stream": False,
+            "keep_alive": 0,
+        })
+
     def list_models(self) -> list[str]:
         data = self._get_json("/api/tags")
         models = data.get("models", [])
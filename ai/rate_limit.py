@@ -0,0 +1,303 @@
+# Fichier : ai/rate_limit.py
+# Contrôle de débit côté client des API LLM en ligne : limitation adaptative par clé,
+# nouvelles tentatives avec gigue, budget de requêtes en vol et requêtes doublées
+# Note : Commentaires en anglais pour uniformité avec ai/client.py.
+
+from __future__ import annotations
+
+import hashlib
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Mapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying (throttling, timeouts, overloaded upstream)
+_TRANSIENT_STATUSES = frozenset((408, 409, 425, 429, 500, 502, 503, 504))
+# openai SDK errors raised without a status code
+_TRANSIENT_ERROR_NAMES = frozenset(("APIConnectionError", "APITimeoutError"))
+
+
+# Raised when a call still gets HTTP 429 after every retry
+class RateLimitExceeded(RuntimeError):
+    pass
+
+
+# Adaptive token bucket shared by every thread using the same API key.
+# Tokens are added at `rate` per second up to `burst`; acquire() blocks until
+# one is available. The rate follows the provider: it is halved on each 429,
+# grows back slowly on success (AIMD) and is synced with the rate-limit
+# headers when the provider sends them
+class RateLimiter:
+    def __init__(self, rate: float, burst: int = 1, min_rate: Optional[float] = None, max_rate: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min_rate if min_rate is not None else rate / 16.0
+        self.max_rate = max_rate if max_rate is not None else rate * 4.0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_s = (1.0 - self._tokens) / self.rate
+            time.sleep(wait_s)
+
+    # Take a token only if one is available right now
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    # Empty the bucket so that no call starts before `delay` seconds
+    def penalize(self, delay: float) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -delay * self.rate)
+
+    # Multiplicative decrease after a 429
+    def on_throttle(self) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2.0)
+
+    # Additive increase after a successful call
+    def on_success(self) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.min_rate / 4.0)
+
+    # Sync with X-RateLimit-Remaining / -Reset headers: the rate becomes what
+    # is left of the provider's window spread over the time until its reset
+    # (within min_rate..max_rate), the bucket never holds more tokens than the
+    # provider has left, and when nothing is left it stays empty until the reset
+    def learn(self, headers: Optional[Mapping[str, str]]) -> None:
+        if not headers:
+            return
+        remaining = _header_number(headers, "x-ratelimit-remaining")
+        reset = _header_number(headers, "x-ratelimit-reset")
+        reset_in = _seconds_until(reset) if reset is not None else None
+
+        with self._lock:
+            self._refill()
+            if remaining is None:
+                return
+            if reset_in is not None and reset_in > 0:
+                self.rate = max(self.min_rate, min(self.max_rate, remaining / reset_in))
+            if remaining <= 0 and reset_in is not None:
+                self._tokens = min(self._tokens, -reset_in * self.rate)
+            else:
+                self._tokens = min(self._tokens, remaining)
+
+
+# Caps the number of requests on the wire at once (hedges included)
+class InflightBudget:
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._sem = threading.BoundedSemaphore(self.limit)
+
+    def acquire(self) -> None:
+        self._sem.acquire()
+
+    def try_acquire(self) -> bool:
+        return self._sem.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._sem.release()
+
+
+# Recent call latencies, used to decide when a call is a slow tail call
+class LatencyTracker:
+    def __init__(self, window: int = 50, quantile: float = 0.95, min_samples: int = 10):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._quantile = quantile
+        self._min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    # Latency quantile of recent calls, None until enough samples
+    def threshold(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self._min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(self._quantile * len(ordered)))]
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+# Return the process-wide limiter of an API key (created on first use)
+def limiter_for(api_key: str, rate: float, burst: int = 1) -> RateLimiter:
+    # only a digest of the key is kept as the registry key
+    digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _limiters_lock:
+        limiter = _limiters.get(digest)
+        if limiter is None:
+            limiter = RateLimiter(rate, burst)
+            _limiters[digest] = limiter
+        return limiter
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        # plain dicts are case-sensitive (httpx headers are not)
+        value = next((v for k, v in headers.items() if k.lower() == name), None)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# Reset header as a delay: epoch milliseconds, epoch seconds or a delay
+def _seconds_until(reset: float) -> float:
+    now = time.time()
+    if reset > 1e12:
+        return reset / 1000.0 - now
+    if reset > 1e9:
+        return reset - now
+    return reset
+
+
+# Retry-After delay (seconds) of an HTTP error, if the server sent one
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not hasattr(headers, "get"):
+        return None
+    return _header_number(headers, "retry-after")
+
+
+# True for HTTP 429 errors (openai.RateLimitError and alike)
+def is_rate_limited(exc: BaseException) -> bool:
+    return getattr(exc, "status_code", None) == 429
+
+
+# True for errors a later attempt may not get (429, 5xx, timeouts, network)
+def is_transient(exc: BaseException) -> bool:
+    if getattr(exc, "status_code", None) in _TRANSIENT_STATUSES:
+        return True
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    return type(exc).__name__ in _TRANSIENT_ERROR_NAMES
+
+
+# Full-jitter exponential backoff: uniform in [0, min(max, base * 2^attempt)]
+def backoff_delay(attempt: int, base_delay: float, max_delay: float, rng: Optional[random.Random] = None) -> float:
+    return (rng or random).uniform(0.0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+# Call `fn` under the limiter, retrying transient errors with jittered
+# exponential backoff (or the server's Retry-After). Other errors are raised
+# immediately
+def call_with_retry(
+    fn: Callable[[], T],
+    limiter: Optional[RateLimiter] = None,
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+) -> T:
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            result = fn()
+        except Exception as exc:
+            if not is_transient(exc):
+                raise
+            throttled = is_rate_limited(exc)
+            if attempt == max_retries:
+                if throttled:
+                    raise RateLimitExceeded(f"Limite de requêtes atteinte: {exc}") from exc
+                raise
+            delay = _retry_after(exc) or backoff_delay(attempt, base_delay, max_delay)
+            if limiter is not None and throttled:
+                # every thread sharing the key slows down, not only this one
+                limiter.on_throttle()
+                limiter.penalize(delay)
+            else:
+                time.sleep(delay)
+            continue
+        if limiter is not None:
+            limiter.on_success()
+        return result
+    raise AssertionError("unreachable")
+
+
+# Runs calls under an in-flight budget and hedges slow tail calls: when a
+# call is still running after the recent latency quantile, an identical call
+# is started (if the budget and the rate limiter allow it) and the first
+# successful answer wins
+class HedgedCaller:
+    def __init__(self, budget: InflightBudget, limiter: Optional[RateLimiter] = None,
+                 min_delay: float = 2.0, enabled: bool = True):
+        self.budget = budget
+        self.limiter = limiter
+        self.min_delay = min_delay
+        self.enabled = enabled
+        self.latency = LatencyTracker()
+        self._pool = ThreadPoolExecutor(max_workers=budget.limit, thread_name_prefix="hedge")
+
+    def _timed(self, fn: Callable[[], T]) -> T:
+        start = time.monotonic()
+        try:
+            return fn()
+        finally:
+            self.budget.release()
+            self.latency.record(time.monotonic() - start)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        self.budget.acquire()
+        threshold = self.latency.threshold() if self.enabled else None
+        if threshold is None:
+            return self._timed(fn)
+
+        primary = self._pool.submit(self._timed, fn)
+        done, _ = wait([primary], timeout=max(self.min_delay, threshold))
+        if done:
+            return primary.result()
+
+        # slow tail call: hedge only with spare budget and quota
+        if not self.budget.try_acquire():
+            return primary.result()
+        if self.limiter is not None and not self.limiter.try_acquire():
+            self.budget.release()
+            return primary.result()
+
+        hedge = self._pool.submit(self._timed, fn)
+        return _first_success([primary, hedge])
+
+
+def _first_success(futures: list[Future]) -> T:
+    pending = set(futures)
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
@@ -0,0 +1,171 @@
+# Fichier : ai/response_cache.py
+# Cache SQLite optionnel des réponses des LLM, utilisable aussi pour enregistrer puis
+# rejouer des réponses (fixtures)
+# Note : Commentaires en anglais pour uniformité avec ai/client.py.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from config import ResponseCacheConfig, load_response_cache_config
+
+
+# Raised in replay mode when a call has no recorded response
+class CacheMiss(LookupError):
+    pass
+
+
+# Stable digest of an API key, so keys never reach the cache file
+def digest_secret(secret: str) -> str:
+    return hashlib.sha256(secret.strip().encode("utf-8")).hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    # Whitespace differences in prompts must not change the key
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+# Cache key of a call: (model, normalized messages or prompt, sampling params)
+def make_key(model: str, messages: Any, params: Optional[dict[str, Any]] = None) -> str:
+    payload = {"model": model, "messages": _normalize(messages), "params": _normalize(params or {})}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+# JSON values in a SQLite table with a TTL and LRU eviction.
+# Modes:
+#     "on"     - serve hits, call and store on a miss (low temperature calls only)
+#     "record" - always call and store (builds a fixture)
+#     "replay" - only serve stored responses, a miss raises CacheMiss
+class ResponseCache:
+    def __init__(self, path: str, mode: str = "on", ttl: float = 86400.0,
+                 max_entries: int = 5000, max_temperature: float = 0.3):
+        self.path = path
+        self.mode = mode
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_temperature = max_temperature
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            # recorded fixtures never expire
+            if self.mode != "replay" and now - created > self.ttl:
+                with self._db:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            with self._db:
+                self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, encoded, now, now),
+            )
+            # LRU eviction beyond max_entries
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    # Whether a call with this temperature goes through the cache
+    def caches(self, temperature: Optional[float]) -> bool:
+        if self.mode in ("record", "replay"):
+            return True
+        return temperature is None or temperature <= self.max_temperature
+
+    # Serve `key` from the cache or compute it with `fn` (JSON-serializable result)
+    def get_or_call(self, key: str, fn: Callable[[], Any], temperature: Optional[float] = None) -> Any:
+        if not self.caches(temperature):
+            return fn()
+
+        if self.mode != "record":
+            hit = self.get(key)
+            if hit is not None:
+                return hit
+            if self.mode == "replay":
+                raise CacheMiss(f"Aucune réponse enregistrée pour {key[:12]}")
+
+        value = fn()
+        self.put(key, value)
+        return value
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_shared: Optional[ResponseCache] = None
+_shared_loaded = False
+_shared_lock = threading.Lock()
+
+
+# Process-wide cache from LLM_CACHE* variables, None when disabled (default)
+def get_response_cache(config: Optional[ResponseCacheConfig] = None) -> Optional[ResponseCache]:
+    global _shared, _shared_loaded
+    with _shared_lock:
+        if not _shared_loaded or config is not None:
+            config = config or load_response_cache_config()
+            _shared = None if config.mode == "off" else ResponseCache(
+                config.path,
+                mode=config.mode,
+                ttl=config.ttl,
+                max_entries=config.max_entries,
+                max_temperature=config.max_temperature,
+            )
+            _shared_loaded = True
+        return _shared
+
+
+# Run an API key validation through the cache: only successes are stored
+# (keyed on a digest of the key), so a bad key is always re-checked
+def remember_validation(service: str, secret: str, check: Callable[[], bool]) -> bool:
+    cache = get_response_cache()
+    if cache is None:
+        return check()
+
+    key = make_key(service, digest_secret(secret), {"validation": True})
+    if cache.mode != "record":
+        if cache.get(key):
+            return True
+        if cache.mode == "replay":
+            return False
+
+    ok = check()
+    if ok:
+        cache.put(key, True)
+    return ok
@@ -5,9 +5,13 @@
 # main par l'humain, mais l'IA ajoute des optimisations et des suggestions.
 
 from __future__ import annotations
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from itertools import accumulate
 import random
-from typing import Dict, List, Optional
+from typing import List, Mapping, Optional, Sequence
+
+from ai.suspicion import MessageAnalysis, SuspicionRow
 
 # Data class representing the public state of the game
 @dataclass
@@ -15,41 +19,93 @@ class PublicState:
     alive_names: List[str]
     chat_history: List[tuple[str, str]]  # (speaker, text)
     day: int
+    # Cached analysis of each chat_history message (same order), filled by the engine
+    analyses: List[MessageAnalysis] = field(default_factory=list)
 
-# Picks a target based on weighted suspicion levels (fonction faite par l'IA)
-# Weighs candidates according to their suspicion levels and picks one randomly
-def pick_target_weighted(rng: random.Random, weights: Dict[str, float], candidates: List[str]) -> Optional[str]:
-    items = [(c, max(0.0, weights.get(c, 0.0))) for c in candidates]
-    total = sum(w for _, w in items)
-    if total <= 1e-9:
-        return rng.choice(candidates) if candidates else None
-    r = rng.random() * total
-    acc = 0.0
-    for name, w in items:
-        acc += w
-        if r <= acc:
-            return name
-    return items[-1][0] if items else None
+# Sampler over fixed items and weights: the cumulative array is built once and
+# each draw is a bisect. A draw consumes the rng exactly like
+# rng.choices(items, weights)[0], so seeded games stay reproducible.
+class WeightedSampler:
+    def __init__(self, items: Sequence[str], weights: Sequence[float]):
+        self.items = list(items)
+        self._cum = list(accumulate(weights))
+        self._total = self._cum[-1] + 0.0 if self._cum else 0.0
 
-# Chooses an action for a villager based on suspicion levels
-def choose_action_for_villager(rng: random.Random, suspicion: Dict[str, float]) -> str:
+    def draw(self, rng: random.Random) -> str:
+        return self.items[bisect_right(self._cum, rng.random() * self._total, 0, len(self._cum) - 1)]
+
+
+# Target sampler built once per suspicion snapshot (fonction faite par l'IA)
+# Weighs candidates according to their suspicion levels; a draw consumes the rng
+# exactly like the former linear cumulative scan of pick_target_weighted
+class TargetSampler:
+    def __init__(self, weights: Mapping[str, float], candidates: Sequence[str]):
+        self.candidates = list(candidates)
+        if isinstance(weights, SuspicionRow):
+            raw = weights.weights_for(self.candidates)
+        else:
+            raw = [weights.get(c, 0.0) for c in self.candidates]
+        clipped = [max(0.0, w) for w in raw]
+        self._cum = list(accumulate(clipped))
+        self._total = sum(clipped)
+
+    def draw(self, rng: random.Random) -> Optional[str]:
+        if self._total <= 1e-9:
+            return rng.choice(self.candidates) if self.candidates else None
+        r = rng.random() * self._total
+        return self.candidates[bisect_left(self._cum, r, 0, len(self._cum) - 1)]
+
+
+# Action tables, built once at import instead of fresh weight lists per call
+_VILLAGER_HIGH = WeightedSampler(["accuse", "question"], [0.7, 0.3])
+_VILLAGER_MEDIUM = WeightedSampler(["question", "accuse", "hedge"], [0.5, 0.2, 0.3])
+_VILLAGER_LOW = WeightedSampler(["hedge", "question", "agree"], [0.6, 0.25, 0.15])
+_WOLF_HIGH = WeightedSampler(["accuse", "deflect", "agree"], [0.55, 0.35, 0.10])
+_WOLF_LOW = WeightedSampler(["deflect", "hedge", "agree"], [0.55, 0.30, 0.15])
+
+# Picks a target based on weighted suspicion levels. A matrix row keeps the
+# sampler of its current snapshot: the retries of a turn draw from the same table
+def pick_target_weighted(rng: random.Random, weights: Mapping[str, float], candidates: List[str]) -> Optional[str]:
+    if isinstance(weights, SuspicionRow):
+        sampler = weights.cached(("targets", tuple(candidates)), lambda: TargetSampler(weights, candidates))
+    else:
+        sampler = TargetSampler(weights, candidates)
+    return sampler.draw(rng)
+
+# Highest suspicion value, read directly from the matrix row when shared
+def _top_suspicion(suspicion: Mapping[str, float]) -> float:
+    if isinstance(suspicion, SuspicionRow):
+        return suspicion.top()
+    return max(suspicion.values())
+
+# Action table of a villager for the given suspicion levels
+def _villager_actions(suspicion: Mapping[str, float]) -> Optional[WeightedSampler]:
     if not suspicion:
-        return "hedge"
+        return None
 
-    top = max(suspicion.values())
+    top = _top_suspicion(suspicion)
     if top > 2.0:
-        return rng.choices(["accuse", "question"], weights=[0.7, 0.3])[0]
+        return _VILLAGER_HIGH
     if top > 1.0:
-        return rng.choices(["question", "accuse", "hedge"], weights=[0.5, 0.2, 0.3])[0]
-    return rng.choices(["hedge", "question", "agree"], weights=[0.6, 0.25, 0.15])[0]
+        return _VILLAGER_MEDIUM
+    return _VILLAGER_LOW
 
-# Chooses an action for a wolf based on suspicion levels
-def choose_action_for_wolf(rng: random.Random, suspicion: Dict[str, float]) -> str:
+# Action table of a wolf for the given suspicion levels
+def _wolf_actions(suspicion: Mapping[str, float]) -> Optional[WeightedSampler]:
     if not suspicion:
-        return rng.choice(["hedge", "deflect"])
+        return None
+
+    if _top_suspicion(suspicion) > 1.5:
+        return _WOLF_HIGH
+    return _WOLF_LOW
+
+# Chooses an action for a villager based on suspicion levels
+def choose_action_for_villager(rng: random.Random, suspicion: Mapping[str, float]) -> str:
+    actions = _villager_actions(suspicion)
+    return actions.draw(rng) if actions else "hedge"
+
+# Chooses an action for a wolf based on suspicion levels
+def choose_action_for_wolf(rng: random.Random, suspicion: Mapping[str, float]) -> str:
+    actions = _wolf_actions(suspicion)
+    return actions.draw(rng) if actions else rng.choice(["hedge", "deflect"])
 
-    top = max(suspicion.values())
-    if top > 1.5:
-        return rng.choices(["accuse", "deflect", "agree"], weights=[0.55, 0.35, 0.10])[0]
-    return rng.choices(["deflect", "hedge", "agree"], weights=[0.55, 0.30, 0.15])[0
-    ]
@@ -0,0 +1,151 @@
+# Fichier : ai/suspicion.py
+# Analyse partagée des messages publics pour le système de suspicion (mentions, mots-clés)
+# Note : Commentaires en anglais pour uniformité avec ai/rules.py.
+
+from __future__ import annotations
+
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, List, TypeVar
+
+import numpy as np
+
+# Words that make a speaker look suspicious when they use them
+SUSPICION_KEYWORDS = ("suspect", "louche", "cache", "bizarre")
+
+T = TypeVar("T")
+
+
+# Result of the analysis of one public message, shared by every agent
+@dataclass(frozen=True)
+class MessageAnalysis:
+    speaker: str
+    has_keyword: bool  # the message contains a suspicion keyword
+    mentions: FrozenSet[str]  # player names found in the message
+
+
+# Scans messages once with precompiled regexes instead of testing every name
+# and every keyword against every message for every agent
+class SuspicionScanner:
+    def __init__(self, names: Iterable[str], keywords: Iterable[str] = SUSPICION_KEYWORDS):
+        # Longest names first so "Rachel2" is not swallowed by "Rachel"
+        self.names: List[str] = sorted(set(names), key=len, reverse=True)
+
+        # A name found in the text also means every shorter name it contains was
+        # found (same result as the former `target in text` substring test)
+        self._contained: Dict[str, FrozenSet[str]] = {
+            n: frozenset(m for m in self.names if m in n) for n in self.names
+        }
+
+        self._name_re = (
+            re.compile("|".join(re.escape(n) for n in self.names)) if self.names else None
+        )
+        self._keyword_re = re.compile("|".join(re.escape(k) for k in keywords), re.IGNORECASE)
+
+    # Analyse a single message (called once when it enters the public history)
+    def analyse(self, speaker: str, text: str) -> MessageAnalysis:
+        mentions: set[str] = set()
+        if self._name_re is not None:
+            for m in self._name_re.finditer(text):
+                mentions |= self._contained[m.group(0)]
+
+        return MessageAnalysis(
+            speaker=speaker,
+            has_keyword=self._keyword_re.search(text) is not None,
+            mentions=frozenset(mentions),
+        )
+
+
+# Players x players suspicion matrix owned by the engine: row i holds what
+# player i thinks of every other player. Each message is folded in for all
+# observers at once with array operations instead of per-agent dict loops.
+class SuspicionMatrix:
+    def __init__(
+        self,
+        names: Iterable[str],
+        keyword_bump: float = 0.15,
+        mention_bump: float = 0.10,
+        decay: float = 1.0,
+        low: float = 0.0,
+        high: float = 5.0,
+    ):
+        self.names: List[str] = list(names)
+        self.index: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+        self.values = np.zeros((len(self.names), len(self.names)), dtype=np.float64)
+
+        self.keyword_bump = keyword_bump
+        self.mention_bump = mention_bump
+        self.decay = decay  # multiplicative decay applied before each message (1.0 = none)
+        self.low = low
+        self.high = high
+        self.version = 0  # bumped by each message: identifies a suspicion snapshot
+
+    # Apply one analysed public message to every observer's row
+    def observe(self, analysis: MessageAnalysis) -> None:
+        self.version += 1
+        values = self.values
+        if self.decay != 1.0:
+            values *= self.decay
+
+        # speaker suspicion increase if they use suspect words
+        speaker = self.index.get(analysis.speaker)
+        if analysis.has_keyword and speaker is not None:
+            values[:, speaker] += self.keyword_bump
+
+        # mentions of other players increase their suspicion
+        mentioned = [self.index[n] for n in analysis.mentions if n in self.index]
+        if mentioned:
+            values[:, mentioned] += self.mention_bump
+
+        # nobody suspects themselves, then clamp everything at once
+        np.fill_diagonal(values, 0.0)
+        np.clip(values, self.low, self.high, out=values)
+
+    # Live read-only view of one observer's suspicion
+    def row(self, name: str) -> "SuspicionRow":
+        return SuspicionRow(self, self.index[name])
+
+
+# Mapping view (other player name -> suspicion) over one matrix row, so the
+# rules can read it like the former per-agent dict
+class SuspicionRow(Mapping):
+    def __init__(self, matrix: SuspicionMatrix, observer: int):
+        self._matrix = matrix
+        self._observer = observer
+        self._cache: Dict[Hashable, object] = {}
+        self._cache_version = matrix.version
+
+    def __getitem__(self, name: str) -> float:
+        col = self._matrix.index.get(name)
+        if col is None or col == self._observer:
+            raise KeyError(name)
+        return float(self._matrix.values[self._observer, col])
+
+    def __iter__(self) -> Iterator[str]:
+        return (n for i, n in enumerate(self._matrix.names) if i != self._observer)
+
+    def __len__(self) -> int:
+        return max(0, len(self._matrix.names) - 1)
+
+    # Highest suspicion towards another player (the diagonal is always 0.0)
+    def top(self) -> float:
+        return float(self._matrix.values[self._observer].max())
+
+    # Suspicion towards each candidate, in the candidates' order (0.0 if unknown)
+    def weights_for(self, candidates: List[str]) -> List[float]:
+        index = self._matrix.index
+        cols = [index.get(c, self._observer) for c in candidates]
+        return self._matrix.values[self._observer, cols].tolist()
+
+    # Value built from this row by `build()`, kept until the next message changes
+    # the matrix (e.g. the target sampler reused by the retries of a turn)
+    def cached(self, key: Hashable, build: Callable[[], T]) -> T:
+        if self._cache_version != self._matrix.version:
+            self._cache.clear()
+            self._cache_version = self._matrix.version
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = build()
+            return value
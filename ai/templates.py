@@ -0,0 +1,123 @@
+# Fichier : ai/templates.py
+# Banque de templates de dialogue indexée : chargement unique, champs pré-analysés,
+# tirage sans répétition en O(1) partagé par les agents et les moteurs
+# Note : Commentaires en anglais pour uniformité avec ai/rules.py.
+
+from __future__ import annotations
+
+import json
+import random
+import string
+from collections import Counter, deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# Format fields filled from the "common" section of the template file
+_COMMON_FIELDS = (("c", "connectors"), ("s", "softeners"), ("e", "endings"))
+
+
+# A template with its format fields parsed once at load time
+@dataclass(frozen=True)
+class Template:
+    text: str
+    fields: FrozenSet[str]
+
+    def render(self, **values: str) -> str:
+        return self.text.format(**values)
+
+
+# Immutable, parsed view of the template file ("role.action" -> templates)
+class TemplateIndex:
+    def __init__(self, raw: dict):
+        self.raw = raw
+        self.common: Dict[str, Tuple[str, ...]] = {
+            k: tuple(v) for k, v in raw.get("common", {}).items()
+        }
+        self.categories: Dict[str, Tuple[Template, ...]] = {}
+        for section, banks in raw.items():
+            if section == "common":
+                continue
+            for action, texts in banks.items():
+                self.categories[f"{section}.{action}"] = tuple(_parse(t) for t in texts)
+
+    def has(self, category: str) -> bool:
+        return category in self.categories
+
+
+# Extracts the format field names of a template string
+def _parse(text: str) -> Template:
+    fields = frozenset(f for _, f, _, _ in string.Formatter().parse(text) if f)
+    return Template(text=text, fields=fields)
+
+
+# Loads and parses a template file once per process
+@lru_cache(maxsize=None)
+def load_template_index(path: str) -> TemplateIndex:
+    with open(path, "r", encoding="utf-8") as f:
+        return TemplateIndex(json.load(f))
+
+
+# Mutable picking state over an index: one shuffled deck per category and a
+# recent-use window shared by all categories. Each pick pops the next card of
+# the deck (no repeat inside a category until the deck is exhausted) and skips
+# cards still in the recent window, so selection and repeat avoidance are O(1)
+# amortised instead of filtering every template against deques.
+class TemplateBank:
+    def __init__(self, index: TemplateIndex, recent_size: int = 80):
+        self.index = index
+        self._decks: Dict[str, List[int]] = {}
+        self._recent: deque[str] = deque()
+        self._recent_count: Counter[str] = Counter()
+        self._recent_size = recent_size
+
+    # Picks a template of the category without recent repetitions
+    def pick(self, category: str, rng: random.Random) -> Template:
+        templates = self.index.categories[category]
+        deck = self._decks.setdefault(category, [])
+
+        chosen: Optional[Template] = None
+        for _ in range(len(templates)):
+            if not deck:
+                deck.extend(range(len(templates)))
+                rng.shuffle(deck)
+            candidate = templates[deck.pop()]
+            if self._recent_count[candidate.text] == 0:
+                chosen = candidate
+                break
+
+        # every template of the category was used recently: accept a repeat
+        if chosen is None:
+            if not deck:
+                deck.extend(range(len(templates)))
+                rng.shuffle(deck)
+            chosen = templates[deck.pop()]
+
+        self._remember(chosen.text)
+        return chosen
+
+    # Picks and renders a template, drawing only the common fields it uses
+    def render(self, category: str, rng: random.Random, **values: str) -> str:
+        tpl = self.pick(category, rng)
+        for field, key in _COMMON_FIELDS:
+            if field in tpl.fields:
+                values[field] = rng.choice(self.index.common.get(key, ("",)))
+        return tpl.render(**values)
+
+    # Picking state as plain data (saved games)
+    def snapshot_state(self) -> dict:
+        return {"decks": {c: list(d) for c, d in self._decks.items()}, "recent": list(self._recent)}
+
+    def restore_state(self, state: dict) -> None:
+        self._decks = {c: list(d) for c, d in state["decks"].items()}
+        self._recent = deque(state["recent"])
+        self._recent_count = Counter(self._recent)
+
+    def _remember(self, text: str) -> None:
+        self._recent.append(text)
+        self._recent_count[text] += 1
+        if len(self._recent) > self._recent_size:
+            old = self._recent.popleft()
+            self._recent_count[old] -= 1
+            if self._recent_count[old] == 0:
+                del self._recent_count[old]
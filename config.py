@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
 import os
 
 
@@ -11,6 +12,9 @@ class OllamaConfig:
     base_url: str
     model: str
     timeout: float
+    keep_alive: str = "30m"  # how long Ollama keeps the model loaded after each request
+    context_budget: int = 1536  # tokens of conversation an agent keeps before starting over
+    batch_dialogue: bool = False  # one constrained generation writes the whole discussion
 
     def validate(self) -> "OllamaConfig":
         if not self.base_url.strip():
@@ -27,10 +31,158 @@ def load_ollama_config() -> OllamaConfig:
     base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     model = os.getenv("OLLAMA_MODEL", "mistral")
     timeout_str = os.getenv("OLLAMA_TIMEOUT", "180")
+    keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 
     try:
         timeout = float(timeout_str)
     except ValueError as exc:
         raise ValueError("OLLAMA_TIMEOUT must be a number") from exc
 
-    return OllamaConfig(base_url=base_url, model=model, timeout=timeout).validate()
+    try:
+        context_budget = int(os.getenv("OLLAMA_CONTEXT_BUDGET", "1536"))
+    except ValueError as exc:
+        raise ValueError("OLLAMA_CONTEXT_BUDGET must be an integer") from exc
+
+    batch_dialogue = os.getenv("OLLAMA_BATCH_DIALOGUE", "0").strip().lower() in ("1", "true", "yes", "on")
+
+    return OllamaConfig(
+        base_url=base_url,
+        model=model,
+        timeout=timeout,
+        keep_alive=keep_alive,
+        context_budget=context_budget,
+        batch_dialogue=batch_dialogue,
+    ).validate()
+
+
+@dataclass(frozen=True)
+class OpenRouterTurnsConfig:
+    parallel_turns: int  # agent calls in flight at once during a discussion
+    max_staleness: int  # messages of the same discussion an agent may not have seen
+
+    def validate(self) -> "OpenRouterTurnsConfig":
+        if self.parallel_turns < 1:
+            raise ValueError("OPENROUTER_PARALLEL_TURNS must be >= 1")
+        if self.max_staleness < 0:
+            raise ValueError("OPENROUTER_MAX_STALENESS must be >= 0")
+        return self
+
+
+def load_openrouter_turns_config() -> OpenRouterTurnsConfig:
+    """Load the OpenRouter discussion settings from environment variables with defaults."""
+    try:
+        parallel_turns = int(os.getenv("OPENROUTER_PARALLEL_TURNS", "1"))
+        max_staleness = int(os.getenv("OPENROUTER_MAX_STALENESS", "0"))
+    except ValueError as exc:
+        raise ValueError("OPENROUTER_PARALLEL_TURNS and OPENROUTER_MAX_STALENESS must be integers") from exc
+
+    return OpenRouterTurnsConfig(parallel_turns=parallel_turns, max_staleness=max_staleness).validate()
+
+
+@dataclass(frozen=True)
+class SpeculationConfig:
+    branches: Optional[int]  # vote outcomes precomputed at once, None = the engine's default
+
+    def validate(self) -> "SpeculationConfig":
+        if self.branches is not None and self.branches < 0:
+            raise ValueError("SPECULATIVE_BRANCHES must be >= 0")
+        return self
+
+
+def load_speculation_config() -> SpeculationConfig:
+    """Load the vote speculation setting (SPECULATIVE_BRANCHES, 0 disables it)."""
+    raw = os.getenv("SPECULATIVE_BRANCHES", "").strip()
+    try:
+        branches = int(raw) if raw else None
+    except ValueError as exc:
+        raise ValueError("SPECULATIVE_BRANCHES must be an integer") from exc
+
+    return SpeculationConfig(branches=branches).validate()
+
+
+@dataclass(frozen=True)
+class ResponseCacheConfig:
+    mode: str  # "off" | "on" | "record" | "replay"
+    path: str
+    ttl: float  # seconds an entry stays valid
+    max_entries: int  # least recently used entries are evicted beyond this
+    max_temperature: float  # in "on" mode, hotter calls are not cached
+
+    def validate(self) -> "ResponseCacheConfig":
+        if self.mode not in ("off", "on", "record", "replay"):
+            raise ValueError("LLM_CACHE must be off, on, record or replay")
+        if self.ttl <= 0:
+            raise ValueError("LLM_CACHE_TTL must be > 0")
+        if self.max_entries < 1:
+            raise ValueError("LLM_CACHE_MAX_ENTRIES must be >= 1")
+        return self
+
+
+def load_response_cache_config() -> ResponseCacheConfig:
+    """Load the LLM response cache settings from environment variables (off by default)."""
+    mode = os.getenv("LLM_CACHE", "off").strip().lower() or "off"
+    path = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_responses.sqlite3"))
+
+    try:
+        ttl = float(os.getenv("LLM_CACHE_TTL", "86400"))
+        max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+        max_temperature = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))
+    except ValueError as exc:
+        raise ValueError("LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES and LLM_CACHE_MAX_TEMPERATURE must be numbers") from exc
+
+    return ResponseCacheConfig(
+        mode=mode,
+        path=path,
+        ttl=ttl,
+        max_entries=max_entries,
+        max_temperature=max_temperature,
+    ).validate()
+
+
+@dataclass(frozen=True)
+class JournalConfig:
+    path: str  # "" disables the journal
+    max_bytes: int  # the file is rotated beyond this size
+    backups: int  # rotated files kept (journal.1.jsonl, journal.2.jsonl, ...)
+    capacity: int  # records waiting for the writer at most
+    policy: str  # "drop" (oldest records are lost when full) | "block" (producers wait)
+    fsync_interval: float  # seconds between two fsync of the file
+    digests: bool = False  # state digest after each game call, checked by game/replay.py (costs CPU)
+
+    def validate(self) -> "JournalConfig":
+        if self.policy not in ("drop", "block"):
+            raise ValueError("GAME_JOURNAL_POLICY must be drop or block")
+        if self.max_bytes < 1024:
+            raise ValueError("GAME_JOURNAL_MAX_BYTES must be >= 1024")
+        if self.backups < 0:
+            raise ValueError("GAME_JOURNAL_BACKUPS must be >= 0")
+        if self.capacity < 1:
+            raise ValueError("GAME_JOURNAL_CAPACITY must be >= 1")
+        if self.fsync_interval <= 0:
+            raise ValueError("GAME_JOURNAL_FSYNC must be > 0")
+        return self
+
+
+def load_journal_config() -> JournalConfig:
+    """Load the event journal settings from environment variables (off unless GAME_JOURNAL is set)."""
+    path = os.getenv("GAME_JOURNAL", "").strip()
+    policy = os.getenv("GAME_JOURNAL_POLICY", "drop").strip().lower() or "drop"
+    digests = os.getenv("GAME_JOURNAL_DIGESTS", "0").strip().lower() in ("1", "true", "yes", "on")
+
+    try:
+        max_bytes = int(os.getenv("GAME_JOURNAL_MAX_BYTES", str(16 * 1024 * 1024)))
+        backups = int(os.getenv("GAME_JOURNAL_BACKUPS", "3"))
+        capacity = int(os.getenv("GAME_JOURNAL_CAPACITY", "10000"))
+        fsync_interval = float(os.getenv("GAME_JOURNAL_FSYNC", "2"))
+    except ValueError as exc:
+        raise ValueError("GAME_JOURNAL_MAX_BYTES, GAME_JOURNAL_BACKUPS, GAME_JOURNAL_CAPACITY and GAME_JOURNAL_FSYNC must be numbers") from exc
+
+    return JournalConfig(
+        path=path,
+        max_bytes=max_bytes,
+        backups=backups,
+        capacity=capacity,
+        policy=policy,
+        fsync_interval=fsync_interval,
+        digests=digests,
+    ).validate()
@@ -1,4 +1,4 @@
-from ai.client import OpenRouterClient, parse_response
+from ai.client import NIGHT_FIELDS, PLAYER_FIELDS, OpenRouterClient
 from game.context_manager import GameContextManager
 
 
@@ -8,8 +8,22 @@ class Agent:
         self.role = role
         self.alive = True
 
+    # Everything the agent knows is in the context manager (saved by the engine)
+    def snapshot_state(self) -> dict:
+        return {}
+
+    def restore_state(self, state: dict) -> None:
+        pass
+
     # Agent plays its turn using the OpenRouterClient and the given context
     def play(self,periode:str,client:OpenRouterClient,context:GameContextManager):
+        messages = self.prepare(periode, context)
+        response = self.request(client, messages, NIGHT_FIELDS if periode == "Nuit" else PLAYER_FIELDS)
+        self.commit(response, context)
+        return response
+
+    # Builds the prompt from the context as it is now (frozen for the request)
+    def prepare(self,periode:str,context:GameContextManager):
         if not self.alive:
             raise Exception(f"Agent {self.name} is dead and cannot play.")
 
@@ -31,11 +45,17 @@ class Agent:
             {"role": "user", "content": f"Ton nom est {self.name} et ton rôle est {self.role}. Basé sur ton context: {player_context}, que fais-tu ?"},
             {"role": "user", "content": f"La période actuelle est : {periode}."}
         ]
+        return messages
 
-         # get the response from the client
-        response = client.chat_completion_player(messages, max_tokens=150)
+    # Remote call only: safe to run in a worker thread (no context access)
+    def request(self,client:OpenRouterClient,messages,required_fields=PLAYER_FIELDS):
+        # get the response from the client (cut once required_fields are complete)
+        response = client.chat_completion_player(messages, max_tokens=150, required_fields=required_fields)
         print(f"[DEBUG] Raw response from agent {self.name}:\n{response}\n")
+        return response
 
+    # Writes the outcome of the turn to the context (called in turn order)
+    def commit(self,response,context:GameContextManager):
         # Add action to global context in a readable format (what others can observe)
         if response.dialogue and response.dialogue.strip():
             global_context_content = {
@@ -50,5 +70,3 @@ class Agent:
             "content": f"Mon raisonnement: {response.reasoning}"
         }
         context.add_player_context(self.name, player_context_content)
-
-        return response
@@ -1,114 +1,131 @@
-import json
+# Fichier : game/context_manager.py
+# Contexte global et par joueur des agents OpenRouter, stocké en colonnes
+# (ids, codes de type internés, offsets dans une table de chaînes)
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from heapq import merge
+from typing import Dict, Iterator, List
+
+# Type code of the elements given as plain text (formatted as-is)
+_RAW = 0
+
+# Global types routed to the wolves channel: non-wolves never see them
+# (they only learn the results in the morning)
+_WOLF_ONLY_TYPES = frozenset(("night_action", "wolf_discussion"))
+
+
+# Columns of one context stream: element ids, type codes and offsets in the
+# manager's string table. A few bytes per element instead of two nested dicts.
+class _ContextColumns:
+    __slots__ = ("ids", "types", "texts")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.types = array("H")
+        self.texts = array("I")
+
+    def append(self, element_id: int, type_code: int, text_offset: int) -> None:
+        self.ids.append(element_id)
+        self.types.append(type_code)
+        self.texts.append(text_offset)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # Raw column bytes (saved games are read back on the same kind of machine)
+    def to_bytes(self) -> tuple:
+        return (self.ids.tobytes(), self.types.tobytes(), self.texts.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: tuple) -> _ContextColumns:
+        columns = cls()
+        for column, raw in zip((columns.ids, columns.types, columns.texts), data):
+            column.frombytes(raw)
+        return columns
+
+    # (id, type code, text offset) rows, sorted by id since ids only grow
+    def rows(self) -> Iterator[tuple]:
+        return zip(self.ids, self.types, self.texts)
 
-from openrouter import dataclass
 
 # Main context manager for the game
-# Manages both global and per-agent contexts
+# Manages both global and per-agent contexts. Visibility is decided once, when
+# an element is added, by routing it to a channel: public, wolves-only or one
+# player's private channel. A player's view is a merge of the channels it can
+# read, with no per-element checks.
 class GameContextManager:
     def __init__(self):
-        self.global_context = []
-        self.agent_contexts = {}
+        self.global_context = _ContextColumns()  # public channel
+        self.wolves_context = _ContextColumns()  # wolves-only channel
+        self.agent_contexts: Dict[str, _ContextColumns] = {}  # private channels
         self.contextelementscounter = 0
         self.player_roles = {}  # Store player roles for context filtering
 
-    ## Add a global context element
+        # Interned type tags: code -> type, type -> code, code -> "[TYPE] " prefix
+        self._type_names: List[str] = [""]
+        self._type_codes: Dict[str, int] = {}
+        self._type_prefixes: List[str] = [""]
+
+        # String table shared by every stream (repeated texts are stored once)
+        self._strings: List[str] = []
+        self._string_offsets: Dict[str, int] = {}
+
+    ## Add a global context element (wolf-only types go to the wolves channel)
     def add_global_context(self,content):
-        context_element = {
-            "id": self.contextelementscounter,
-            "content": content
-        }
-        self.global_context.append(context_element)
-        self.increment_counter()
+        if isinstance(content, dict) and content.get("type") in _WOLF_ONLY_TYPES:
+            self._append(self.wolves_context, content)
+        else:
+            self._append(self.global_context, content)
+
+    ## Add a context element only the wolves can see
+    def add_wolves_context(self,content):
+        self._append(self.wolves_context, content)
 
     ## Add a context element for a specific player
     def add_player_context(self,player_name,content):
         if player_name not in self.agent_contexts:
-            self.agent_contexts[player_name] = []
-        context_element = {
-            "id": self.contextelementscounter,
-            "player_name": player_name,
-            "content": content
-        }
-        self.agent_contexts[player_name].append(context_element)
-        self.increment_counter()
+            self.agent_contexts[player_name] = _ContextColumns()
+        self._append(self.agent_contexts[player_name], content)
 
     ## Get the full context for a specific player
     def get_player_context(self,player_name):
         if player_name not in self.agent_contexts:
             return ""
-        context_elements = self.agent_contexts[player_name]
-        # Concatenate all content for the player with formatting
-        formatted_context = []
-        for elem in context_elements:
-            content = elem["content"]
-            if isinstance(content, dict):
-                formatted_context.append(f"[{content.get('type', 'info').upper()}] {content.get('content', str(content))}")
-            else:
-                formatted_context.append(str(content))
-        return "\n".join(formatted_context)
-
-    ## Get the full global context
-    def get_global_context(self):
-        formatted_context = []
-        for elem in self.global_context:
-            content = elem["content"]
-            if isinstance(content, dict):
-                formatted_context.append(f"[{content.get('type', 'info').upper()}] {content.get('content', str(content))}")
-            else:
-                formatted_context.append(str(content))
-        return "\n".join(formatted_context)
-
+        return "\n".join(self._lines(self.agent_contexts[player_name]))
 
+    ## Get the full global context (public and wolves channels)
+    def get_global_context(self):
+        return "\n".join(self._format(merge(self.global_context.rows(), self.wolves_context.rows())))
 
     # Get the full context for a specific player,
-    # interleaving global and player-specific context elements
+    # interleaving the channels it can read by id
     def get_full_global_player_context(self, player_name):
-        player_context = self.agent_contexts.get(player_name, [])
-        global_context = self.global_context
-
-        # Format helper function
-        def format_content(content):
-            if isinstance(content, dict):
-                content_type = content.get('type', 'info').upper()
-                content_text = content.get('content', str(content))
-                return f"[{content_type}] {content_text}"
-            return str(content)
-
-        res = []
-        pPtr = 0
-
-        for i in range(len(global_context)):
-            global_context_element = global_context[i]
-            next_global_id = global_context[i+1]["id"] if i + 1 < len(global_context) else float('inf')
-
-            # Add global context element
-            res.append(format_content(global_context_element["content"]))
-
-            # Skip night action details for non-wolves (they shouldn't know what happens at night)
-            if isinstance(global_context_element["content"], dict):
-                content_text = global_context_element["content"].get("content", "")
-                content_type = global_context_element["content"].get("type", "")
-
-                # Non-wolves don't see detailed night actions, only the results in the morning
-                if content_type in ["night_action", "wolf_discussion"] and not self._is_wolf(player_name):
-                    continue
-
-            # Get all player context elements until the id of the next global context
-            while pPtr < len(player_context):
-                player_context_element = player_context[pPtr]
-                if player_context_element["id"] > next_global_id:
-                    break
-                res.append(format_content(player_context_element["content"]))
-                pPtr += 1
-
-        # Append any remaining player context elements
-        while pPtr < len(player_context):
-            player_context_element = player_context[pPtr]
-            res.append(format_content(player_context_element["content"]))
-            pPtr += 1
-
-        return "\n".join(res)
-
+        return "\n".join(self._format(merge(*self._channels(player_name))))
+
+    # Iterate over the global elements as records
+    def iter_global_context(self) -> Iterator[GlobalContextElements]:
+        for element_id, type_code, offset in merge(self.global_context.rows(), self.wolves_context.rows()):
+            yield GlobalContextElements(
+                id=element_id,
+                type=self._type_names[type_code],
+                content=self._strings[offset],
+            )
+
+    # Iterate over the elements of one player as records
+    def iter_player_context(self, player_name) -> Iterator[PlayerContextElement]:
+        cols = self.agent_contexts.get(player_name)
+        if cols is None:
+            return
+        for i in range(len(cols)):
+            yield PlayerContextElement(
+                id=cols.ids[i],
+                player_name=player_name,
+                type=self._type_names[cols.types[i]],
+                content=self._strings[cols.texts[i]],
+            )
 
     def increment_counter(self):
         self.contextelementscounter += 1
@@ -117,23 +134,103 @@ class GameContextManager:
         """Set the role of a player for context filtering"""
         self.player_roles[player_name] = role
 
+    # Whole context as plain data (saved games): resuming needs no LLM call
+    def snapshot_state(self) -> dict:
+        return {
+            "global": self.global_context.to_bytes(),
+            "wolves": self.wolves_context.to_bytes(),
+            "agents": {name: cols.to_bytes() for name, cols in self.agent_contexts.items()},
+            "counter": self.contextelementscounter,
+            "roles": dict(self.player_roles),
+            "types": list(self._type_names),
+            "strings": list(self._strings),
+        }
+
+    def restore_state(self, state: dict) -> None:
+        self.global_context = _ContextColumns.from_bytes(state["global"])
+        self.wolves_context = _ContextColumns.from_bytes(state["wolves"])
+        self.agent_contexts = {name: _ContextColumns.from_bytes(raw) for name, raw in state["agents"].items()}
+        self.contextelementscounter = state["counter"]
+        self.player_roles = dict(state["roles"])
+
+        self._type_names = list(state["types"])
+        self._type_codes = {name: code for code, name in enumerate(self._type_names) if code != _RAW}
+        self._type_prefixes = [""] + [f"[{str(name).upper()}] " for name in self._type_names[1:]]
+
+        self._strings = list(state["strings"])
+        self._string_offsets = {text: offset for offset, text in enumerate(self._strings)}
+
     def _is_wolf(self, player_name):
         """Check if a player is a wolf"""
         return self.player_roles.get(player_name, "") == "loup"
 
+    # Channels a player can read: public, wolves (if wolf) and its own
+    def _channels(self, player_name) -> List[Iterator[tuple]]:
+        channels = [self.global_context.rows()]
+        if self._is_wolf(player_name):
+            channels.append(self.wolves_context.rows())
+        private = self.agent_contexts.get(player_name)
+        if private is not None:
+            channels.append(private.rows())
+        return channels
+
+    # Store one element in a stream: dict contents are {"type", "content"},
+    # anything else is kept as plain text
+    def _append(self, columns: _ContextColumns, content) -> None:
+        if isinstance(content, dict):
+            type_code = self._type_code(content.get("type", "info"))
+            text = str(content.get("content", str(content)))
+        else:
+            type_code = _RAW
+            text = str(content)
+
+        columns.append(self.contextelementscounter, type_code, self._string_offset(text))
+        self.increment_counter()
+
+    # Code of an interned type tag (created on first use)
+    def _type_code(self, type_name: str) -> int:
+        code = self._type_codes.get(type_name)
+        if code is None:
+            code = len(self._type_names)
+            self._type_names.append(type_name)
+            self._type_codes[type_name] = code
+            self._type_prefixes.append(f"[{str(type_name).upper()}] ")
+        return code
+
+    # Offset of a text in the string table (stored once)
+    def _string_offset(self, text: str) -> int:
+        offset = self._string_offsets.get(text)
+        if offset is None:
+            offset = len(self._strings)
+            self._strings.append(text)
+            self._string_offsets[text] = offset
+        return offset
+
+    # Formatted lines of one stream ("[TYPE] content", or the raw text)
+    def _lines(self, columns: _ContextColumns) -> List[str]:
+        return self._format(columns.rows())
+
+    # Formats (id, type code, text offset) rows
+    def _format(self, rows) -> List[str]:
+        prefixes = self._type_prefixes
+        strings = self._strings
+        return [prefixes[t] + strings[o] for _, t, o in rows]
+
 
 # Keep track of elements perceive by a specific agent
 # for example, the thoughts or memories of an agent
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PlayerContextElement:
     id: int
     player_name: str
+    type: str  # "" for plain text elements
     content: str
 
 
 # Keep track of elements perceive by all agents
 # For example, when a player say something aloud
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GlobalContextElements:
     id: int
+    type: str  # "" for plain text elements
     content: str
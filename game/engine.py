@@ -1,5 +1,5 @@
 # Fichier : game/engine.py
-# Gestion des écrans et de l'interface utilisateur (menus, affichage, etc.)
+# Moteur du mode local : agents Ollama (repli sur les templates)
 # Note : Commentaires en anglais redigé par IA pour uniformité du code.
 # Note : Certaines parties du code ont été générées par une IA (Copilot). Le code est fait à la
 # main par l'humain, mais l'IA ajoute des optimisations et des suggestions.
@@ -7,303 +7,181 @@
 # Annotations : Security import for forward references
 from __future__ import annotations
 
-import json
-import random
-
-# Deque for recent templates tracking (to avoid repetitions)
-from collections import deque
-from dataclasses import dataclass
+import re
 from typing import List, Optional
 
 # Imports needed for AI agents
-from ai.agent_ollama import Agent, AgentConfig, load_templates
-from ai.rules import PublicState
-from game.structure_ai import Player
-
-import audio_config
-
-# Data class for chat events
-@dataclass
-class ChatEvent:
-    name_ia: str
-    text: str
-    show_name_ia: bool
-
-
-# Main game engine class
-class GameEngine:
-    def __init__(self, num_players: int, seed: Optional[int] = None):
-        if num_players < 6:
-            raise ValueError("num_players must be >= 6")
-
-        # Random generator with optional seed for reproducibility
-        self.rng = random.Random(seed)
-
-        self.day_count = 1  # Start with day 1
-        self.phase = "JourDiscussion"  # Start with day phase for discussion
-        self.supports_streaming_discussion = False
-        self.use_background_generation = True  # to avoid blocking the UI during TTS generation, we use a background thread and queue system in tts_helper.py
-
-
-        with open("data/ai_names.json", "r", encoding="utf-8") as f:
-            self.characters_data = json.load(f)["characters"]
-
-        self.players: List[Player] = self._create_players(num_players)
-
-        # Used to track the last night victim
-        self._last_night_victim: Optional[int] = None
-
-        # Track found wolves' names
-        self.found_wolves_names: set[str] = set()
-
-        # Create AI agents for each player
-        self.templates = load_templates("data/dialogue_ai_template.json")
-        self.agents = {}
-
-        # Recent templates used for diversity (to avoid repetitions)
-        self.recent_templates_global = deque(maxlen=80)
-        self.recent_templates_by_cat = {}
-
-        # Recent messages for context (to avoid repetition with the same message)
-        self.recent_messages = deque(maxlen=60)
-
-        # Initialize agents
-        for p in self.players:
-            # Create agent configuration
-            cfg = AgentConfig(name=p.name, role=p.role)
-
-            # Use different seed for each agent for variability
-            self.agents[p.name] = Agent(
-                cfg, self.templates, seed=self.rng.randrange(1_000_000)
-            )
-        # Public chat history
-        self.public_chat_history: list[tuple[str, str]] = []
-
-    # Picks a template without recent repetitions
-    def _pick_template_no_repeat(self, category: str, templates: list[str]) -> str:
-        # initialize recent tracking for category if needed
-        if category not in self.recent_templates_by_cat:
-            self.recent_templates_by_cat[category] = deque(maxlen=25)
-
-        recent_cat = self.recent_templates_by_cat[category]
-        recent_global = self.recent_templates_global
-
-        # filter candidates not in recent lists
-        candidates = [
-            t for t in templates if t not in recent_cat and t not in recent_global
-        ]
-        if not candidates:
-            candidates = [t for t in templates if t not in recent_cat] or templates
-
-        # Choose one and update recent lists
-        chosen = self.rng.choice(candidates)
-        recent_cat.append(chosen)
-        recent_global.append(chosen)
-        return chosen
-
-    # Creates players with assigned roles
-    def _create_players(self, num_players: int) -> List[Player]:
-        # Choisir num_players personnages au hasard
-        selected_chars = self.rng.sample(self.characters_data, num_players)
-        
-        num_wolves = max(1, num_players // 4)
-        roles = ["loup"] * num_wolves + ["villageois"] * (num_players - num_wolves)
-        self.rng.shuffle(roles)
-
-        # Créer Player avec name, role et voice_id
-        return [
-            Player(
-                name=char["name"],
-                role=r,
-                alive=True,
-                note=0,
-                voice_id=char["voice_id"]  # <-- ajout ici
-            )
-            for char, r in zip(selected_chars, roles)
-        ]
-
-    # Helpers to get alive player indexes
-    def alive_indexes(self) -> List[int]:
-        return [i for i, p in enumerate(self.players) if p.alive]
-
-    # Helpers to get alive wolf indexes
-    def alive_wolf_indexes(self) -> List[int]:
-        return [i for i, p in enumerate(self.players) if p.alive and p.role == "loup"]
-
-    # Helpers to get alive villager indexes
-    def alive_villager_indexes(self) -> List[int]:
-        return [i for i, p in enumerate(self.players) if p.alive and p.role != "loup"]
-
-    # Helpers to get all wolves' names
-    def all_wolves_names(self) -> list[str]:
-        return [p.name for p in self.players if p.role == "loup"]
-
-    # Helpers to get found wolves' names as a sorted list
-    def found_wolves_list(self) -> list[str]:
-        # tri stable pour l'affichage
-        return sorted(self.found_wolves_names)
-
-    # Determines if there is a winner
-    def get_winner(self) -> Optional[str]:
-        wolves = len(self.alive_wolf_indexes())
-        villagers = len(self.alive_villager_indexes())
-
-        if wolves == 0:
-            return "village"
-        if wolves >= villagers:
-            return "loups"
-        return None
-
-    # Kills a player by index
-    def kill_player(self, index: int) -> None:
-        p = self.players[index]
-        p.alive = False
-        p.note = 0  # reset note on death
-
-    # Generates day discussion messages
-    def _generate_day_discussion(self, n_messages: int = 10) -> list[ChatEvent]:
-        alive_names = [p.name for p in self.players if p.alive]
-
-        # Generate messages
-        events: list[ChatEvent] = []
-        last_speaker = None
-        
-        for _ in range(n_messages):
-            # Choose speaker, avoiding consecutive messages from same person
-            available_speakers = [name for name in alive_names if name != last_speaker or len(alive_names) == 1]
-            if not available_speakers:
-                available_speakers = alive_names  # Fallback
-                
-            speaker = self.rng.choice(available_speakers)
-            agent = self.agents[speaker]
-
-            # create public state for the agent
-            state = PublicState(
-                alive_names=alive_names,
-                chat_history=self.public_chat_history,
-                day=self.day_count,
+from ai.agent_ollama import Agent, AgentConfig
+from ai.json_stream import repair_json_object
+from config import load_ollama_config
+from game.engine_core import AgentDialogue, ChatEvent, GameEngineCore  # ChatEvent kept importable from here
+
+# A wolf's line that gives its own role away is dropped
+_WOLF_CONFESSION = re.compile(r"\bje suis (?:un |le )?(?:loup|loup-garou)\b", re.IGNORECASE)
+
+
+# Dialogue where one constrained Ollama generation writes the whole discussion
+# (speaking order fixed by a JSON schema); the per-agent turns are the fallback
+class OllamaBatchDialogue(AgentDialogue):
+    max_line_length = 160
+
+    # Generates day discussion messages in a single model pass
+    def generate(self, engine: GameEngineCore, n_messages: int) -> List[ChatEvent]:
+        alive_names = engine.roster.alive_names()
+        speakers = self.draw_speakers(engine, alive_names, n_messages)
+
+        agent = next((a for a in engine.agents.values() if a.use_ollama and a.ollama_client), None)
+        if agent is None or not speakers:
+            return self.speak(engine, alive_names, speakers)
+
+        try:
+            response = agent.ollama_client.generate(
+                prompt=self._prompt(engine, alive_names, speakers),
+                model=agent.ollama_model,
+                options={"temperature": 0.7, "num_predict": 60 * len(speakers)},
+                format=self._schema(speakers),
             )
+        except (ConnectionError, ValueError) as e:
+            print(f"⚠️  Ollama batch generation failed: {e}")
+            return self.speak(engine, alive_names, speakers)
 
-            agent.observe_public(state)
-
-            # try to avoid repeating the same message recently
-            for _try in range(3):
-                msg = agent.decide_message(state)
-                rendered = f"{speaker}:{msg}"
-                if rendered not in self.recent_messages:
-                    self.recent_messages.append(rendered)
-                    break
+        data = repair_json_object(response.response) or {}
+        lines = data.get("messages")
 
-            # fallback if still repeating
-            else:
-                msg = agent.decide_message(state)
+        events: List[ChatEvent] = []
+        for line in lines if isinstance(lines, list) else []:
+            if not isinstance(line, dict):
+                continue
+            message = self._accept(engine, line.get("name"), line.get("text"))
+            if message is None:
+                continue
+            speaker, text = message
 
             # engine records the message
-            self.public_chat_history.append((speaker, msg))
-            events.append(ChatEvent(name_ia=speaker, text=msg, show_name_ia=True))
-            
-            # Update last speaker
-            last_speaker = speaker
-
-        return events
+            engine._record_public_message(speaker, text)
+            events.append(engine._publish(ChatEvent(name_ia=speaker, text=text, show_name_ia=True)))
 
-    # Starts the day phase with discussion
-    def start_day(self) -> List[ChatEvent]:
-        self.phase = "JourDiscussion"
-        events = [ChatEvent("Système", f"Début du Jour {self.day_count}.", True)]
-        events += self._generate_day_discussion(n_messages=10)
+        # Nothing usable in the answer: the agents speak one by one
+        if not events:
+            return self.speak(engine, alive_names, speakers)
         return events
 
-
-    # Starts the voting phase
-    def start_vote(self) -> List[ChatEvent]:
-        self.phase = "JourVote"
-        return [
-            ChatEvent(
-                "Système",
-                "Vote : clique sur le bouton \"Voter\" d'une IA vivante pour l'éliminer.",
-                True,
-            )
+    # Validated (speaker, text) of a generated line, or None
+    def _accept(self, engine: GameEngineCore, raw_name, raw_text) -> Optional[tuple[str, str]]:
+        if not isinstance(raw_name, str) or not isinstance(raw_text, str):
+            return None
+        index = engine.roster.index_of(raw_name)
+        if index is None or not engine.roster.is_alive(index):
+            return None
+        player = engine.players[index]
+
+        text = raw_text.strip().strip('"\'').split("\n")[0].strip()
+        if not text or (player.role == "loup" and _WOLF_CONFESSION.search(text)):
+            return None
+        if len(text) > self.max_line_length:
+            text = text[:self.max_line_length].rstrip() + "..."
+
+        # avoid repeating a recent message
+        rendered = f"{player.name}:{text}"
+        if rendered in engine.recent_messages:
+            return None
+        engine.recent_messages.append(rendered)
+        return player.name, text
+
+    # One object per speaking slot, the name of each slot fixed by the schema
+    def _schema(self, speakers: List[str]) -> dict:
+        slots = [
+            {
+                "type": "object",
+                "properties": {
+                    "name": {"const": name},
+                    "text": {"type": "string", "minLength": 1, "maxLength": self.max_line_length},
+                },
+                "required": ["name", "text"],
+            }
+            for name in speakers
         ]
+        return {
+            "type": "object",
+            "properties": {
+                "messages": {
+                    "type": "array",
+                    "prefixItems": slots,
+                    "items": False,
+                    "minItems": len(slots),
+                    "maxItems": len(slots),
+                },
+            },
+            "required": ["messages"],
+        }
+
+    # Whole discussion prompt: every speaker with its role constraints
+    def _prompt(self, engine: GameEngineCore, alive_names: List[str], speakers: List[str]) -> str:
+        wolves = [p.name for p in engine.players if p.alive and p.role == "loup"]
+        roles = []
+        for name in dict.fromkeys(speakers):
+            if name in wolves:
+                allies = ", ".join(w for w in wolves if w != name) or "aucun"
+                roles.append(f"- {name} (loup, alliés : {allies}) : se défend, sème le doute sur des villageois, "
+                             f"ne révèle jamais son rôle et n'accuse jamais ses alliés")
+            else:
+                roles.append(f"- {name} (villageois) : cherche les loups, analyse les discours, accuse avec des arguments")
 
-    # Casts a vote to eliminate a player
-    def cast_vote(self, target_index: int) -> List[ChatEvent]:
-        if self.phase != "JourVote":
-            return []
-
-        if target_index < 0 or target_index >= len(self.players):
-            return []
-        if not self.players[target_index].alive:
-            return []
-
-        self.kill_player(target_index)
-
-        # If the eliminated player is a wolf, add to found wolves
-        target = self.players[target_index]
-        if target.role == "loup":
-            self.found_wolves_names.add(target.name)
-
-        events: List[ChatEvent] = []
-        events.append(
-            ChatEvent(
-                "Système",
-                f"Le village élimine {self.players[target_index].name}.",
-                True,
-            )
-        )
+        eliminated = ", ".join(p.name for p in engine.players if not p.alive) or "aucun"
+        recent = "\n".join(f"{speaker}: {text}" for speaker, text in engine.public_chat_history[-6:]) or "(aucun)"
+        order = ", ".join(speakers)
 
-        # Passe à la nuit directement
-        self.phase = "Nuit"
-        events.append(ChatEvent("???", "La nuit tombe…", False))
-        events.append(ChatEvent("???", "…des pas dans l'ombre…", False))
-        return events
+        return f"""Tu écris la discussion du jour {engine.day_count} d'une partie de Loup-Garou.
+Joueurs vivants : {", ".join(alive_names)}
+Joueurs éliminés : {eliminated}
 
-    # Resolves the night and starts the next day
-    def resolve_night_and_start_next_day(self) -> List[ChatEvent]:
-        if self.phase != "Nuit":
-            return []
+Rôle secret et consigne de chaque joueur qui parle :
+{chr(10).join(roles)}
 
-        self._last_night_victim = None
+Messages précédents :
+{recent}
 
-        # Night : The wolves choose a victim
-        candidates = self.alive_villager_indexes()
-        if candidates:
-            victim = self.rng.choice(candidates)
-            self.kill_player(victim)
-            self._last_night_victim = victim
+Ordre de parole ({len(speakers)} répliques) : {order}
 
-        # Next day
-        self.day_count += 1
+RÈGLES :
+- Chaque réplique : UNE SEULE phrase (max 18 mots), FRANÇAIS UNIQUEMENT
+- Les joueurs se répondent et se citent par leur nom
+- Personne ne connaît le rôle des autres, sauf les loups entre eux
 
-        events: List[ChatEvent] = []
-        if self._last_night_victim is not None:
-            name = self.players[self._last_night_victim].name
-            events.append(
-                ChatEvent("Système", f"Au matin, on retrouve {name} mort.", True)
-            )
-        else:
-            events.append(ChatEvent("Système", "Au matin, personne n'est mort…", True))
+Réponds en JSON : {{"messages": [{{"name": "...", "text": "..."}}, ...]}} dans l'ordre de parole."""
 
-        # Start next day discussion
-        events += self.start_day()
-        return events
 
-    # Advances the game phase
-    def advance(self) -> List[ChatEvent]:
+# Main game engine class (Ollama agents)
+class GameEngine(GameEngineCore):
+    discussion_messages = 10
 
-        if self.phase == "JourDiscussion":
-            # If day 2 or later, go to vote
-            if self.day_count >= 2:
-                return self.start_vote()
-            else:
-                self.phase = "Nuit"
-                return [
-                    ChatEvent("???", "La nuit tombe…", False),
-                    ChatEvent("???", "…des pas dans l'ombre…", False),
-                ]
+    # to avoid blocking the UI during generation, we use a background thread and queue system
+    use_background_generation = True
 
-        if self.phase == "Nuit":
-            return self.resolve_night_and_start_next_day()
+    def __init__(self, num_players: int, seed: Optional[int] = None):
+        # OLLAMA_BATCH_DIALOGUE: one generation per discussion instead of one per message
+        try:
+            batch = load_ollama_config().batch_dialogue
+        except ValueError:
+            batch = False
+        dialogue_cls = OllamaBatchDialogue if batch else AgentDialogue
+
+        super().__init__(
+            num_players,
+            seed,
+            dialogue=dialogue_cls(Agent, AgentConfig, avoid_consecutive_speaker=True),
+        )
 
-        # No action for other phases
-        return []
+    # Forks keep using the agents' Ollama clients
+    def _fork_shared(self) -> List[object]:
+        return super()._fork_shared() + [agent.ollama_client for agent in self.agents.values()]
+
+    # Unloads the model the agents kept resident during the game (keep_alive 0)
+    def shutdown(self) -> None:
+        for agent in self.agents.values():
+            if agent.use_ollama and agent.ollama_client is not None:
+                try:
+                    agent.ollama_client.release(agent.ollama_model)
+                except (ConnectionError, ValueError):
+                    pass
+                return
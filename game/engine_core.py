@@ -0,0 +1,555 @@
+# Fichier : game/engine_core.py
+# Noyau commun des moteurs de jeu : joueurs, phases (jour, vote, nuit), votes et événements.
+# Chaque mode (algorithmique, Ollama, OpenRouter, Gemini) ne fournit que sa stratégie
+# de dialogue et sa stratégie de nuit.
+# Note : Commentaires en anglais pour uniformité avec engine.py.
+
+from __future__ import annotations
+
+import abc
+import copy
+import functools
+import hashlib
+import json
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from ai.journal import get_journal
+from ai.name_index import NameIndex
+from ai.rules import PublicState
+from ai.suspicion import MessageAnalysis, SuspicionMatrix, SuspicionScanner
+from ai.templates import TemplateBank, load_template_index
+from game.roster import PlayerRoster
+from game.structure_ai import Player
+
+
+# Journals a call the game makes into the engine (game/replay.py plays the calls
+# again), then the state digest it led to. Calls made from inside another call
+# are part of it and are not recorded. Hashing the whole state is costly, so the
+# digest is only computed when the journal asks for it (GAME_JOURNAL_DIGESTS), and
+# never at night, while the night decision may still be running in the background.
+def _journaled_call(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._in_call:
+            return method(self, *args, **kwargs)
+
+        self._in_call = True
+        try:
+            self._journal("call", method=method.__name__, args=list(args), kwargs=kwargs)
+            events = method(self, *args, **kwargs)
+        finally:
+            self._in_call = False
+
+        journal = get_journal()
+        if journal is not None and journal.digests and self.phase != "Nuit":
+            self._journal("state", digest=self.state_digest())
+        return events
+    return wrapper
+
+
+# Custom exception for API unavailability
+class ApiUnavailableError(RuntimeError):
+    pass
+
+
+# Data class for chat events
+@dataclass
+class ChatEvent:
+    name_ia: str            # Name of the player speaking
+    text: str               # Message content
+    show_name_ia: bool      # Whether the name should be visible (night mode)
+
+
+# Strategy producing the day discussion of an engine
+class DialogueBackend(abc.ABC):
+    # Called once the players exist (e.g. to create the agents)
+    def attach(self, engine: GameEngineCore) -> None:
+        pass
+
+    # Generates up to n_messages discussion events and records them in the engine
+    @abc.abstractmethod
+    def generate(self, engine: GameEngineCore, n_messages: int) -> List[ChatEvent]:
+        ...
+
+
+# Strategy choosing the night victim among the alive villagers
+class NightDecision:
+    # Called as soon as night falls, so a slow decision can start before the
+    # night is resolved (choose_victim then only waits for it)
+    def begin(self, engine: GameEngineCore) -> None:
+        pass
+
+    # True while a decision started by begin() is still running (it may be
+    # writing to the engine: the game must not be saved meanwhile)
+    def in_progress(self) -> bool:
+        return False
+
+    # Returns the victim index, or None to fall back to a random choice
+    def choose_victim(self, engine: GameEngineCore, candidates: List[int]) -> Optional[int]:
+        return None
+
+
+# Default night: the wolves pick a random villager
+class RandomNightDecision(NightDecision):
+    def choose_victim(self, engine: GameEngineCore, candidates: List[int]) -> Optional[int]:
+        return engine.rng.choice(candidates)
+
+
+# Dialogue where local agents (templates or Ollama) speak in turn
+class AgentDialogue(DialogueBackend):
+    def __init__(self, agent_cls, config_cls, avoid_consecutive_speaker: bool = False):
+        self.agent_cls = agent_cls
+        self.config_cls = config_cls
+        self.avoid_consecutive_speaker = avoid_consecutive_speaker
+
+    # Initialize agents
+    def attach(self, engine: GameEngineCore) -> None:
+        engine.templates = engine.template_bank.index.raw
+        for p in engine.players:
+            # Create agent configuration
+            cfg = self.config_cls(name=p.name, role=p.role)
+
+            # Use different seed for each agent for variability
+            engine.agents[p.name] = self.agent_cls(
+                cfg, engine.templates, seed=engine.rng.randrange(1_000_000),
+                suspicion=engine.suspicion.row(p.name),
+                template_bank=engine.template_bank,
+            )
+
+    # Draws the speaking order, optionally avoiding consecutive messages from same person
+    def draw_speakers(self, engine: GameEngineCore, alive_names: List[str], n_messages: int) -> List[str]:
+        speakers: List[str] = []
+        last_speaker = None
+        for _ in range(n_messages):
+            if self.avoid_consecutive_speaker:
+                available_speakers = [name for name in alive_names if name != last_speaker or len(alive_names) == 1]
+                speaker = engine.rng.choice(available_speakers or alive_names)
+            else:
+                speaker = engine.rng.choice(alive_names)
+            speakers.append(speaker)
+            last_speaker = speaker
+        return speakers
+
+    # Generates day discussion messages
+    def generate(self, engine: GameEngineCore, n_messages: int) -> List[ChatEvent]:
+        alive_names = engine.roster.alive_names()
+        return self.speak(engine, alive_names, self.draw_speakers(engine, alive_names, n_messages))
+
+    # Each speaker's agent writes its message in turn
+    def speak(self, engine: GameEngineCore, alive_names: List[str], speakers: List[str]) -> List[ChatEvent]:
+        events: List[ChatEvent] = []
+        for speaker in speakers:
+            agent = engine.agents[speaker]
+
+            # create public state for the agent
+            state = PublicState(
+                alive_names=alive_names,
+                chat_history=engine.public_chat_history,
+                day=engine.day_count,
+                analyses=engine.public_chat_analysis,
+            )
+
+            agent.observe_public(state)
+
+            # try to avoid repeating the same message recently
+            for _try in range(3):
+                msg = agent.decide_message(state)
+                rendered = f"{speaker}:{msg}"
+                if rendered not in engine.recent_messages:
+                    engine.recent_messages.append(rendered)
+                    break
+
+            # fallback if still repeating
+            else:
+                msg = agent.decide_message(state)
+
+            # engine records the message
+            engine._record_public_message(speaker, msg)
+            events.append(engine._publish(ChatEvent(name_ia=speaker, text=msg, show_name_ia=True)))
+
+        return events
+
+
+# Phase state machine shared by every game mode
+class GameEngineCore:
+    # Capabilities read by the GUI
+    supports_streaming_discussion = False
+    use_background_generation = False
+
+    # Mode specific texts and sizes
+    discussion_messages = 8
+
+    # Outcomes precomputed during the vote deliberation (see game/speculation.py)
+    speculative_branches = 0
+
+    # Start the night decision when night falls (off for an engine about to be replaced)
+    prefetch_night = True
+
+    # Journal records held back by a fork until it is adopted (None: written directly)
+    _journal_pending: Optional[list] = None
+    _in_call = False
+    vote_message = "Vote : clique sur le bouton \"Voter\" d'une IA vivante pour l'éliminer."
+    night_fall_messages = ("La nuit tombe…", "…des pas dans l'ombre…")
+    night_fall_messages_after_vote = ("La nuit tombe…", "…des pas dans l'ombre…")
+
+    def __init__(
+        self,
+        num_players: int,
+        seed: Optional[int] = None,
+        dialogue: Optional[DialogueBackend] = None,
+        night: Optional[NightDecision] = None,
+    ):
+        if num_players < 6:
+            raise ValueError("num_players must be >= 6")
+
+        # Random generator with optional seed for reproducibility (a random seed is
+        # drawn otherwise, so that every game can be replayed from its journal)
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        self.day_count = 1  # Start with day 1
+        self.phase = "JourDiscussion"  # Start with day phase for discussion
+
+        # Load AI names
+        with open("data/ai_names.json", "r", encoding="utf-8") as f:
+            self.characters_data = json.load(f)["characters"]
+
+        # Initialize players and roles
+        self.players: List[Player] = self._create_players(num_players)
+
+        # Normalized name lookup shared by the roster, the suspicion code and the LLM parsers
+        self.name_index = NameIndex(p.name for p in self.players)
+        self.roster = PlayerRoster(self.players, self.name_index)
+
+        # Used to track the last night victim
+        self._last_night_victim: Optional[int] = None
+
+        # Track found wolves' names
+        self.found_wolves_names: set[str] = set()
+
+        # Indexed template bank (system texts, template agents)
+        self.template_bank = TemplateBank(load_template_index("data/dialogue_ai_template.json"))
+
+        # Recent messages for context (to avoid repetition with the same message)
+        self.recent_messages = deque(maxlen=60)
+
+        # Each public message is analysed once (mentions, suspicion keywords)
+        # and folded into the players x players suspicion matrix read by every agent
+        self.suspicion_scanner = SuspicionScanner(self.name_index.names)
+        self.public_chat_analysis: list[MessageAnalysis] = []
+        self.suspicion = SuspicionMatrix(self.name_index.names)
+
+        # Optional callback receiving each event of a day as soon as it exists,
+        # in the order of the returned lists (the GUI shows them while the rest
+        # of the day is still being generated)
+        self.event_sink: Optional[Callable[[ChatEvent], None]] = None
+
+        # Strategies of the game mode
+        self.agents: Dict[str, object] = {}
+        self.dialogue = dialogue
+        self.night = night or RandomNightDecision()
+        if self.dialogue is not None:
+            self.dialogue.attach(self)
+
+        # Public chat history
+        self.public_chat_history: list[tuple[str, str]] = []
+
+        self._journal("game", mode=type(self).__module__, seed=self.seed,
+                      players=[{"name": p.name, "role": p.role} for p in self.players])
+
+    # Creates players with assigned roles (about 1/4 of players are wolves)
+    def _create_players(self, num_players: int) -> List[Player]:
+        selected_chars = self.rng.sample(self.characters_data, num_players)
+        num_wolves = max(1, num_players // 4)
+
+        roles = ["loup"] * num_wolves + ["villageois"] * (num_players - num_wolves)
+        self.rng.shuffle(roles)
+
+        return [
+            Player(
+                name=char["name"],
+                role=r,
+                alive=True,
+                note=0,
+                voice_id=char.get("voice_id", "JBFqnCBsd6RMkjVDRZzb"),
+            )
+            for char, r in zip(selected_chars, roles)
+        ]
+
+    # Records a public message along with its cached analysis
+    def _record_public_message(self, speaker: str, msg: str) -> None:
+        self.public_chat_history.append((speaker, msg))
+        analysis = self.suspicion_scanner.analyse(speaker, msg)
+        self.public_chat_analysis.append(analysis)
+        self.suspicion.observe(analysis)
+
+    # Hands an event to the sink (if any) and returns it
+    def _publish(self, event: ChatEvent) -> ChatEvent:
+        self._journal("event", speaker=event.name_ia, text=event.text, visible=event.show_name_ia,
+                      day=self.day_count, phase=self.phase)
+        if self.event_sink is not None:
+            self.event_sink(event)
+        return event
+
+    # Appends a record to the event journal (GAME_JOURNAL), if enabled
+    def _journal(self, kind: str, **fields) -> None:
+        if self._journal_pending is not None:
+            self._journal_pending.append((kind, fields))
+            return
+        journal = get_journal()
+        if journal is not None:
+            journal.record(kind, **fields)
+
+    # Holds back the journal records of this engine from now on, dropping those
+    # held so far (a fork playing ahead is not the game until it is adopted)
+    def hold_journal(self) -> None:
+        self._journal_pending = []
+
+    # Writes the records held back and journals directly from now on
+    def release_journal(self) -> None:
+        pending, self._journal_pending = self._journal_pending or [], None
+        for kind, fields in pending:
+            self._journal(kind, **fields)
+
+    # Helpers to get alive player indexes
+    def alive_indexes(self) -> List[int]:
+        return self.roster.alive_indexes()
+
+    # Helpers to get alive wolf indexes
+    def alive_wolf_indexes(self) -> List[int]:
+        return self.roster.alive_wolf_indexes()
+
+    # Helpers to get alive villager indexes
+    def alive_villager_indexes(self) -> List[int]:
+        return self.roster.alive_villager_indexes()
+
+    # Helpers to get all wolves' names
+    def all_wolves_names(self) -> list[str]:
+        return self.roster.all_wolves_names()
+
+    # Helpers to get found wolves' names as a sorted list
+    def found_wolves_list(self) -> list[str]:
+        # tri stable pour l'affichage
+        return sorted(self.found_wolves_names)
+
+    # Determines if there is a winner
+    def get_winner(self) -> Optional[str]:
+        return self.roster.winner()
+
+    # Kills a player by index
+    def kill_player(self, index: int) -> None:
+        self.roster.kill(index)
+
+    # Hooks called on phase changes (engines keeping an LLM context record them)
+    def _on_day_start(self) -> None:
+        pass
+
+    def _on_vote_start(self) -> None:
+        pass
+
+    def _on_elimination(self, target: Player) -> None:
+        pass
+
+    def _on_night_start(self) -> None:
+        pass
+
+    def _on_morning(self, victim: Optional[Player]) -> None:
+        pass
+
+    # Releases the resources of the game mode once the game is over (models, pools)
+    def shutdown(self) -> None:
+        pass
+
+    # Game state as plain data (game/snapshot.py). API clients and read-only
+    # data are not saved: the constructor rebuilds them before restore_state()
+    def snapshot_state(self) -> dict:
+        return {
+            "seed": self.seed,
+            "rng": self.rng.getstate(),
+            "day_count": self.day_count,
+            "phase": self.phase,
+            "players": [
+                {"name": p.name, "role": p.role, "alive": p.alive, "note": p.note, "voice_id": p.voice_id}
+                for p in self.players
+            ],
+            "last_night_victim": self._last_night_victim,
+            "found_wolves": sorted(self.found_wolves_names),
+            "recent_messages": list(self.recent_messages),
+            "chat": list(self.public_chat_history),
+            "suspicion": self.suspicion.values.tolist(),
+            "templates": self.template_bank.snapshot_state(),
+            "agents": {name: agent.snapshot_state() for name, agent in self.agents.items()},
+        }
+
+    # Puts a saved game back into a freshly built engine of the same mode
+    def restore_state(self, state: dict) -> None:
+        self.seed = state.get("seed", self.seed)
+        self.players = [Player(**p) for p in state["players"]]
+        self.name_index = NameIndex(p.name for p in self.players)
+        self.roster = PlayerRoster(self.players, self.name_index)
+        self.day_count = state["day_count"]
+        self.phase = state["phase"]
+        self._last_night_victim = state["last_night_victim"]
+        self.found_wolves_names = set(state["found_wolves"])
+        self.recent_messages = deque(state["recent_messages"], maxlen=self.recent_messages.maxlen)
+        self.template_bank.restore_state(state["templates"])
+
+        # analyses are recomputed (no LLM involved), the matrix is restored as saved
+        self.suspicion_scanner = SuspicionScanner(self.name_index.names)
+        self.public_chat_history = [tuple(m) for m in state["chat"]]
+        self.public_chat_analysis = [self.suspicion_scanner.analyse(s, t) for s, t in self.public_chat_history]
+        self.suspicion = SuspicionMatrix(self.name_index.names)
+        self.suspicion.values[:] = state["suspicion"]
+
+        # agents are rebuilt for the restored players, then get their own state back
+        self.agents = {}
+        if self.dialogue is not None:
+            self.dialogue.attach(self)
+        for name, agent_state in state["agents"].items():
+            if name in self.agents:
+                self.agents[name].restore_state(agent_state)
+
+        self.rng.setstate(state["rng"])
+        self._journal("resume", mode=type(self).__module__, day=self.day_count, phase=self.phase)
+
+    # Digest of snapshot_state(): two engines with the same digest hold the same game
+    # (chat, context, suspicion, agents, rng). The player's notes are left out: the
+    # interface edits them between the journaled calls, so a replay cannot redo them.
+    def state_digest(self) -> str:
+        state = self.snapshot_state()
+        state["players"] = [{k: v for k, v in p.items() if k != "note"} for p in state["players"]]
+        encoded = json.dumps(state, sort_keys=True, separators=(",", ":"),
+                             default=lambda value: value.hex() if isinstance(value, bytes) else repr(value))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    # Objects a fork shares with this engine instead of copying them
+    # (read-only data here; engines add their API clients)
+    def _fork_shared(self) -> List[object]:
+        return [self.characters_data, self.name_index, self.suspicion_scanner, self.template_bank.index]
+
+    # Independent copy of the game state (players, chat, suspicion, agents, rng)
+    # that can play ahead without touching this engine
+    def fork(self) -> GameEngineCore:
+        memo = {id(obj): obj for obj in self._fork_shared() if obj is not None}
+        clone = copy.deepcopy(self, memo)
+        clone.event_sink = None
+        clone.hold_journal()
+        return clone
+
+    # Generates the day discussion with the mode's dialogue backend
+    @_journaled_call
+    def generate_day_discussion(self, n_messages: Optional[int] = None) -> List[ChatEvent]:
+        if self.dialogue is None:
+            return []
+        return self.dialogue.generate(self, n_messages or self.discussion_messages)
+
+    # Starts the day phase with discussion
+    @_journaled_call
+    def start_day(self) -> List[ChatEvent]:
+        self.phase = "JourDiscussion"
+        self._journal("phase", phase=self.phase, day=self.day_count)
+        self._on_day_start()
+        events = [self._publish(ChatEvent("Système", f"Début du Jour {self.day_count}.", True))]
+        events += self.generate_day_discussion()
+        return events
+
+    # Starts the voting phase
+    @_journaled_call
+    def start_vote(self) -> List[ChatEvent]:
+        self.phase = "JourVote"
+        self._journal("phase", phase=self.phase, day=self.day_count)
+        self._on_vote_start()
+        return [self._publish(ChatEvent("Système", self.vote_message, True))]
+
+    # Casts a vote to eliminate a player
+    @_journaled_call
+    def cast_vote(self, target_index: int) -> List[ChatEvent]:
+        if self.phase != "JourVote":
+            return []
+
+        if target_index < 0 or target_index >= len(self.players):
+            return []
+        if not self.roster.is_alive(target_index):
+            return []
+
+        self.kill_player(target_index)
+
+        # If the eliminated player is a wolf, add to found wolves
+        target = self.players[target_index]
+        if target.role == "loup":
+            self.found_wolves_names.add(target.name)
+        self._journal("vote", target=target_index, day=self.day_count)
+        self._journal("death", name=target.name, role=target.role, cause="vote", day=self.day_count)
+
+        events: List[ChatEvent] = [self._publish(ChatEvent("Système", f"Le village élimine {target.name}.", True))]
+        self._on_elimination(target)
+
+        # Passe à la nuit directement
+        self._begin_night()
+        events += [self._publish(ChatEvent("???", text, False)) for text in self.night_fall_messages_after_vote]
+        return events
+
+    # Night falls: the wolves may start deciding while the night texts are shown
+    def _begin_night(self) -> None:
+        self.phase = "Nuit"
+        self._journal("phase", phase=self.phase, day=self.day_count)
+        self._on_night_start()
+        if self.prefetch_night:
+            self.night.begin(self)
+
+    # Resolves the night and starts the next day; the morning announcement is
+    # published as soon as the victim is known, before the discussion is generated
+    def resolve_night_and_start_next_day(self) -> List[ChatEvent]:
+        if self.phase != "Nuit":
+            return []
+
+        self._last_night_victim = None
+
+        # Night : The wolves choose a victim
+        candidates = self.alive_villager_indexes()
+        if candidates:
+            victim = self.night.choose_victim(self, candidates)
+            if victim is None:
+                victim = self.rng.choice(candidates)
+            self.kill_player(victim)
+            self._last_night_victim = victim
+            victim_player = self.players[victim]
+            self._journal("death", name=victim_player.name, role=victim_player.role, cause="night", day=self.day_count)
+
+        # Next day
+        self.day_count += 1
+
+        events: List[ChatEvent] = []
+        if self._last_night_victim is not None:
+            victim_player = self.players[self._last_night_victim]
+            events.append(self._publish(ChatEvent("Système", f"Au matin, on retrouve {victim_player.name} mort.", True)))
+            self._on_morning(victim_player)
+        else:
+            events.append(self._publish(ChatEvent("Système", "Au matin, personne n'est mort…", True)))
+            self._on_morning(None)
+
+        # Start next day discussion
+        events += self.start_day()
+        return events
+
+    # Advances the game phase
+    @_journaled_call
+    def advance(self) -> List[ChatEvent]:
+        if self.phase == "JourDiscussion":
+            # If day 2 or later, go to vote
+            if self.day_count >= 2:
+                return self.start_vote()
+
+            self._begin_night()
+            return [self._publish(ChatEvent("???", text, False)) for text in self.night_fall_messages]
+
+        if self.phase == "Nuit":
+            return self.resolve_night_and_start_next_day()
+
+        # No action for other phases
+        return []
@@ -4,49 +4,165 @@
 
 from __future__ import annotations
 
-import json
-import os
-import random
-from collections import deque
-from dataclasses import dataclass
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Optional
 
 from ai.client import OpenRouterClient, OpenRouterClientConfig
 from game.structure_ai import Player
 from game.agent import Agent
 from game.context_manager import GameContextManager
+from game.engine_core import (  # ChatEvent / ApiUnavailableError kept importable from here
+    ApiUnavailableError,
+    ChatEvent,
+    DialogueBackend,
+    GameEngineCore,
+    NightDecision,
+)
 import game.constants
+from config import load_openrouter_turns_config
 
-# Custom exception for API unavailability
-class ApiUnavailableError(RuntimeError):
-    pass
 
-# Data class for chat events
-@dataclass
-class ChatEvent:
-    name_ia: str
-    text: str
-    show_name_ia: bool
+# Dialogue where each OpenRouter agent plays its turn against the shared context.
+# Turns run in waves of up to `parallel_turns` concurrent requests: every prompt
+# of a wave is built from the context as it was before the wave (frozen), the
+# results are committed in speaking order, and a wave never holds more than
+# max_staleness + 1 turns, so no agent misses more than max_staleness messages.
+# A speaker drawn twice starts a new wave: its second turn must see its first.
+# Off by default (OPENROUTER_PARALLEL_TURNS=1): turns are played one at a time.
+class OpenRouterDialogue(DialogueBackend):
+    def __init__(self, parallel_turns: int = 1, max_staleness: int = 0):
+        self.wave_size = max(1, min(parallel_turns, max_staleness + 1))
 
+    # Create AI agents for each player (using OpenRouter agents)
+    def attach(self, engine: GameEngine) -> None:
+        for p in engine.players:
+            engine.agents[p.name] = Agent(p.name, p.role)
 
-# Main game engine class with OpenRouter
-class GameEngine:
-    def __init__(self, num_players: int, seed: Optional[int] = None):
-        if num_players < 6:
-            raise ValueError("num_players must be >= 6")
+    # Generates day discussion messages using OpenRouter
+    def generate(self, engine: GameEngine, n_messages: int) -> List[ChatEvent]:
+        # Update game state context before discussion
+        engine._update_game_state_context()
 
-        # Random generator with optional seed for reproducibility
-        self.rng = random.Random(seed)
+        alive_names = engine.roster.alive_names()
+        speakers = [engine.rng.choice(alive_names) for _ in range(n_messages)]
 
-        self.day_count = 1
-        self.phase = "JourDiscussion"
-        self.supports_streaming_discussion = False
+        events: List[ChatEvent] = []
+        pool = ThreadPoolExecutor(max_workers=self.wave_size) if self.wave_size > 1 else None
+        try:
+            for wave in self._waves(speakers):
+                for speaker_name, current_play in zip(wave, self._play_wave(engine, pool, wave)):
+                    self._commit_turn(engine, speaker_name, current_play, events)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
 
-        # Load AI names
-        with open("data/ai_names.json", "r", encoding="utf-8") as f:
-            self.characters_data = json.load(f)["characters"]
+        return events
+
+    # Splits the speaking order into waves of distinct speakers, wave_size at most
+    def _waves(self, speakers: List[str]) -> List[List[str]]:
+        waves: List[List[str]] = []
+        for name in speakers:
+            if not waves or len(waves[-1]) >= self.wave_size or name in waves[-1]:
+                waves.append([])
+            waves[-1].append(name)
+        return waves
+
+    # Runs the requests of one wave and returns the plays in speaking order
+    def _play_wave(self, engine: GameEngine, pool: Optional[ThreadPoolExecutor], wave: List[str]):
+        try:
+            # Prompts are built on this thread, before any result of the wave is committed
+            prompts = [engine.agents[name].prepare(engine.phase, engine.context_manager) for name in wave]
+            if pool is None:
+                return [engine.agents[wave[0]].request(engine.client, prompts[0])]
+
+            futures = [
+                pool.submit(engine.agents[name].request, engine.client, messages)
+                for name, messages in zip(wave, prompts)
+            ]
+            return [future.result() for future in futures]
+
+        except Exception as e:
+            raise ApiUnavailableError(f"OpenRouter: {e}") from e
+
+    # Records one turn in the context, the public history and the events
+    def _commit_turn(self, engine: GameEngine, speaker_name: str, current_play, events: List[ChatEvent]) -> None:
+        engine.agents[speaker_name].commit(current_play, engine.context_manager)
+        msg = current_play.dialogue
+
+        # Try to avoid repeating the same message recently
+        rendered = f"{speaker_name}:{msg}"
+        if rendered not in engine.recent_messages:
+            engine.recent_messages.append(rendered)
+
+        # Engine records the message
+        engine._record_public_message(speaker_name, msg)
+        events.append(engine._publish(ChatEvent(name_ia=speaker_name, text=msg, show_name_ia=True)))
+
+        # Add dialogue to global context in a readable format
+        engine.context_manager.add_global_context({
+            "type": "dialogue",
+            "content": f"{speaker_name} dit: \"{msg}\""
+        })
+
+
+# Night where the first alive wolf chooses the victim through OpenRouter. The
+# request starts when night falls and runs while the night texts are shown.
+class WolfAgentNight(NightDecision):
+    def __init__(self):
+        self._pending: Optional[Future] = None
+
+    def begin(self, engine: GameEngine) -> None:
+        self._pending = None
+        alive_wolves = engine.alive_wolf_indexes()
+        if not alive_wolves:
+            return
+
+        wolf_agent = engine.agents[engine.players[alive_wolves[0]].name]
+        future: Future = Future()
+
+        def worker():
+            try:
+                future.set_result(wolf_agent.play("Nuit", engine.client, engine.context_manager))
+            except Exception as e:
+                future.set_exception(e)
 
+        threading.Thread(target=worker, name="wolf-night", daemon=True).start()
+        self._pending = future
+
+    def in_progress(self) -> bool:
+        return self._pending is not None and not self._pending.done()
+
+    def choose_victim(self, engine: GameEngine, candidates: List[int]) -> Optional[int]:
+        alive_wolves = engine.alive_wolf_indexes()
+        if not alive_wolves:
+            return None
+
+        pending, self._pending = self._pending, None
+        wolf_agent = engine.agents[engine.players[alive_wolves[0]].name]
+        try:
+            if pending is not None:
+                night_play = pending.result()
+            else:
+                night_play = wolf_agent.play("Nuit", engine.client, engine.context_manager)
+        except Exception:
+            # Fallback to random selection if OpenRouter fails
+            return None
+
+        # Find target by name (must be an alive villager)
+        victim_index = engine.roster.index_of(night_play.cible) if night_play.cible else None
+        if victim_index is None or not engine.roster.is_alive(victim_index):
+            return None
+        if engine.players[victim_index].role == "loup":
+            return None
+        return victim_index
+
+
+# Main game engine class with OpenRouter
+class GameEngine(GameEngineCore):
+    discussion_messages = 8
 
+    def __init__(self, num_players: int, seed: Optional[int] = None):
         # Initialize OpenRouter client
         # os.getenv("OPENROUTER_API_KEY")
         key = getattr(game.constants, "OPENROUTER_API_KEY", "") or ""
@@ -57,20 +173,9 @@ class GameEngine:
         self.client = OpenRouterClient(OpenRouterClientConfig(key))
         self.context_manager = GameContextManager()
 
-        # Initialize players and roles
-        self.players: List[Player] = self._create_players(num_players)
-
-        # Used to track the last night victim
-        self._last_night_victim: Optional[int] = None
-
-        # Track found wolves' names
-        self.found_wolves_names: set[str] = set()
-
-        # Create AI agents for each player (using OpenRouter agents)
-        self.agents = {}
-        for p in self.players:
-            agent = Agent(p.name, p.role)  # Using the OpenRouter Agent
-            self.agents[p.name] = agent
+        turns = load_openrouter_turns_config()
+        dialogue = OpenRouterDialogue(turns.parallel_turns, turns.max_staleness)
+        super().__init__(num_players, seed, dialogue=dialogue, night=WolfAgentNight())
 
         # Initialize the game context
         self._initialize_game_context()
@@ -79,73 +184,10 @@ class GameEngine:
         for player in self.players:
             self.context_manager.set_player_role(player.name, player.role)
 
-        # Public chat history
-        self.public_chat_history: list[tuple[str, str]] = []
-
-        # Recent messages for context (to avoid repetition)
-        self.recent_messages = deque(maxlen=60)
-
-    # Creates players with assigned roles
-    def _create_players(self, num_players: int) -> List[Player]:
-        selected_chars = self.rng.sample(self.characters_data, num_players)
-        num_wolves = max(1, num_players // 4)
-
-        roles = ["loup"] * num_wolves + ["villageois"] * (num_players - num_wolves)
-        self.rng.shuffle(roles)
-
-        return [
-            Player(
-                name=char["name"],
-                role=r,
-                alive=True,
-                note=0,
-                voice_id=char.get("voice_id", "JBFqnCBsd6RMkjVDRZzb"),
-            )
-            for char, r in zip(selected_chars, roles)
-        ]
-
-
-    # Helpers to get alive player indexes
-    def alive_indexes(self) -> List[int]:
-        return [i for i, p in enumerate(self.players) if p.alive]
-
-    # Helpers to get alive wolf indexes
-    def alive_wolf_indexes(self) -> List[int]:
-        return [i for i, p in enumerate(self.players) if p.alive and p.role == "loup"]
-
-    # Helpers to get alive villager indexes
-    def alive_villager_indexes(self) -> List[int]:
-        return [i for i, p in enumerate(self.players) if p.alive and p.role != "loup"]
-
-    # Helpers to get all wolves' names
-    def all_wolves_names(self) -> list[str]:
-        return [p.name for p in self.players if p.role == "loup"]
-
-    # Helpers to get found wolves' names as a sorted list
-    def found_wolves_list(self) -> list[str]:
-        return sorted(self.found_wolves_names)
-
-    # Determines if there is a winner
-    def get_winner(self) -> Optional[str]:
-        wolves = len(self.alive_wolf_indexes())
-        villagers = len(self.alive_villager_indexes())
-
-        if wolves == 0:
-            return "village"
-        if wolves >= villagers:
-            return "loups"
-        return None
-
-    # Kills a player by index
-    def kill_player(self, index: int) -> None:
-        p = self.players[index]
-        p.alive = False
-        p.note = 0  # reset note on death
-
     # Initialize the game context with initial state
     def _initialize_game_context(self):
         # Add initial game state to context
-        alive_players = [p.name for p in self.players if p.alive]
+        alive_players = self.roster.alive_names()
         initial_context = {
             "type": "game_start",
             "content": f"Période: JourDiscussion. Jour {self.day_count}. Joueurs vivants: {', '.join(alive_players)}. La partie commence!"
@@ -153,9 +195,9 @@ class GameEngine:
         self.context_manager.add_global_context(initial_context)
 
         # Add role information to each player's private context
+        wolves = self.all_wolves_names()
         for player in self.players:
             if player.role == "loup":
-                wolves = [p.name for p in self.players if p.role == "loup"]
                 role_info = {
                     "type": "role_info",
                     "content": f"Tu es un Loup-Garou. Tes alliés loups sont: {', '.join([w for w in wolves if w != player.name])}."
@@ -169,7 +211,7 @@ class GameEngine:
 
     # Update context with current game state
     def _update_game_state_context(self):
-        alive_players = [p.name for p in self.players if p.alive]
+        alive_players = self.roster.alive_names()
         dead_players = [p.name for p in self.players if not p.alive]
 
         state_context = {
@@ -178,227 +220,57 @@ class GameEngine:
         }
         self.context_manager.add_global_context(state_context)
 
-    # Generates day discussion messages using OpenRouter
-    def _generate_day_discussion(self, n_messages: int = 10) -> list[ChatEvent]:
-        # Update game state context before discussion
-        self._update_game_state_context()
-
-        alive_names = [p.name for p in self.players if p.alive]
-
-        # Generate messages using OpenRouter
-        events: list[ChatEvent] = []
-        for _ in range(n_messages):
-            speaker_name = self.rng.choice(alive_names)
-            agent = self.agents[speaker_name]
-
-            try:
-                # Get current phase for context
-                current_phase = self.phase
-
-                # Use the agent's play method to generate discussion
-                current_play = agent.play(current_phase, self.client, self.context_manager)
-                msg = current_play.dialogue
-
-                # Try to avoid repeating the same message recently
-                rendered = f"{speaker_name}:{msg}"
-                if rendered not in self.recent_messages:
-                    self.recent_messages.append(rendered)
-
-                # Engine records the message
-                self.public_chat_history.append((speaker_name, msg))
-                events.append(ChatEvent(name_ia=speaker_name, text=msg, show_name_ia=True))
-
-                # Add dialogue to global context in a readable format
-                dialogue_context = {
-                    "type": "dialogue",
-                    "content": f"{speaker_name} dit: \"{msg}\""
-                }
-                self.context_manager.add_global_context(dialogue_context)
-
-            except Exception as e:
-                raise ApiUnavailableError(f"OpenRouter: {e}") from e
-            
-        return events
-
-    # Starts the day phase with discussion
-    def start_day(self) -> List[ChatEvent]:
-        self.phase = "JourDiscussion"
-
-        # Add day start to context
-        day_start_context = {
+    # Add day start to context
+    def _on_day_start(self) -> None:
+        self.context_manager.add_global_context({
             "type": "phase_change",
             "content": f"Période: JourDiscussion. Début du Jour {self.day_count}."
-        }
-        self.context_manager.add_global_context(day_start_context)
-
-        events = [ChatEvent("Système", f"Début du Jour {self.day_count}.", True)]
-        events += self._generate_day_discussion(n_messages=8)
-        return events
+        })
 
-    # Starts the voting phase
-    def start_vote(self) -> List[ChatEvent]:
-        self.phase = "JourVote"
-
-        # Add vote phase to context
-        vote_context = {
+    # Add vote phase to context
+    def _on_vote_start(self) -> None:
+        self.context_manager.add_global_context({
             "type": "phase_change",
             "content": "Période: JourVote. La phase de vote commence. Les joueurs doivent élire quelqu'un à éliminer."
-        }
-        self.context_manager.add_global_context(vote_context)
-
-        return [
-            ChatEvent(
-                "Système",
-                "Vote : clique sur le bouton \"Voter\" d'une IA vivante pour l'éliminer.",
-                True,
-            )
-        ]
-
-    # Casts a vote to eliminate a player
-    def cast_vote(self, target_index: int) -> List[ChatEvent]:
-        if self.phase != "JourVote":
-            return []
+        })
 
-        if target_index < 0 or target_index >= len(self.players):
-            return []
-        if not self.players[target_index].alive:
-            return []
-
-        self.kill_player(target_index)
-
-        # If the eliminated player is a wolf, add to found wolves
-        target = self.players[target_index]
-        if target.role == "loup":
-            self.found_wolves_names.add(target.name)
-
-        events: List[ChatEvent] = []
-        events.append(
-            ChatEvent(
-                "Système",
-                f"Le village élimine {self.players[target_index].name}.",
-                True,
-            )
-        )
-
-        # Add elimination to context
-        elimination_context = {
+    # Add elimination to context
+    def _on_elimination(self, target: Player) -> None:
+        self.context_manager.add_global_context({
             "type": "elimination",
             "content": f"Le village a voté pour éliminer {target.name} (rôle: {target.role}). {target.name} est mort."
-        }
-        self.context_manager.add_global_context(elimination_context)
-
-        # Passe à la nuit directement
-        self.phase = "Nuit"
+        })
 
-        # Add night phase to context
-        night_context = {
+    # Add night phase to context
+    def _on_night_start(self) -> None:
+        self.context_manager.add_global_context({
             "type": "phase_change",
             "content": "Période: Nuit. La nuit tombe, les loups-garous vont agir."
-        }
-        self.context_manager.add_global_context(night_context)
-
-        events.append(ChatEvent("???", "La nuit tombe…", False))
-        events.append(ChatEvent("???", "…des pas dans l'ombre…", False))
-        return events
-
-    # Resolves the night and starts the next day
-    def resolve_night_and_start_next_day(self) -> List[ChatEvent]:
-        if self.phase != "Nuit":
-            return []
-
-        self._last_night_victim = None
-
-        # Night : The wolves choose a victim using OpenRouter
-        candidates = self.alive_villager_indexes()
-        if candidates:
-            # Use OpenRouter to let wolves decide on a victim
-            alive_wolves = [p for p in self.players if p.alive and p.role == "loup"]
-            if alive_wolves:
-                wolf_agent = self.agents[alive_wolves[0].name]
-                try:
-                    night_play = wolf_agent.play("Nuit", self.client, self.context_manager)
-
-                    # Find target by name
-                    victim_index = None
-                    if night_play.cible:
-                        for i, player in enumerate(self.players):
-                            if player.name == night_play.cible and player.alive and player.role != "loup":
-                                victim_index = i
-                                break
-
-                    if victim_index is not None:
-                        self.kill_player(victim_index)
-                        self._last_night_victim = victim_index
-                    else:
-                        # Fallback to random selection
-                        victim = self.rng.choice(candidates)
-                        self.kill_player(victim)
-                        self._last_night_victim = victim
-
-                except Exception:
-                    # Fallback to random selection if OpenRouter fails
-                    victim = self.rng.choice(candidates)
-                    self.kill_player(victim)
-                    self._last_night_victim = victim
-            else:
-                # No wolves left, pick random victim
-                victim = self.rng.choice(candidates)
-                self.kill_player(victim)
-                self._last_night_victim = victim
-
-        # Next day
-        self.day_count += 1
-
-        events: List[ChatEvent] = []
-        if self._last_night_victim is not None:
-            victim_name = self.players[self._last_night_victim].name
-            events.append(
-                ChatEvent("Système", f"Au matin, on retrouve {victim_name} mort.", True)
-            )
-
-            # Add night death to context
-            death_context = {
+        })
+
+    # The context built by the LLM calls is saved with the game
+    def snapshot_state(self) -> dict:
+        state = super().snapshot_state()
+        state["context"] = self.context_manager.snapshot_state()
+        return state
+
+    def restore_state(self, state: dict) -> None:
+        super().restore_state(state)
+        self.context_manager.restore_state(state["context"])
+
+    # Forks keep using the same client (shared rate limiter and connection pool)
+    def _fork_shared(self) -> List[object]:
+        return super()._fork_shared() + [self.client]
+
+    # Add night death (or no death) to context
+    def _on_morning(self, victim: Optional[Player]) -> None:
+        if victim is not None:
+            self.context_manager.add_global_context({
                 "type": "night_death",
-                "content": f"Au matin du jour {self.day_count}, {victim_name} a été trouvé mort, tué par les loups-garous pendant la nuit."
-            }
-            self.context_manager.add_global_context(death_context)
+                "content": f"Au matin du jour {self.day_count}, {victim.name} a été trouvé mort, tué par les loups-garous pendant la nuit."
+            })
         else:
-            events.append(ChatEvent("Système", "Au matin, personne n'est mort…", True))
-
-            # Add no death to context
-            no_death_context = {
+            self.context_manager.add_global_context({
                 "type": "night_result",
                 "content": f"Au matin du jour {self.day_count}, personne n'est mort pendant la nuit."
-            }
-            self.context_manager.add_global_context(no_death_context)
-
-        # Start next day discussion
-        events += self.start_day()
-        return events
-
-    # Advances the game phase
-    def advance(self) -> List[ChatEvent]:
-        if self.phase == "JourDiscussion":
-            # If day 2 or later, go to vote
-            if self.day_count >= 2:
-                return self.start_vote()
-            else:
-                self.phase = "Nuit"
-
-                # Add night phase to context
-                night_context = {
-                    "type": "phase_change",
-                    "content": "Période: Nuit. La nuit tombe, les loups-garous vont agir."
-                }
-                self.context_manager.add_global_context(night_context)
-
-                return [
-                    ChatEvent("???", "La nuit tombe…", False),
-                    ChatEvent("???", "…des pas dans l'ombre…", False),
-                ]
-
-        if self.phase == "Nuit":
-            return self.resolve_night_and_start_next_day()
-
-        # No action for other phases
-        return []
+            })
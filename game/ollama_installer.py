@@ -1,15 +1,12 @@
+import json
 import threading
 import time
 import webbrowser
 import requests
 import os
 import shutil
-
-# Re gexes for parsing ollama output
-import re
-ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
-PCT_RE = re.compile(r"(\d{1,3})%")
-SIZE_RE = re.compile(r"(\d+(\.\d+)?)\s*GB\s*/\s*(\d+(\.\d+)?)\s*GB")
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
 
 # Ollama-related utilities: checking status, pulling models, etc.
 OLLAMA_URL = "http://localhost:11434"
@@ -75,110 +72,233 @@ def find_ollama_exe() -> str | None:
 
     return None
 
-# Pulls a model from Ollama in a background thread, providing callbacks for progress, status updates, completion, and errors
-def pull_model_async(model_name: str, on_done=None, on_error=None, on_progress=None, on_status=None):
-    import subprocess, threading, os, time
+# Progress of a pull as reported by Ollama's /api/pull stream. Byte counts cover
+# every layer seen so far; throughput is smoothed over the last seconds.
+@dataclass(frozen=True)
+class PullProgress:
+    status: str  # "pulling manifest", "pulling <digest>", "verifying sha256 digest", "success", ...
+    digest: str = ""  # layer being downloaded ("" outside of downloads)
+    completed: int = 0  # bytes downloaded (all layers)
+    total: int = 0  # bytes to download (all layers seen so far)
+    bytes_per_second: float = 0.0
+    eta_seconds: Optional[float] = None
 
-    def worker():
-        try:
-            exe = find_ollama_exe()
-            if not exe:
-                msg = "Ollama introuvable (PATH)."
-                print(f"[OLLAMA] ERROR: {msg}")
-                if on_error: on_error(msg)
+    @property
+    def percent(self) -> int:
+        if self.total <= 0:
+            return 0
+        return max(0, min(100, int(self.completed * 100 / self.total)))
+
+    # Short French line for the UI, e.g. "1.9 / 4.1 Go · 35.2 Mo/s · ~1 min"
+    def describe(self) -> str:
+        if not self.digest or self.total <= 0:
+            return self.status
+        parts = [f"{self.completed / 1e9:.1f} / {self.total / 1e9:.1f} Go"]
+        if self.bytes_per_second > 0:
+            parts.append(f"{self.bytes_per_second / 1e6:.1f} Mo/s")
+        if self.eta_seconds is not None:
+            parts.append(f"~{_format_duration(self.eta_seconds)}")
+        return " · ".join(parts)
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{int(seconds)} s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min"
+    return f"{int(seconds // 3600)} h {int(seconds % 3600 // 60):02d}"
+
+
+# Raised inside the pull when its handle is cancelled
+class PullCancelled(Exception):
+    pass
+
+
+# Handle of a running pull: cancel() stops it (the layers already downloaded stay
+# in Ollama's store, so pulling the same model again resumes where it stopped)
+class PullHandle:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.cancelled = False
+        self.done = threading.Event()
+        self._response = None
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            response = self._response
+        # unblocks a read waiting for the next line
+        if response is not None:
+            response.close()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    def _attach(self, response) -> None:
+        with self._lock:
+            self._response = response
+            cancelled = self.cancelled
+        if cancelled:
+            response.close()
+            raise PullCancelled()
+
+
+# Aggregates the per-layer counters of the stream into a PullProgress
+class _ProgressTracker:
+    smoothing = 0.3  # weight of the newest throughput sample
+    min_sample = 0.5  # seconds between two throughput samples
+
+    def __init__(self):
+        self.layers: Dict[str, tuple] = {}  # digest -> (completed, total)
+        self.rate = 0.0
+        self._sample_t: Optional[float] = None
+        self._sample_bytes = 0
+
+    def update(self, data: dict) -> PullProgress:
+        status = data.get("status", "")
+        digest = data.get("digest", "")
+        if digest and data.get("total"):
+            self.layers[digest] = (int(data.get("completed", 0)), int(data["total"]))
+
+        completed = sum(c for c, _ in self.layers.values())
+        total = sum(t for _, t in self.layers.values())
+
+        now = time.monotonic()
+        if self._sample_t is None:
+            self._sample_t, self._sample_bytes = now, completed
+        elif now - self._sample_t >= self.min_sample:
+            sample = max(0, completed - self._sample_bytes) / (now - self._sample_t)
+            self.rate = sample if self.rate == 0 else self.smoothing * sample + (1 - self.smoothing) * self.rate
+            self._sample_t, self._sample_bytes = now, completed
+
+        eta = (total - completed) / self.rate if self.rate > 0 and total > completed else None
+        return PullProgress(status, digest, completed, total, self.rate, eta)
+
+
+# One streamed /api/pull request; returns normally on "success"
+def _stream_pull(model_name: str, handle: PullHandle, tracker: _ProgressTracker, emit: Callable[[PullProgress], None]) -> None:
+    r = None
+    try:
+        # a refused or timed-out connection is retried like a stream cut halfway
+        r = requests.post(
+            f"{OLLAMA_URL}/api/pull",
+            json={"model": model_name, "stream": True},
+            stream=True,
+            timeout=(5, 60),
+        )
+        handle._attach(r)
+
+        if r.status_code != 200:
+            try:
+                msg = r.json().get("error") or r.text
+            except ValueError:
+                msg = r.text
+            raise RuntimeError(f"HTTP {r.status_code} : {msg}")
+
+        for raw in r.iter_lines():
+            if handle.cancelled:
+                raise PullCancelled()
+            if not raw:
+                continue
+            data = json.loads(raw)
+            if data.get("error"):
+                raise RuntimeError(data["error"])
+
+            emit(tracker.update(data))
+            if data.get("status") == "success":
                 return
 
-            print(f"[OLLAMA] Starting: {exe} pull {model_name}")
+        raise ConnectionError("flux interrompu avant la fin du téléchargement")
+    except (requests.RequestException, AttributeError, ValueError) as e:
+        # a cancel() closing the response surfaces as a read error
+        if handle.cancelled:
+            raise PullCancelled() from e
+        if isinstance(e, requests.RequestException):
+            raise ConnectionError(str(e)) from e
+        raise
+    finally:
+        if r is not None:
+            r.close()
 
-            # Start the pull process and read output in real-time to provide feedback
-            p = subprocess.Popen(
-                [exe, "pull", model_name],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                bufsize=0,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
-            )
 
-            buffer = ""
-            last_percent = -1
+# Pulls a model through Ollama's HTTP API (/api/pull, streamed) in a background thread.
+# Callbacks: on_progress(pct) and on_status(line) as before, on_update(PullProgress) for
+# the structured progress, on_done() / on_error(msg) at the end (none after cancel()).
+# A dropped connection is retried `retries` times: Ollama resumes the partial layers.
+def pull_model_async(model_name: str, on_done=None, on_error=None, on_progress=None, on_status=None,
+                     on_update=None, retries: int = 3) -> PullHandle:
+    handle = PullHandle(model_name)
 
-            # Function to handle text output from the pull process, parsing status lines and progress updates
-            def handle_text(txt: str):
-                nonlocal last_percent, buffer
-                # remove ANSI
-                clean = ANSI_RE.sub("", txt)
-                buffer += clean
+    def worker():
+        tracker = _ProgressTracker()
+        last = {"pct": -1, "line": "", "t": 0.0}
 
-                # split on newlines OR on carriage return-like updates
-                parts = re.split(r"[\r\n]+", buffer)
-                buffer = parts[-1]  # keep tail (incomplete)
-                lines = parts[:-1]
+        def emit(progress: PullProgress):
+            if on_update:
+                on_update(progress)
 
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
+            pct = progress.percent
+            if pct != last["pct"] and progress.total > 0:
+                last["pct"] = pct
+                if on_progress:
+                    on_progress(pct)
 
-                    print(f"[OLLAMA] {line}")
+            # status lines at most 4 times per second (new phases always)
+            line = progress.describe()
+            now = time.monotonic()
+            if line != last["line"] and (not progress.digest or now - last["t"] >= 0.25):
+                last["line"], last["t"] = line, now
+                print(f"[OLLAMA] {progress.status}: {line}" if progress.digest else f"[OLLAMA] {line}")
+                if on_status:
+                    on_status(line)
 
-                    # status updates
+        try:
+            print(f"[OLLAMA] Pulling {model_name} from {OLLAMA_URL}")
+            attempt = 0
+            while True:
+                try:
+                    _stream_pull(model_name, handle, tracker, emit)
+                    break
+                except ConnectionError as e:
+                    attempt += 1
+                    if attempt > retries:
+                        raise
+                    print(f"[OLLAMA] Connection lost ({e}), resuming ({attempt}/{retries})")
                     if on_status:
-                        on_status(line)
-
-                    # percent
-                    m = PCT_RE.search(line)
-                    if m:
-                        pct = int(m.group(1))
-                        pct = max(0, min(100, pct))
-                        if pct != last_percent:
-                            last_percent = pct
-                            if on_progress:
-                                on_progress(pct)
-
-            # Read output in real-time and handle it
-            if p.stdout:
-                while True:
-                    chunk = p.stdout.read(256)
-                    if chunk:
-                        txt = chunk.decode("utf-8", errors="replace")
-                        handle_text(txt)
-                    else:
-                        if p.poll() is not None:
-                            break
-                        time.sleep(0.05)
-
-            rc = p.wait()
-            if rc == 0:
-                print("[OLLAMA] Pull finished successfully.")
-                if on_progress:
-                    on_progress(100)
-                if on_done:
-                    on_done()
-            else:
-                msg = f"ollama pull exited with code {rc}"
-                print(f"[OLLAMA] ERROR: {msg}")
-                if on_error:
-                    on_error(msg)
+                        on_status("Connexion perdue, reprise du téléchargement…")
+                    time.sleep(min(2 ** attempt, 10))
+                    if handle.cancelled:
+                        raise PullCancelled()
+
+            print("[OLLAMA] Pull finished successfully.")
+            if on_progress:
+                on_progress(100)
+            if on_done:
+                on_done()
 
+        except PullCancelled:
+            print(f"[OLLAMA] Pull of {model_name} cancelled.")
         except Exception as e:
-            print(f"[OLLAMA] EXCEPTION: {e}")
+            print(f"[OLLAMA] ERROR: {e}")
             if on_error:
                 on_error(str(e))
+        finally:
+            handle.done.set()
 
     # Start the worker thread to pull the model without blocking the main application
-    threading.Thread(target=worker, daemon=True).start()
+    threading.Thread(target=worker, name=f"ollama-pull-{model_name}", daemon=True).start()
+    return handle
 
-# Removes a model from Ollama in a background thread, used for cleanup if the user quits during a download to avoid leaving a broken state
+# Removes a model from Ollama in a background thread (DELETE /api/delete)
 def rm_model_async(model: str):
-    # Import here to avoid circular imports if we call this from the screens.py cleanup while we're still importing the ollama installer for the pull_model_async function
-    import subprocess
-
     def worker():
-        ollama_path = shutil.which("ollama") or "ollama"
-        cmd = [ollama_path, "rm", model]
-        print(f"[OLLAMA] Cleanup: {' '.join(cmd)}")
+        print(f"[OLLAMA] Cleanup: delete {model}")
         try:
-            subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8", errors="replace")
+            r = requests.delete(f"{OLLAMA_URL}/api/delete", json={"model": model}, timeout=10)
+            # 404: the model was never completely pulled
+            if r.status_code not in (200, 404):
+                print(f"[OLLAMA] Cleanup failed: HTTP {r.status_code} {r.text}")
         except Exception as e:
             print(f"[OLLAMA] Cleanup exception: {e}")
 
@@ -0,0 +1,192 @@
+# Fichier : game/replay.py
+# Rejeu déterministe d'une partie enregistrée dans le journal (GAME_JOURNAL) : même graine,
+# mêmes appels du jeu (votes, phases, discussions), réponses des LLM servies depuis le
+# journal sans réseau ; chaque état rejoué est comparé à l'empreinte enregistrée
+# (si la partie a été enregistrée avec GAME_JOURNAL_DIGESTS=1).
+# Sert aussi de banc d'essai (temps CPU du moteur seul).
+# Usage : python -m game.replay journal.jsonl [numéro de partie]
+# Note : Commentaires en anglais pour uniformité avec game/engine_core.py.
+
+from __future__ import annotations
+
+import dataclasses
+import importlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai.journal import get_journal
+from ai.response_cache import get_response_cache
+from config import ResponseCacheConfig, load_journal_config
+from game.engine_core import ChatEvent, GameEngineCore
+from game.snapshot import ENGINE_MODULES
+
+
+class ReplayError(RuntimeError):
+    pass
+
+
+# What the journal holds about one game
+@dataclass
+class RecordedGame:
+    mode: str  # engine module
+    seed: int
+    players: List[Dict[str, str]]
+    calls: List[Tuple[str, list, dict]] = field(default_factory=list)  # (method, args, kwargs)
+    digests: List[Optional[str]] = field(default_factory=list)  # state after each call (None at night)
+    events: List[Tuple[str, str]] = field(default_factory=list)  # published (speaker, text)
+    responses: Dict[str, Any] = field(default_factory=dict)  # LLM answers by cache key
+    resumed: bool = False  # continued from a save: the start of the game is not in the journal
+
+
+@dataclass
+class ReplayResult:
+    engine: GameEngineCore
+    events: List[ChatEvent]
+    mismatches: List[str]
+    seconds: float
+
+    @property
+    def identical(self) -> bool:
+        return not self.mismatches
+
+
+# Journal files oldest first (rotated files journal.N.jsonl, ..., journal.1.jsonl, then the journal)
+def journal_files(path: str) -> List[str]:
+    root, ext = os.path.splitext(path)
+    rotated = []
+    i = 1
+    while os.path.exists(f"{root}.{i}{ext}"):
+        rotated.append(f"{root}.{i}{ext}")
+        i += 1
+    return rotated[::-1] + ([path] if os.path.exists(path) else [])
+
+
+def read_records(path: str) -> List[dict]:
+    records = []
+    for name in journal_files(path):
+        with open(name, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # last line of a journal cut by a crash
+                    continue
+    return records
+
+
+# Games of a journal in order. LLM answers are content-addressed, so every game
+# gets all of them (a game may reuse an answer cached by another one).
+def load_games(path: str) -> List[RecordedGame]:
+    games: List[RecordedGame] = []
+    responses: Dict[str, Any] = {}
+    game: Optional[RecordedGame] = None
+
+    for record in read_records(path):
+        kind = record.get("kind")
+        if kind == "llm" and record.get("key"):
+            responses[record["key"]] = record["value"]
+        elif kind == "game":
+            game = RecordedGame(record["mode"], record["seed"], record["players"])
+            games.append(game)
+        elif game is None:
+            continue
+        elif kind == "resume":
+            game.resumed = True
+        elif kind == "call":
+            game.calls.append((record["method"], record.get("args", []), record.get("kwargs", {})))
+            game.digests.append(None)
+        elif kind == "state" and game.digests:
+            game.digests[-1] = record["digest"]
+        elif kind == "event":
+            game.events.append((record["speaker"], record["text"]))
+
+    for game in games:
+        game.responses = responses
+    return games
+
+
+def load_game(path: str, index: int = -1) -> RecordedGame:
+    games = load_games(path)
+    if not games:
+        raise ReplayError(f"Aucune partie dans le journal {path}")
+    try:
+        return games[index]
+    except IndexError:
+        raise ReplayError(f"Partie {index} absente du journal ({len(games)} parties)") from None
+
+
+# Serves the recorded answers (LLM_CACHE=replay, in memory) and stops journaling:
+# afterwards any call the game did not record fails instead of reaching the network
+def install_responses(responses: Dict[str, Any]) -> None:
+    get_journal(dataclasses.replace(load_journal_config(), path=""))
+    cache = get_response_cache(ResponseCacheConfig(
+        mode="replay",
+        path=":memory:",
+        ttl=1.0,
+        max_entries=len(responses) + 1,
+        max_temperature=0.0,
+    ))
+    for key, value in responses.items():
+        cache.put(key, value)
+
+
+# Plays the recorded calls again on a new engine of the same mode and seed,
+# comparing the published events and the state digests with the journal
+def replay(game: RecordedGame) -> ReplayResult:
+    if game.resumed:
+        raise ReplayError("Partie reprise d'une sauvegarde : son début n'est pas dans le journal")
+    if game.mode not in ENGINE_MODULES:
+        raise ReplayError(f"Mode de jeu inconnu : {game.mode}")
+    engine_cls = importlib.import_module(game.mode).GameEngine
+
+    install_responses(game.responses)
+    started = time.perf_counter()
+
+    engine = engine_cls(len(game.players), seed=game.seed)
+    players = [{"name": p.name, "role": p.role} for p in engine.players]
+    if players != game.players:
+        raise ReplayError("Les joueurs tirés ne correspondent pas au journal")
+
+    events: List[ChatEvent] = []
+    mismatches: List[str] = []
+    engine.event_sink = events.append
+    try:
+        for n, ((method, args, kwargs), digest) in enumerate(zip(game.calls, game.digests)):
+            getattr(engine, method)(*args, **kwargs)
+            if digest is not None and engine.state_digest() != digest:
+                mismatches.append(f"appel {n} ({method}) : état différent")
+    finally:
+        engine.event_sink = None
+    seconds = time.perf_counter() - started
+
+    replayed = [(ev.name_ia, ev.text) for ev in events]
+    if replayed != game.events:
+        first = next((i for i, pair in enumerate(zip(replayed, game.events)) if pair[0] != pair[1]),
+                     min(len(replayed), len(game.events)))
+        mismatches.append(f"événement {first} différent ({len(replayed)} rejoués, {len(game.events)} enregistrés)")
+
+    return ReplayResult(engine, events, mismatches, seconds)
+
+
+def main(argv: List[str]) -> int:
+    if not argv:
+        print("Usage : python -m game.replay journal.jsonl [numéro de partie]")
+        return 2
+
+    game = load_game(argv[0], int(argv[1]) if len(argv) > 1 else -1)
+    result = replay(game)
+    rate = len(result.events) / result.seconds if result.seconds > 0 else float("inf")
+    print(f"{game.mode} (graine {game.seed}) : {len(game.calls)} appels, {len(result.events)} événements "
+          f"en {result.seconds * 1000:.1f} ms ({rate:.0f} événements/s)")
+    for mismatch in result.mismatches:
+        print(f"⚠️  {mismatch}")
+    print("Rejeu identique" if result.identical else "Rejeu divergent")
+    return 0 if result.identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
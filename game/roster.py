@@ -0,0 +1,84 @@
+# Fichier : game/roster.py
+# Suivi incrémental des joueurs vivants et des rôles (index, compteurs, nom -> index)
+# Note : Commentaires en anglais pour uniformité avec engine.py.
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from ai.name_index import NameIndex
+from game.structure_ai import Player
+
+
+# Bookkeeping kept up to date by kill(), so the engines never rescan the
+# player list to know who is alive or who wins
+class PlayerRoster:
+    def __init__(self, players: List[Player], names: Optional[NameIndex] = None):
+        self.players = players
+        self.names = names or NameIndex(p.name for p in players)
+        self.index_by_name: Dict[str, int] = {p.name: i for i, p in enumerate(players)}
+        self._wolves_names = [p.name for p in players if p.role == "loup"]
+
+        # dicts used as insertion-ordered sets: iteration stays in index order
+        self._alive: Dict[int, None] = {}
+        self._alive_wolves: Dict[int, None] = {}
+        self._alive_villagers: Dict[int, None] = {}
+        for i, p in enumerate(players):
+            if p.alive:
+                self._alive[i] = None
+                if p.role == "loup":
+                    self._alive_wolves[i] = None
+                else:
+                    self._alive_villagers[i] = None
+
+    # Marks a player as dead and updates the alive sets and counters
+    def kill(self, index: int) -> None:
+        p = self.players[index]
+        p.alive = False
+        p.note = 0  # reset note on death
+        self._alive.pop(index, None)
+        self._alive_wolves.pop(index, None)
+        self._alive_villagers.pop(index, None)
+
+    def is_alive(self, index: int) -> bool:
+        return index in self._alive
+
+    # Index of a player, tolerating case, accents and small misspellings
+    def index_of(self, name: str) -> Optional[int]:
+        index = self.index_by_name.get(name)
+        if index is None:
+            canonical = self.names.resolve(name)
+            index = self.index_by_name.get(canonical) if canonical else None
+        return index
+
+    def alive_indexes(self) -> List[int]:
+        return list(self._alive)
+
+    def alive_wolf_indexes(self) -> List[int]:
+        return list(self._alive_wolves)
+
+    def alive_villager_indexes(self) -> List[int]:
+        return list(self._alive_villagers)
+
+    def alive_names(self) -> List[str]:
+        return [self.players[i].name for i in self._alive]
+
+    def all_wolves_names(self) -> List[str]:
+        return list(self._wolves_names)
+
+    @property
+    def alive_wolves_count(self) -> int:
+        return len(self._alive_wolves)
+
+    @property
+    def alive_villagers_count(self) -> int:
+        return len(self._alive_villagers)
+
+    # Determines if there is a winner in O(1) from the counters
+    def winner(self) -> Optional[str]:
+        wolves = len(self._alive_wolves)
+        if wolves == 0:
+            return "village"
+        if wolves >= len(self._alive_villagers):
+            return "loups"
+        return None
@@ -0,0 +1,183 @@
+# Fichier : game/service_monitor.py
+# Surveillance en arrière-plan des services (Ollama, API en ligne) : sondes périodiques
+# avec temporisation croissante en cas d'échec, état lisible instantanément par l'interface
+# Note : Commentaires en anglais pour uniformité avec game/engine_core.py.
+
+from __future__ import annotations
+
+import dataclasses
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping, Optional
+from urllib import error as url_error
+from urllib import request as url_request
+
+from ai.client import OpenRouterClientConfig
+from ai.ollama_client import OllamaClient
+from config import load_ollama_config
+
+# Endpoints probed for the online modes (reachability only, no key is sent)
+GEMINI_PROBE_URL = "https://generativelanguage.googleapis.com/"
+OPENROUTER_PROBE_URL = OpenRouterClientConfig.base_url.rstrip("/") + "/models"
+
+
+# Last known state of a service
+@dataclass(frozen=True)
+class ServiceStatus:
+    name: str
+    available: bool
+    message: str
+    checked_at: float  # time.monotonic() of the probe
+    details: Mapping[str, bool] = field(default_factory=dict)
+
+
+# A registered probe and its schedule
+@dataclass
+class _Probe:
+    name: str
+    check: Callable[[], ServiceStatus]
+    interval: float  # delay between two probes while the service is up
+    max_backoff: float  # longest delay between two probes while it is down
+    delay: float = 0.0  # current retry delay (doubles after each failure)
+    wake: threading.Event = field(default_factory=threading.Event)  # set to probe now
+
+
+# One daemon thread per probe, each on its own schedule: a slow service (DNS
+# lookups are not bounded by the timeout) never delays the others. The UI never
+# waits for the network: it reads the latest statuses with snapshot()/status().
+class ServiceMonitor:
+    min_retry = 1.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._probes: Dict[str, _Probe] = {}
+        self._statuses: Dict[str, ServiceStatus] = {}
+        self._started = False
+        self._stopped = False
+
+    def add(self, name: str, check: Callable[[], ServiceStatus], interval: float = 15.0,
+            max_backoff: float = 30.0) -> None:
+        with self._lock:
+            old = self._probes.get(name)
+            if old is not None:
+                old.wake.set()  # its thread sees it was replaced and ends
+            probe = self._probes[name] = _Probe(name, check, interval, max_backoff)
+            if self._started:
+                self._start_probe(probe)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for probe in self._probes.values():
+                self._start_probe(probe)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            for probe in self._probes.values():
+                probe.wake.set()
+
+    # Copy of every known status (services not probed yet are absent)
+    def snapshot(self) -> Dict[str, ServiceStatus]:
+        with self._lock:
+            return dict(self._statuses)
+
+    def status(self, name: str) -> Optional[ServiceStatus]:
+        with self._lock:
+            return self._statuses.get(name)
+
+    # Probes a service (or all of them) as soon as possible, resetting the backoff
+    def refresh(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            for probe in self._probes.values():
+                if name is None or probe.name == name:
+                    probe.delay = 0.0
+                    probe.wake.set()
+
+    def _start_probe(self, probe: _Probe) -> None:
+        threading.Thread(target=self._run, args=(probe,), name=f"service-monitor-{probe.name}",
+                         daemon=True).start()
+
+    def _run(self, probe: _Probe) -> None:
+        while True:
+            # a refresh() during the check makes the wait below return at once
+            probe.wake.clear()
+            status = self._check(probe)
+            with self._lock:
+                if self._stopped or self._probes.get(probe.name) is not probe:
+                    return
+                self._statuses[probe.name] = status
+                wait = self._schedule(probe, status.available)
+            probe.wake.wait(wait)
+
+    @staticmethod
+    def _check(probe: _Probe) -> ServiceStatus:
+        try:
+            return probe.check()
+        except Exception as e:
+            return ServiceStatus(probe.name, False, f"Erreur inconnue: {e}", time.monotonic())
+
+    # Steady interval while up, doubling delay (with jitter) while down
+    def _schedule(self, probe: _Probe, available: bool) -> float:
+        if available:
+            probe.delay = 0.0
+            return probe.interval
+        probe.delay = min(probe.max_backoff, max(self.min_retry, probe.delay * 2))
+        return probe.delay * random.uniform(0.8, 1.2)
+
+
+# Ollama server and configured model (a model "mistral" matches "mistral:latest")
+def probe_ollama(timeout: float = 3.0) -> ServiceStatus:
+    config = load_ollama_config()
+    client = OllamaClient(dataclasses.replace(config, timeout=timeout))
+    try:
+        models = client.list_models()
+    except (ConnectionError, ValueError):
+        return ServiceStatus("ollama", False, f"Impossible de se connecter à Ollama sur {config.base_url}",
+                             time.monotonic(), {"running": False, "model": False})
+
+    base_model_name = config.model.split(":")[0]
+    model_ok = config.model in models or any(name.startswith(base_model_name) for name in models)
+    if not models:
+        message = "Ollama est lancé mais aucun modèle n'est disponible"
+    elif not model_ok:
+        message = f"Modèle '{config.model}' non trouvé. Modèles disponibles: {', '.join(models[:3])}"
+    else:
+        message = "Ollama est disponible"
+    return ServiceStatus("ollama", model_ok, message, time.monotonic(), {"running": True, "model": model_ok})
+
+
+# Any HTTP answer (even 401/404) means the endpoint is reachable
+def probe_http(name: str, url: str, timeout: float = 3.0) -> ServiceStatus:
+    req = url_request.Request(url, headers={"Accept": "application/json"})
+    try:
+        with url_request.urlopen(req, timeout=timeout):
+            pass
+    except url_error.HTTPError:
+        pass
+    except (url_error.URLError, OSError):
+        return ServiceStatus(name, False, "Service injoignable", time.monotonic())
+    return ServiceStatus(name, True, "Service joignable", time.monotonic())
+
+
+_shared: Optional[ServiceMonitor] = None
+_shared_lock = threading.Lock()
+
+
+# Process-wide monitor with the game's services, started on first use
+def get_service_monitor() -> ServiceMonitor:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ServiceMonitor()
+            _shared.add("ollama", probe_ollama, interval=10.0, max_backoff=10.0)
+            _shared.add("openrouter", lambda: probe_http("openrouter", OPENROUTER_PROBE_URL),
+                        interval=120.0, max_backoff=60.0)
+            _shared.add("gemini", lambda: probe_http("gemini", GEMINI_PROBE_URL),
+                        interval=120.0, max_backoff=60.0)
+            _shared.start()
+        return _shared
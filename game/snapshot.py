@@ -0,0 +1,152 @@
+# Fichier : game/snapshot.py
+# Sauvegarde et reprise de partie : état complet du moteur (joueurs, rng, contexte,
+# suspicion, historique) dans un format binaire compact et versionné, écrit de façon
+# atomique en arrière-plan
+# Note : Commentaires en anglais pour uniformité avec game/engine_core.py.
+
+from __future__ import annotations
+
+import importlib
+import io
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Optional
+
+from game.engine_core import GameEngineCore
+
+# File layout: magic, format version, CRC32 of the payload, then the payload
+# (zlib-compressed pickle of plain data: dict, list, tuple, str, bytes, numbers)
+MAGIC = b"LGSNAP"
+VERSION = 1
+_HEADER = struct.Struct(">6sHI")
+
+DEFAULT_PATH = os.path.join("saves", "partie.snap")
+
+# Engine modules a snapshot may name (the class is always their GameEngine)
+ENGINE_MODULES = (
+    "game.engine_default",
+    "game.engine",
+    "game.engine_openrouter",
+    "game.engine_with_ai",
+)
+
+_write_lock = threading.Lock()
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+# Unpickler refusing every global: only the builtin containers and scalars load
+class _PlainDataUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        raise SnapshotError(f"Objet non autorisé dans la sauvegarde : {module}.{name}")
+
+
+def encode(state: dict) -> bytes:
+    payload = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 6)
+    return _HEADER.pack(MAGIC, VERSION, zlib.crc32(payload)) + payload
+
+
+def decode(data: bytes) -> dict:
+    if len(data) < _HEADER.size:
+        raise SnapshotError("Sauvegarde tronquée")
+    magic, version, crc = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("Ce fichier n'est pas une sauvegarde")
+    if version != VERSION:
+        raise SnapshotError(f"Version de sauvegarde non prise en charge : {version}")
+
+    payload = data[_HEADER.size:]
+    if zlib.crc32(payload) != crc:
+        raise SnapshotError("Sauvegarde corrompue")
+    try:
+        state = _PlainDataUnpickler(io.BytesIO(zlib.decompress(payload))).load()
+    except (zlib.error, pickle.UnpicklingError, EOFError) as e:
+        raise SnapshotError(f"Sauvegarde illisible : {e}") from e
+    if not isinstance(state, dict):
+        raise SnapshotError("Sauvegarde illisible")
+    return state
+
+
+# Engine state plus the mode needed to rebuild it (call while the engine is idle)
+def capture(engine: GameEngineCore) -> dict:
+    return {"engine": type(engine).__module__, "game": engine.snapshot_state()}
+
+
+# Writes next to the target, flushes, then renames: a crash leaves the old save intact
+def write(state: dict, path: str = DEFAULT_PATH) -> None:
+    data = encode(state)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp = f"{path}.tmp"
+    with _write_lock:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+# Captures now (on the caller's thread), encodes and writes in a daemon thread
+def save_async(engine: GameEngineCore, path: str = DEFAULT_PATH) -> threading.Thread:
+    state = capture(engine)
+
+    def worker() -> None:
+        try:
+            write(state, path)
+        except OSError as e:
+            print(f"⚠️  Sauvegarde impossible : {e}")
+
+    thread = threading.Thread(target=worker, name="snapshot-writer", daemon=True)
+    thread.start()
+    return thread
+
+
+def exists(path: str = DEFAULT_PATH) -> bool:
+    return os.path.isfile(path)
+
+
+def load(path: str = DEFAULT_PATH) -> dict:
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+# Rebuilds the engine of a saved game (its constructor makes no LLM call)
+def restore(state: dict) -> GameEngineCore:
+    module_name = state.get("engine")
+    if module_name not in ENGINE_MODULES:
+        raise SnapshotError(f"Mode de jeu inconnu : {module_name}")
+    engine_cls = importlib.import_module(module_name).GameEngine
+
+    game = state["game"]
+    engine = engine_cls(len(game["players"]))
+    engine.restore_state(game)
+    return engine
+
+
+# Removes the save (the game it holds is over)
+def discard(path: str = DEFAULT_PATH) -> None:
+    with _write_lock:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# Saved game as an engine, or None if there is none or it cannot be read
+def resume(path: str = DEFAULT_PATH) -> Optional[GameEngineCore]:
+    if not exists(path):
+        return None
+    engine = restore(load(path))
+
+    # a save written just before the end of its game
+    if engine.get_winner() is not None:
+        discard(path)
+        return None
+    return engine
@@ -0,0 +1,138 @@
+# Fichier : game/speculation.py
+# Spéculation pendant le vote : pendant que le joueur délibère, la nuit et la journée
+# suivante sont jouées à l'avance sur des copies du moteur pour les cibles les plus
+# probables ; la branche du vote réel est gardée, les autres sont abandonnées
+# Note : Commentaires en anglais pour uniformité avec game/engine_core.py.
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+from config import load_speculation_config
+from game.engine_core import ChatEvent, GameEngineCore
+
+# Weight of the player's note on a target: 0=neutre, 1=gentil, 2=suspect, 3=loup
+NOTE_WEIGHTS = {0: 0.0, 1: -2.0, 2: 2.0, 3: 4.0}
+
+
+# Raised inside a dropped branch to stop its generation at the next event
+class BranchCancelled(RuntimeError):
+    pass
+
+
+# Alive players, most likely vote target first: the player's note plus the mean
+# suspicion the alive players hold against them (a column of the matrix)
+def rank_vote_targets(engine: GameEngineCore) -> List[int]:
+    alive = engine.roster.alive_indexes()
+    matrix = engine.suspicion
+    observers = [matrix.index[engine.players[i].name] for i in alive]
+
+    def score(i: int) -> float:
+        player = engine.players[i]
+        col = matrix.index.get(player.name)
+        received = float(matrix.values[observers, col].mean()) if observers and col is not None else 0.0
+        return NOTE_WEIGHTS.get(player.note, 0.0) + received
+
+    # stable sort: ties keep the roster order
+    return sorted(alive, key=score, reverse=True)
+
+
+# One vote outcome played ahead on a fork: the vote, then the night and the next day
+class Branch:
+    def __init__(self, target: int, engine: GameEngineCore):
+        self.target = target
+        self.engine = engine
+        self.cancelled = False
+        self.advance_events: List[ChatEvent] = []
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._error: Optional[Exception] = None
+        self._published: List[ChatEvent] = []
+        self._listener: Optional[Callable[[ChatEvent], None]] = None
+
+    def run(self) -> None:
+        engine = self.engine
+        try:
+            engine.cast_vote(self.target)
+            # the engine of the game journals this vote when the player casts it
+            engine.hold_journal()
+            if engine.get_winner() is None and not self.cancelled:
+                engine.event_sink = self._sink
+                self.advance_events = engine.advance()
+        except Exception as e:
+            self._error = e
+        finally:
+            engine.event_sink = None
+            self._done.set()
+
+    # The branch becomes the game: its journal records are written (call once it is done)
+    def adopt(self) -> None:
+        self.engine.release_journal()
+
+    # Number of events the branch published so far
+    @property
+    def published_count(self) -> int:
+        with self._lock:
+            return len(self._published)
+
+    # Forwards the events published so far, then the next ones as they come, to
+    # `listener`; returns the rest of the advance events once the branch is done
+    # (same contract as an engine event_sink: published events are a prefix)
+    def collect(self, listener: Callable[[ChatEvent], None]) -> List[ChatEvent]:
+        with self._lock:
+            for ev in self._published:
+                listener(ev)
+            self._listener = listener
+
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self.advance_events[len(self._published):]
+
+    def _sink(self, event: ChatEvent) -> None:
+        if self.cancelled:
+            raise BranchCancelled(f"branche {self.target} abandonnée")
+        with self._lock:
+            self._published.append(event)
+            if self._listener is not None:
+                self._listener(event)
+
+
+# Branches started for the most likely targets of the current vote
+class Speculator:
+    def __init__(self, engine: GameEngineCore, branches: int):
+        self.branches: Dict[int, Branch] = {}
+        for target in rank_vote_targets(engine)[:branches]:
+            branch = Branch(target, engine.fork())
+            self.branches[target] = branch
+            threading.Thread(target=branch.run, name=f"speculation-{target}", daemon=True).start()
+
+    # Keeps the branch of the actual vote (None if it was not speculated) and drops the others
+    def take(self, target: int) -> Optional[Branch]:
+        branch = self.branches.pop(target, None)
+        self.cancel()
+        return branch
+
+    # Drops every remaining branch (a running one stops at its next event)
+    def cancel(self) -> None:
+        for branch in self.branches.values():
+            branch.cancelled = True
+        self.branches.clear()
+
+
+# Starts the speculation of the current vote, or None when it is off. It is opt-in
+# (SPECULATIVE_BRANCHES=n, each branch costs the LLM calls of a night and a day);
+# the variable overrides the engine's speculative_branches, 0 in every mode
+def start_speculation(engine: GameEngineCore) -> Optional[Speculator]:
+    try:
+        branches = load_speculation_config().branches
+    except ValueError:
+        branches = None
+    if branches is None:
+        branches = engine.speculative_branches
+
+    if branches <= 0 or engine.phase != "JourVote":
+        return None
+    return Speculator(engine, branches)
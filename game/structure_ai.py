@@ -6,7 +6,8 @@ from dataclasses import dataclass
 
 
 # Player data structure for the game
-@dataclass
+# (slotted: no per-instance __dict__; not frozen since alive/note change during the game)
+@dataclass(slots=True)
 class Player:
     name: str
     role: str  # "villageois" | "loup"
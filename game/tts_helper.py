@@ -11,6 +11,7 @@ from typing import Optional, TYPE_CHECKING
 
 import audio_config
 import game.constants
+from ai.response_cache import remember_validation
 
 # Note : This module handles text-to-speech generation and playback using ElevenLabs API and pygame mixer.
 # It runs two background threads: one for generating audio from text, and another for playing the
@@ -106,6 +107,12 @@ def validate_api_key(api_key: str) -> bool:
     if len(api_key) < 10:
         return False
 
+    # a key validated recently is not checked again when LLM_CACHE is on
+    return remember_validation("elevenlabs", api_key, lambda: _check_api_key(api_key))
+
+
+# Checks the key against ElevenLabs (lists voices and converts a short text)
+def _check_api_key(api_key: str) -> bool:
     try:
         from elevenlabs.client import ElevenLabs
 
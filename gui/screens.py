@@ -17,7 +17,11 @@ from game.engine_default import GameEngine as DefaultEngine
 import game.constants
 import google.generativeai as genai
 from gui.settings_screen import SettingsScreen
-from ai.ollama_client import check_ollama_availability
+from ai.ollama_client import OllamaClient
+from game.service_monitor import get_service_monitor
+from game.speculation import start_speculation
+from game import snapshot
+from ai.response_cache import remember_validation
 import audio_config
 from game import tts_helper
 
@@ -72,6 +76,16 @@ class SetupScreen(Screen):
             tooltip="Accéder aux paramètres (S)"
         )
 
+        # Resume button (only when a saved game exists)
+        self.resume_btn = Button(
+            rect=(app.w // 2 - 120, app.h // 2 + 210, 240, 50),
+            text="Reprendre",
+            font=self.font,
+            tooltip="Reprendre la dernière partie sauvegardée"
+        )
+        self.has_save = snapshot.exists()
+        self.error = ""
+
     # Handles events for the setup screen
     def handle_event(self, event):
         # Keyboard shortcut for settings
@@ -87,6 +101,23 @@ class SetupScreen(Screen):
         if self.settings_btn.handle_event(event):
             self.app.set_screen(SettingsScreen(self.app, previous_screen=self))
 
+        if self.has_save and self.resume_btn.handle_event(event):
+            self._resume_saved_game()
+
+    # Rebuilds the saved engine (no LLM call) and goes straight back to the game
+    def _resume_saved_game(self):
+        try:
+            engine = snapshot.resume()
+        except (OSError, ValueError) as e:
+            self.error = f"Impossible de reprendre la partie : {e}"
+            return
+
+        if engine is None:
+            self.has_save = False
+            self.error = "Aucune partie à reprendre."
+            return
+        self.app.set_screen(GameScreen(self.app, len(engine.players), type(engine), engine=engine))
+
     # Draws the setup screen
     def draw(self, surface):
         surface.fill((20, 20, 25))
@@ -100,6 +131,12 @@ class SetupScreen(Screen):
         self.num_players.draw(surface)
         self.start_btn.draw(surface)
         self.settings_btn.draw(surface)
+        if self.has_save:
+            self.resume_btn.draw(surface)
+
+        if self.error:
+            err = self.font.render(self.error, True, (255, 120, 120))
+            surface.blit(err, err.get_rect(center=(self.app.w // 2, self.app.h // 2 + 290)))
 
 
 # Screen to select the game mode (API or local)
@@ -140,6 +177,10 @@ class ModeSelectScreen(Screen):
 
         self.error = ""
 
+        # Services are probed in the background; a click only reads the last result
+        self.monitor = get_service_monitor()
+        self._waiting_ollama = False
+
     # Handles events for the mode selection screen
     def handle_event(self, event):
         if self.back_btn.handle_event(event):
@@ -158,13 +199,39 @@ class ModeSelectScreen(Screen):
 
         # Ollama : no API key, but check if Ollama is available before proceeding to TTS setup (since if Ollama isn't available, the game won't work at all)
         if self.btn_ollama.handle_event(event):
-            is_available, message = check_ollama_availability()
-            if not is_available:
-                self.app.set_screen(OllamaErrorScreen(self.app, message, previous_screen=self))
+            status = self.monitor.status("ollama")
+            if status is None:
+                # first probe still running: continue from update() when it lands
+                self._waiting_ollama = True
+                self.error = "Vérification d'Ollama…"
+                self.monitor.refresh("ollama")
                 return
-            self.app.set_screen(TTSKeyScreen(self.app, engine_cls=OllamaOrTemplateEngine, num_players=self.num_players, previous_screen=self))
+            self._open_ollama(status)
+            return
+
+    # Continues an Ollama selection made before the first probe finished
+    def update(self, dt: float):
+        if self._waiting_ollama:
+            status = self.monitor.status("ollama")
+            if status is not None:
+                self._waiting_ollama = False
+                self.error = ""
+                self._open_ollama(status)
+
+    # Goes to the TTS setup if Ollama and its model are available, else to the error screen
+    def _open_ollama(self, status):
+        if not status.available:
+            self.app.set_screen(OllamaErrorScreen(self.app, status.message, previous_screen=self))
             return
 
+        # Load the model in the background while the next screens and the game initialize
+        # (an invalid Ollama setting is reported by the game, it must not close this screen)
+        try:
+            OllamaClient().preload_async()
+        except ValueError as e:
+            print(f"⚠️  Préchargement du modèle impossible : {e}")
+        self.app.set_screen(TTSKeyScreen(self.app, engine_cls=OllamaOrTemplateEngine, num_players=self.num_players, previous_screen=self))
+
     # Draws the mode selection screen
     def draw(self, surface):
         surface.fill((20, 20, 25))
@@ -180,6 +247,17 @@ class ModeSelectScreen(Screen):
         self.btn_gemini.draw(surface)
         self.btn_ollama.draw(surface)
 
+        # Service indicators: green reachable, red unreachable, grey not checked yet
+        statuses = self.monitor.snapshot()
+        for name, btn in (("openrouter", self.btn_openrouter), ("gemini", self.btn_gemini), ("ollama", self.btn_ollama)):
+            status = statuses.get(name)
+            color = (120, 120, 120) if status is None else (90, 200, 110) if status.available else (220, 80, 80)
+            pygame.draw.circle(surface, color, (btn.rect.right - 22, btn.rect.centery), 7)
+
+        if self.error:
+            err = self.font.render(self.error, True, (230, 190, 120))
+            surface.blit(err, err.get_rect(center=(self.app.w // 2, 470)))
+
 
 
 # Screen to input API keys for Gemini or OpenRouter modes
@@ -237,21 +315,27 @@ class ApiKeyScreen(Screen):
         if len(key) < 10:
             return False, "Clé invalide. Réessaie."
 
-        if self.mode == "gemini":
-            try:
-                import google.generativeai as genai
-                genai.configure(api_key=key)
-                model = genai.GenerativeModel("gemini-2.5-flash-lite")
-                r = model.generate_content("Réponds uniquement avec 'ok'.")
-                text = (getattr(r, "text", "") or "").strip().lower()
-                if "ok" in text:
-                    return True, ""
-                return False, "Clé invalide. Réessaie."
-            except Exception:
-                # leaked 403 / quota 429 / etc => not valid
-                return False, "Clé invalide. Réessaie."
-
-        # openrouter
+        # A key validated recently is not checked again when LLM_CACHE is on
+        check = self._check_gemini_key if self.mode == "gemini" else self._check_openrouter_key
+        if remember_validation(self.mode, key, lambda: check(key)):
+            return True, ""
+        return False, "Clé invalide. Réessaie."
+
+    # Asks Gemini for a one-word answer with the key
+    def _check_gemini_key(self, key: str) -> bool:
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=key)
+            model = genai.GenerativeModel("gemini-2.5-flash-lite")
+            r = model.generate_content("Réponds uniquement avec 'ok'.")
+            text = (getattr(r, "text", "") or "").strip().lower()
+            return "ok" in text
+        except Exception:
+            # leaked 403 / quota 429 / etc => not valid
+            return False
+
+    # Asks OpenRouter for a one-word answer with the key
+    def _check_openrouter_key(self, key: str) -> bool:
         try:
             from ai.client import OpenRouterClient, OpenRouterClientConfig
             c = OpenRouterClient(OpenRouterClientConfig(api_key=key))
@@ -262,12 +346,10 @@ class ApiKeyScreen(Screen):
                 temperature=0,
             )
             out = (resp.choices[0].message.content or "").strip().lower()
-            if "ok" in out:
-                return True, ""
-            return False, "Clé invalide. Réessaie."
+            return "ok" in out
         except Exception:
             # 429 / 404 privacy / etc => not valid
-            return False, "Clé invalide. Réessaie."
+            return False
 
 
     # Handles events for the API key screen, including validating the key and navigating to the TTS setup screen if valid, or showing an error message if invalid. Also handles going back to the previous screen.
@@ -416,7 +498,7 @@ class TTSKeyScreen(Screen):
 
 # Main game screen
 class GameScreen(Screen):
-    def __init__(self, app, num_players: int, engine_cls):
+    def __init__(self, app, num_players: int, engine_cls, engine=None):
         super().__init__(app)
 
         # Fonts
@@ -434,8 +516,8 @@ class GameScreen(Screen):
         self.list_rect = pygame.Rect(margin, margin + 100, left_w, app.h - (margin + 100) - margin)
         self.chat_rect = pygame.Rect(margin + left_w + gap, margin, app.w - (margin + left_w + gap) - margin, app.h - 2 * margin)
 
-        # Engine (game logic)
-        self.engine = engine_cls(num_players)
+        # Engine (game logic), or the engine of a resumed game
+        self.engine = engine if engine is not None else engine_cls(num_players)
 
         # Map player names to voice IDs for TTS (if needed)
         self.voice_map = {p.name: getattr(p, "voice_id", None) for p in self.engine.players}
@@ -523,19 +605,29 @@ class GameScreen(Screen):
         self._bg_thread = None
         self._bg_loading = False
 
+        # Vote speculation: outcomes of the likely votes are generated while the player
+        # deliberates; the branch of the actual vote replaces the night generation
+        self._speculator = None
+        self._speculated_day = None
+        self._branch = None
+
+        # A resumed game shows its history and waits for "Continuer" (nothing to generate)
+        if engine is not None:
+            self._show_resumed_game()
+
         # Start the game by calling start_day on the engine, which will return the initial events to display. For engines that support streaming discussion, we can call start_day directly and get a generator for events. For API-based engines that don't support streaming, we need to call start_day in a background thread to avoid blocking the UI while waiting for the response.
-        if getattr(self.engine, "supports_streaming_discussion", False):
+        elif self.engine.supports_streaming_discussion:
             # For engines that support streaming discussion (like Ollama), we can call start_day directly to get the initial events and a generator for subsequent messages. We also show a "Generating..." message in the chat while waiting for the first messages to be generated, which will be replaced by the actual messages as they come in from the generator.
             self.chat.add_message("Système", "Génération…", True, is_system=True)
 
             # Ollama / engines : thread
-            if getattr(self.engine, "use_background_generation", False):
+            if self.engine.use_background_generation:
                 self._start_background_generation(self.engine.start_day)
             else:
                 events = self.engine.start_day()
                 self._enqueue_events(events)
 
-            self._message_generator = self._create_message_generator() if getattr(self.engine, "supports_streaming_discussion", False) else None
+            self._message_generator = self._create_message_generator() if self.engine.supports_streaming_discussion else None
         # API-based engine: start_day can take a long time, so we run it in a background thread and show a loading message in the meantime. Once the thread finishes, it will put the resulting events in the queue, which we will check in the update() method to display them and transition to the discussion phase.
         else:
             self._bg_loading = True
@@ -544,7 +636,7 @@ class GameScreen(Screen):
             self._start_background_generation_start_day()
 
         # For engines that support streaming discussion, we can create a message generator right away to start displaying messages one by one as they are generated. For API-based engines that don't support streaming, we will get all the messages at once when the background thread finishes, so we don't need a generator in that case.
-        self._message_generator = self._create_message_generator() if getattr(self.engine, "supports_streaming_discussion", False) else None
+        self._message_generator = self._create_message_generator() if self.engine.supports_streaming_discussion and engine is None else None
 
         self._refresh_ui_players_from_engine()  # Update dead players in UI
         
@@ -623,7 +715,7 @@ class GameScreen(Screen):
     def _start_background_generation_start_day(self):
         def worker():
             try:
-                events = self.engine.start_day()
+                events = self._run_streaming(self.engine.start_day)
                 self._bg_queue.put(("events", events))
             except Exception as e:
                 self._bg_queue.put(("error", str(e)))
@@ -637,12 +729,74 @@ class GameScreen(Screen):
         self._update_controls()
         def worker():
             try:
-                events = fn()
+                events = self._run_streaming(fn)
+                self._bg_queue.put(("events", events))
+            except Exception as e:
+                self._bg_queue.put(("error", str(e)))
+        threading.Thread(target=worker, daemon=True).start()
+
+    # Runs an engine call in the worker thread: events published by the engine while
+    # it works are queued right away as ("event", ev); the returned list starts with
+    # those same events, so only the remaining ones are returned for ("events", ...)
+    def _run_streaming(self, fn, engine=None):
+        engine = engine or self.engine
+        streamed = []
+
+        def sink(ev):
+            streamed.append(ev)
+            self._bg_queue.put(("event", ev))
+
+        engine.event_sink = sink
+        try:
+            events = fn()
+        finally:
+            engine.event_sink = None
+        return events[len(streamed):]
+
+    # Advances the engine in the background; after a vote, the speculated branch of
+    # that vote takes over (its events already generated, the rest still streaming)
+    def _advance_in_background(self):
+        branch, self._branch = self._branch, None
+        if branch is None or self.engine.phase != "Nuit":
+            self._start_background_generation(self.engine.advance)
+            return
+
+        main_engine = self.engine
+        self.engine = branch.engine
+        self._sync_notes_back_to_engine()
+        self._bg_loading = True
+        self._update_controls()
+
+        def worker():
+            try:
+                try:
+                    events = branch.collect(lambda ev: self._bg_queue.put(("event", ev)))
+                except Exception:
+                    if branch.published_count:
+                        branch.adopt()
+                        raise
+                    # the branch failed before showing anything: the UI thread takes the
+                    # main engine back, then the night is generated for real
+                    self._bg_queue.put(("engine", main_engine))
+                    events = self._run_streaming(main_engine.advance, main_engine)
+                else:
+                    branch.adopt()
                 self._bg_queue.put(("events", events))
             except Exception as e:
                 self._bg_queue.put(("error", str(e)))
         threading.Thread(target=worker, daemon=True).start()
 
+    # Casts the vote; the speculated branch of this target (if any) is kept for the night
+    def _cast_vote(self, idx: int):
+        if self._speculator is not None:
+            self._branch = self._speculator.take(idx)
+            self._speculator = None
+
+        # the branch already made its night decision: this engine will be replaced
+        if self._branch is not None:
+            self.engine.prefetch_night = False
+        return self.engine.cast_vote(idx)
+
     # Updates the game screen
     def update(self, dt: float):
         # API failure handling: if an API failure has been triggered, we want to run the glitch effect for a certain duration, then show the wolves without text for a short time, and finally transition to the API failure end screen with the reason for the failure and the list of wolves. This allows us to handle API failures in a thematic way while also providing some visual interest during the error scenario.
@@ -651,6 +805,7 @@ class GameScreen(Screen):
             if self._api_fail_t >= self.total_duration:
                 wolves = self._api_fail_wolves
                 found = self.engine.found_wolves_list() 
+                self._end_engine_session()
                 self.app.set_screen(ApiFailureEndScreen(self.app, self.num_players, wolves, found))
             return
 
@@ -667,9 +822,21 @@ class GameScreen(Screen):
             self._update_controls()
 
         # Background generation handling (API engines) 
-        if self._bg_loading:
+        while self._bg_loading:
             try:
                 kind, payload = self._bg_queue.get_nowait()
+
+                # Streamed event: shown while the engine keeps generating
+                if kind == "event":
+                    self._enqueue_events([payload])
+                    continue
+
+                # A failed branch hands the game back to the engine it was forked from
+                if kind == "engine":
+                    self.engine = payload
+                    self._sync_notes_back_to_engine()
+                    continue
+
                 self._bg_loading = False
 
                 if kind == "events":
@@ -677,6 +844,7 @@ class GameScreen(Screen):
                     self._refresh_ui_players_from_engine()
                     self._update_vote_buttons_visibility()
                     self._update_controls()
+                    self._autosave()
 
                 elif kind == "error":
                     # glitch stop
@@ -684,7 +852,16 @@ class GameScreen(Screen):
                     return
 
             except queue.Empty:
-                pass
+                break
+
+        # The engine is idle while the player deliberates: play the likely votes ahead
+        if self.engine.phase == "JourVote" and not self._bg_loading and self._speculated_day != self.engine.day_count:
+            self._speculated_day = self.engine.day_count
+            try:
+                self._speculator = start_speculation(self.engine)
+            except Exception as e:
+                print(f"⚠️  Speculation unavailable: {e}")
+                self._speculator = None
 
         # Track discussion phase duration
         if self.engine.phase == "JourDiscussion":
@@ -706,7 +883,8 @@ class GameScreen(Screen):
                 self._speak_event(ev)
         
         # After finishing displaying all messages for the current phase, automatically advance to the next phase if applicable (e.g. from discussion to vote, or advancing the night phase). This allows for a smoother flow without needing the player to click "Continue" after every single message, while still giving them time to read the messages before transitioning.
-        elif self._auto_advance_armed and not self.pending_events and not self._message_generator:
+        # (never while the engine is still generating the rest of a streamed batch)
+        elif self._auto_advance_armed and not self.pending_events and not self._message_generator and not self._bg_loading:
             self._auto_advance_armed = False
             self._msg_timer = 0.0  # reset for next batch of messages
 
@@ -726,7 +904,7 @@ class GameScreen(Screen):
 
             # Auto-advance night phase: only for local engines that support streaming discussion, since for API-based engines we will have already called advance() in the background and enqueued the resulting messages, so we don't want to call advance() again here (which would cause duplicate messages and potentially break the flow). For local engines with streaming support, we can call advance() directly here to get the next batch of messages for the night phase without blocking the UI.
             if self.engine.phase == "Nuit":
-                if getattr(self.engine, "supports_streaming_discussion", False):
+                if self.engine.supports_streaming_discussion:
                     try:
                         events = self.engine.advance()
                     except Exception as e:
@@ -741,7 +919,7 @@ class GameScreen(Screen):
 
                 # Engines API: thread (no need to call advance() here since we already called it in the background when we finished displaying the messages for the discussion phase, so we just need to wait for those messages to finish displaying and then the update() method will handle the transition to the next phase and display the resulting messages when they come in from the background thread)
                 self.chat.add_message("Système", "Génération…", True, is_system=True)
-                self._start_background_generation(self.engine.advance)
+                self._advance_in_background()
                 return
 
 
@@ -781,16 +959,9 @@ class GameScreen(Screen):
     def _create_message_generator(self):
         while True:
             # 1) Récupérer une liste d'événements depuis l'engine
-            if hasattr(self.engine, "generate_day_discussion"):
-                events = self.engine.generate_day_discussion()
+            events = self.engine.generate_day_discussion()
 
-            elif hasattr(self.engine, "_generate_day_discussion"):
-                events = self.engine._generate_day_discussion()
-
-            else:
-                events = []
-
-            # Secure check in case the engine doesn't implement the expected method or returns None
+            # Stop when the engine has no discussion to offer (e.g. no dialogue backend)
             if not events:
                 return
 
@@ -798,6 +969,32 @@ class GameScreen(Screen):
             for ev in events:
                 yield ev
 
+    # Releases the engine's resources in the background (network calls must not freeze the UI)
+    def _end_engine_session(self):
+        if self._speculator is not None:
+            self._speculator.cancel()
+            self._speculator = None
+        if self._branch is not None:
+            self._branch.cancelled = True
+            self._branch = None
+        threading.Thread(target=self.engine.shutdown, daemon=True).start()
+
+    # Saves the game in the background (only while the engine is idle: a night
+    # decision still running is skipped, the game is saved again once it is resolved)
+    def _autosave(self):
+        if self._bg_loading or self._api_fail_active or self.engine.night.in_progress():
+            return
+        try:
+            snapshot.save_async(self.engine)
+        except Exception as e:
+            print(f"⚠️  Sauvegarde impossible : {e}")
+
+    # Puts the saved public chat back in the chat box
+    def _show_resumed_game(self):
+        self.chat.add_message("Système", f"Partie reprise : Jour {self.engine.day_count}.", True, is_system=True)
+        for speaker, text in self.engine.public_chat_history:
+            self.chat.add_message(speaker, text, True)
+
     # Updates the game state
     def _check_game_over(self):
         winner = self.engine.get_winner()
@@ -808,6 +1005,10 @@ class GameScreen(Screen):
         wolves = self.engine.all_wolves_names()
         found = self.engine.found_wolves_list()
 
+        # The game is over: release the mode's resources (e.g. the Ollama model)
+        self._end_engine_session()
+        snapshot.discard()
+
         if winner == "village":
             self.app.set_screen(VictoryScreen(self.app, self.num_players, wolves, found, self.engine_cls))
             return True
@@ -870,7 +1071,7 @@ class GameScreen(Screen):
 
     # Handles vote button clicks
     def _on_vote_clicked(self, idx: int):
-        events = self.engine.cast_vote(idx)
+        events = self._cast_vote(idx)
 
         # Enqueue resulting events
         self._enqueue_events(events)
@@ -919,6 +1120,9 @@ class GameScreen(Screen):
 
             if self.quit_btn_confirm.handle_event(event):
                 tts_helper.disable_and_stop()
+                self._sync_notes_back_to_engine()
+                self._autosave()
+                self._end_engine_session()
                 from gui.screens import SetupScreen
                 self.app.set_screen(SetupScreen(self.app))
                 return
@@ -962,15 +1166,15 @@ class GameScreen(Screen):
                     self.chat.add_message(ev.name_ia, ev.text, ev.show_name_ia)
 
                 # Advance the game phase and get resulting events. For engines that support streaming discussion, we can call advance() directly to get the next batch of messages for the new phase. For API-based engines that don't support streaming, we need to call advance() in a background thread to avoid blocking the UI while waiting for the engine to generate the messages for the new phase.
-                if getattr(self.engine, "supports_streaming_discussion", False):
+                if self.engine.supports_streaming_discussion:
                     self._enqueue_events(self.engine.advance())
                 else:
                     self.chat.add_message("Système", "Génération…", True, is_system=True)
-                    self._start_background_generation(self.engine.advance)
+                    self._advance_in_background()
 
                 
                 # Recreate generator if we just started a new day
-                if self.engine.phase == "JourDiscussion" and getattr(self.engine, "supports_streaming_discussion", False):
+                if self.engine.phase == "JourDiscussion" and self.engine.supports_streaming_discussion:
                     self._message_generator = self._create_message_generator()
                     self._discussion_end_message_shown = False
                 else:
@@ -989,13 +1193,14 @@ class GameScreen(Screen):
         else:
             if self.confirm_btn.handle_event(event):
                 if self.selected_vote_idx is not None:
-                    events = self.engine.cast_vote(self.selected_vote_idx)
+                    events = self._cast_vote(self.selected_vote_idx)
                     self._enqueue_events(events)
 
                     self._refresh_ui_players_from_engine()
                     self._update_controls()
                     if self._check_game_over():
                         return
+                    self._autosave()
                 return 
 
         # Handle SPACE for phase toggle (debug)
@@ -1394,13 +1599,9 @@ class OllamaErrorScreen(Screen):
 
         # Functions from ollama_installer module (injected for easier testing/mocking)
         from game.ollama_installer import (
-            is_ollama_running,
-            has_model,
             open_ollama_download,
             pull_model_async,
         )
-        self._is_ollama_running = is_ollama_running
-        self._has_model = has_model
         self._open_ollama_download = open_ollama_download
         self._pull_model_async = pull_model_async
 
@@ -1409,24 +1610,24 @@ class OllamaErrorScreen(Screen):
         self.model_name = "mistral"
         self.is_downloading = False
 
-        # Checker thread state
+        # Availability read from the shared service monitor (probed in the background)
         self._ollama_ok = False
         self._model_ok = False
-        self._stop_checker = False
-        self._checker_thread = None
-        self._start_checker_thread()
+        self.monitor = get_service_monitor()
+        self.monitor.refresh("ollama")
 
         # Dots animation for download status
         self._dots_t = 0.0
         self._dots = ""
 
-        # Lock to prevent status text updates during critical operations (like starting a download), to avoid overwriting important messages with automatic status updates from the checker thread. When locked, the checker thread will not update the status text, allowing us to show specific messages related to the current operation without them being overwritten by the periodic checks.
+        # Lock to prevent status text updates during critical operations (like starting a download), to avoid overwriting important messages with automatic status updates from the service monitor. When locked, the service monitor will not update the status text, allowing us to show specific messages related to the current operation without them being overwritten by the periodic checks.
         self._status_lock = False
         self._status_lock_timer = 0.0
 
         # Progress tracking for model download (if needed in the future, currently we just show an indeterminate "Downloading..." status without progress percentage, but this can be extended to show actual progress if the pull_model_async function provides that information through callbacks or a progress object). For now, we just have a placeholder for progress tracking in case we want to implement it later.
         self.progress = None
         self.last_status_line = ""
+        self._pull_handle = None
 
         # Flag to block quitting the screen while a critical operation is in progress (like downloading the model), to prevent the user from accidentally leaving the screen and interrupting the operation. When True, we can ignore quit events or show a confirmation dialog if the user tries to leave while an important operation is still ongoing.
         self.block_quit = False
@@ -1468,37 +1669,25 @@ class OllamaErrorScreen(Screen):
         # Initial refresh (so pull button can be disabled immediately)
         self._refresh_availability()
 
-    # Helper to set status text with optional lock to prevent overwriting by checker thread. This allows us to show specific messages related to the current operation (like "Downloading...") without them being overwritten by the periodic status updates from the checker thread, which could cause confusion if they overwrite important messages with more generic status updates.
+    # Helper to set status text with optional lock to prevent overwriting by checker thread. This allows us to show specific messages related to the current operation (like "Downloading...") without them being overwritten by the periodic status updates from the service monitor, which could cause confusion if they overwrite important messages with more generic status updates.
     def _set_status(self, text: str, lock_seconds: float = 0.0):
         self.status_text = text
         if lock_seconds > 0:
             self._status_lock = True
             self._status_lock_timer = lock_seconds
 
-    # Starts a background thread that periodically checks if Ollama is running and if the required model is available, updating the internal state accordingly. This allows us to keep the UI responsive and automatically update the availability status without blocking the main thread, especially since checking for Ollama and the model might involve some I/O or take a bit of time.
-    def _start_checker_thread(self):
-        def loop():
-            while not self._stop_checker:
-                try:
-                    ollama_ok = self._is_ollama_running()
-                    model_ok = self._has_model("mistral") if ollama_ok else False
-
-                    self._ollama_ok = ollama_ok
-                    self._model_ok = model_ok
-                except Exception:
-                    self._ollama_ok = False
-                    self._model_ok = False
+    # Reads the last Ollama probe of the service monitor (never blocks on the network)
+    def _read_status(self):
+        status = self.monitor.status("ollama")
+        details = status.details if status is not None else {}
+        self._ollama_ok = bool(details.get("running"))
+        self._model_ok = bool(details.get("model"))
 
-                time.sleep(0.6)
-
-        import time
-        self._checker_thread = threading.Thread(target=loop, daemon=True)
-        self._checker_thread.start()
-
-    # Helper to refresh the availability status of Ollama and the model, enabling/disabling buttons accordingly. This is called periodically by the checker thread to update the UI based on the current availability of Ollama and the model, allowing us to enable or disable the "Download Model" button depending on whether Ollama is running and whether the model is already installed, and to show appropriate status messages to guide the user on what they need to do.
+    # Helper to refresh the availability status of Ollama and the model, enabling/disabling buttons accordingly. This reads the last probe of the service monitor to update the UI based on the current availability of Ollama and the model, allowing us to enable or disable the "Download Model" button depending on whether Ollama is running and whether the model is already installed, and to show appropriate status messages to guide the user on what they need to do.
     def _refresh_availability(self):
-        ollama_ok = self._is_ollama_running()
-        model_ok = self._has_model("mistral") if ollama_ok else False
+        self._read_status()
+        ollama_ok = self._ollama_ok
+        model_ok = self._model_ok
 
         # Enable/disable pull button depending on availability
         self.pull_model_btn.enabled = (ollama_ok and not model_ok and not self.is_downloading)
@@ -1512,17 +1701,13 @@ class OllamaErrorScreen(Screen):
             if model_ok and not self.is_downloading:
                 self.status_text = "Ollama est prêt. Cliquez sur Réessayer."
 
-    # Cleanup when quitting the screen, including stopping the checker thread and optionally removing the model if a download was in progress, to ensure we don't leave a broken state if the user tries to quit while we're still downloading the model. This allows us to clean up any background threads and potentially remove partially downloaded models to avoid leaving the user's system in a broken state if they exit during a critical operation.
+    # Cleanup when quitting the screen: a download in progress is cancelled. Ollama keeps the layers already downloaded (the model is only registered once complete), so the next download resumes instead of starting over.
     def on_quit(self):
-        if getattr(self, "is_downloading", False):
-            try:
-                from game.ollama_installer import rm_model_async
-                print("[QUIT] Download in progress -> removing model to cleanup...")
-                rm_model_async(self.model_name)
-            except Exception as e:
-                print(f"[QUIT] Cleanup failed: {e}")
+        if getattr(self, "is_downloading", False) and self._pull_handle is not None:
+            print("[QUIT] Download in progress -> cancelling (the next pull resumes it)...")
+            self._pull_handle.cancel()
 
-    # Updates the screen, including handling status lock timing and updating button states based on current availability and downloading status. This is called every frame to update the UI, allowing us to manage the timing of status messages (like showing "Downloading..." for a certain duration without it being overwritten by the checker thread), and to enable or disable buttons based on whether Ollama is running, whether the model is available, and whether a download is currently in progress.
+    # Updates the screen, including handling status lock timing and updating button states based on current availability and downloading status. This is called every frame to update the UI, allowing us to manage the timing of status messages (like showing "Downloading..." for a certain duration without it being overwritten by the service monitor), and to enable or disable buttons based on whether Ollama is running, whether the model is available, and whether a download is currently in progress.
     def update(self, dt: float):
         # Update status lock timer
         if self._status_lock:
@@ -1530,7 +1715,8 @@ class OllamaErrorScreen(Screen):
             if self._status_lock_timer <= 0:
                 self._status_lock = False
 
-        # Update availability status from checker thread
+        # Update availability status from the service monitor
+        self._read_status()
         disabled = self.is_downloading
         self.install_btn.enabled = not disabled
         self.pull_model_btn.enabled = not disabled and self._ollama_ok and not self._model_ok
@@ -1546,7 +1732,7 @@ class OllamaErrorScreen(Screen):
                 if len(self._dots) > 3:
                     self._dots = ""
 
-        # Update status text based on current availability and downloading status, but only if not locked by a critical operation (like starting a download), to avoid overwriting important messages with automatic status updates from the checker thread. This allows us to show specific messages related to the current operation without them being overwritten by the periodic checks, while still providing helpful status updates when not in the middle of an important operation.
+        # Update status text based on current availability and downloading status, but only if not locked by a critical operation (like starting a download), to avoid overwriting important messages with automatic status updates from the service monitor. This allows us to show specific messages related to the current operation without them being overwritten by the periodic checks, while still providing helpful status updates when not in the middle of an important operation.
         if not self._ollama_ok:
             if "téléchargement" not in self.status_text.lower():
                 self.status_text = "Ollama n'est pas lancé."
@@ -1576,7 +1762,7 @@ class OllamaErrorScreen(Screen):
 
         # Start model download if button clicked, with appropriate checks and status updates. This initiates the model download process when the user clicks the "Download Model" button, but only if Ollama is running and the model is not already available, and it provides status updates to inform the user about the progress of the download, while also blocking certain interactions during the download to prevent interruptions.
         if self.pull_model_btn.handle_event(event):
-            if not self._is_ollama_running():
+            if not self._ollama_ok:
                 self.status_text = "Ollama n'est pas lancé."
                 return
 
@@ -1593,6 +1779,7 @@ class OllamaErrorScreen(Screen):
                 self.block_quit = False
                 self.pull_model_btn.text = "Télécharger Mistral (~4 Go)"
                 self.status_text = "Modèle téléchargé. Cliquez sur Réessayer."
+                self.monitor.refresh("ollama")
 
             # Handle errors during the download process, updating the status text and resetting the downloading state to allow the user to try again or take other actions. This ensures that if something goes wrong during the download (like a network error, insufficient disk space, or an issue with Ollama), we can inform the user about the error and allow them to recover without leaving them stuck in a broken state.
             def error(msg):
@@ -1610,20 +1797,19 @@ class OllamaErrorScreen(Screen):
                 self.last_status_line = line[:60]
 
             # Start the asynchronous model download process with the defined callbacks for completion, error handling, progress updates, and status updates. This initiates the download in the background and allows us to update the UI based on the progress and status of the download through the provided callbacks, giving the user feedback on what's happening during the download process.
-            self._pull_model_async("mistral", on_done=done, on_error=error, on_progress=on_progress, on_status=on_status)
+            self._pull_handle = self._pull_model_async("mistral", on_done=done, on_error=error, on_progress=on_progress, on_status=on_status)
             return
 
         # Handle retry button click, checking if Ollama and the model are now available, and transitioning back to the previous screen if they are, or showing an updated status message if they're still not available. This allows the user to easily check if they've resolved the issues (like starting Ollama or completing the model download) and to proceed once everything is ready, while also providing feedback if they still need to take action.
         if self.retry_btn.handle_event(event):
             if self._ollama_ok and self._model_ok:
-                self._stop_checker = True
                 self.app.set_screen(self.previous_screen)
             else:
+                self.monitor.refresh("ollama")
                 self.status_text = "Toujours indisponible : lance Ollama et/ou installe Mistral."
             return
 
         if self.return_btn.handle_event(event):
-            self._stop_checker = True
             from gui.screens import SetupScreen
             self.app.set_screen(SetupScreen(self.app))
             return
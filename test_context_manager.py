@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests des canaux de visibilité du contexte (game/context_manager.py), sans appel à l'API
+"""
+
+from game.context_manager import GameContextManager
+
+
+def _context():
+    ctx = GameContextManager()
+    ctx.set_player_role("Alice", "villageois")
+    ctx.set_player_role("Gérard", "loup")
+    ctx.add_global_context({"type": "dialogue", "content": "Alice dit: \"Bonjour\""})
+    ctx.add_global_context({"type": "night_action", "content": "Les loups visent Alice"})
+    ctx.add_player_context("Alice", {"type": "thought", "content": "Gérard est louche"})
+    ctx.add_wolves_context("Plan : accuser Bob")
+    ctx.add_global_context("Début du Jour 2")
+    return ctx
+
+
+def test_player_views_follow_the_channels():
+    ctx = _context()
+    assert ctx.get_full_global_player_context("Alice").split("\n") == [
+        "[DIALOGUE] Alice dit: \"Bonjour\"",
+        "[THOUGHT] Gérard est louche",
+        "Début du Jour 2",
+    ]
+    assert ctx.get_full_global_player_context("Gérard").split("\n") == [
+        "[DIALOGUE] Alice dit: \"Bonjour\"",
+        "[NIGHT_ACTION] Les loups visent Alice",
+        "Plan : accuser Bob",
+        "Début du Jour 2",
+    ]
+    assert ctx.get_player_context("Gérard") == ""
+
+
+def test_global_context_merges_public_and_wolves_in_order():
+    ctx = _context()
+    elements = list(ctx.iter_global_context())
+    assert [e.id for e in elements] == [0, 1, 3, 4]
+    assert [e.type for e in elements] == ["dialogue", "night_action", "", ""]
+    assert [e.content for e in ctx.iter_player_context("Alice")] == ["Gérard est louche"]
+
+
+def test_snapshot_round_trip_keeps_every_channel():
+    ctx = _context()
+    restored = GameContextManager()
+    restored.restore_state(ctx.snapshot_state())
+    for name in ("Alice", "Gérard", "Bob"):
+        assert restored.get_full_global_player_context(name) == ctx.get_full_global_player_context(name)
+
+    # interned types and strings keep working after the restore
+    restored.add_global_context({"type": "dialogue", "content": "Alice dit: \"Bonjour\""})
+    assert restored.get_global_context().endswith("[DIALOGUE] Alice dit: \"Bonjour\"")
+    assert restored.contextelementscounter == 6
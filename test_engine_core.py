@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de la machine à états commune des moteurs (game/engine_core.py), sur le mode algorithmique
+"""
+
+import pytest
+
+from game.engine_core import DialogueBackend
+from game.engine_default import GameEngine
+
+
+def test_dialogue_backend_must_implement_generate():
+    class Incomplete(DialogueBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_phases_follow_the_day_vote_night_cycle():
+    engine = GameEngine(8, seed=4)
+    events = engine.start_day()
+    assert engine.phase == "JourDiscussion"
+    assert events[0].text == "Début du Jour 1."
+
+    # no vote on day 1
+    engine.advance()
+    assert engine.phase == "Nuit"
+    engine.advance()
+    assert (engine.phase, engine.day_count) == ("JourDiscussion", 2)
+
+    engine.advance()
+    assert engine.phase == "JourVote"
+    target = engine.alive_indexes()[0]
+    engine.cast_vote(target)
+    assert engine.phase == "Nuit"
+    assert not engine.players[target].alive
+
+
+def test_cast_vote_ignores_invalid_targets():
+    engine = GameEngine(6, seed=1)
+    engine.start_day()
+    assert engine.cast_vote(0) == []  # not the vote phase
+
+    engine.advance()
+    engine.advance()
+    engine.advance()
+    dead = next(i for i, p in enumerate(engine.players) if not p.alive)
+    assert engine.cast_vote(dead) == []
+    assert engine.cast_vote(len(engine.players)) == []
+    assert engine.phase == "JourVote"
+
+
+def test_seeded_games_are_reproducible():
+    def play(seed):
+        engine = GameEngine(9, seed=seed)
+        texts = [ev.text for ev in engine.start_day()]
+        while engine.get_winner() is None:
+            if engine.phase == "JourVote":
+                texts += [ev.text for ev in engine.cast_vote(engine.alive_indexes()[0])]
+            else:
+                texts += [ev.text for ev in engine.advance()]
+        return texts, engine.get_winner()
+
+    assert play(11) == play(11)
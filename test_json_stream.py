@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de la lecture tolérante des réponses JSON des agents (ai/json_stream.py)
+"""
+
+from ai.json_stream import StreamingFieldParser, repair_json_object
+
+ANSWER = '```json\n{"action": "accuse", "reasoning": "Il dit \\"rien\\"", "votes": [1, {"a": "}"}], "dialogue": "Bob ment !", "cible": null}\n```'
+
+
+def test_fields_are_complete_chunk_by_chunk():
+    parser = StreamingFieldParser(("action", "reasoning", "dialogue"))
+    done_at = None
+    for i, ch in enumerate(ANSWER):
+        if parser.feed(ch) and done_at is None:
+            done_at = i
+
+    # complete as soon as "dialogue" closes, before the end of the object
+    assert done_at == ANSWER.index('"Bob ment !"') + len('"Bob ment !"') - 1
+    assert parser.fields == {
+        "action": "accuse",
+        "reasoning": 'Il dit "rien"',
+        "votes": [1, {"a": "}"}],
+        "dialogue": "Bob ment !",
+        "cible": None,
+    }
+    assert parser.closed
+
+
+def test_numbers_and_literals():
+    parser = StreamingFieldParser(("x",))
+    parser.feed('{"n": 12, "ok": true, "x": -1.5}')
+    assert parser.fields == {"n": 12, "ok": True, "x": -1.5}
+    assert parser.closed and parser.complete
+
+
+def test_repair_near_miss_outputs():
+    assert repair_json_object('Voici : {"action": "hedge",}') == {"action": "hedge"}
+    assert repair_json_object("{“action”: “agree”}") == {"action": "agree"}
+    assert repair_json_object('{"action": "accuse", "dialogue": "Bob est lou') == {
+        "action": "accuse",
+        "dialogue": "Bob est lou",
+    }
+    assert repair_json_object('{"items": [1, 2') == {"items": [1, 2]}
+    assert repair_json_object("pas de JSON ici") is None
+    assert repair_json_object(ANSWER)["dialogue"] == "Bob ment !"
+
+
+def test_repair_keeps_typographic_quotes_inside_strings():
+    valid = '{"action":"accuse","dialogue":"Il a dit “non”, l’idiot"}'
+    assert repair_json_object(valid)["dialogue"] == "Il a dit “non”, l’idiot"
+
+    batch = '```json\n{"messages": [{"name": "Bob", "text": "“Alice” ment"}, {"name": "Alice", "text": "Non"}]}\n```'
+    messages = repair_json_object(batch)["messages"]
+    assert [m["text"] for m in messages] == ["“Alice” ment", "Non"]
+
+    # delimiters written as typographic quotes, with quotes inside the values
+    assert repair_json_object('{“dialogue”: “Il a dit “non” et "oui"”,}') == {"dialogue": 'Il a dit “non” et "oui"'}
+    assert repair_json_object('{"dialogue": "Il a dit “non') == {"dialogue": "Il a dit “non"}
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de l'index des noms de joueurs (ai/name_index.py)
+"""
+
+from ai.name_index import NameIndex, normalize_name
+from game.roster import PlayerRoster
+from game.structure_ai import Player
+
+
+def test_index_of_tolerates_generated_spellings():
+    roster = PlayerRoster([Player(n, "villageois") for n in ("Gérard", "Alice", "Bob", "Chloé", "David")])
+    assert roster.index_of("Chloé") == 3
+    assert roster.index_of("**chloe**") == 3
+    assert roster.index_of("Gerard.") == 0
+    assert roster.index_of("Davdi") == 4
+    assert roster.index_of("Zoé") is None
+
+
+def test_name_index():
+    names = NameIndex(["Gérard", "Alice", "Alice"])
+    assert names.names == ["Gérard", "Alice"]
+    assert normalize_name("  **Gérard** ") == "gerard"
+    assert "GERARD" in names
+    assert "Gerrard" not in names  # membership never guesses
+    assert names.resolve("Gerrard") == "Gérard"
+    assert names.resolve("Gerrard", fuzzy=False) is None
+    assert names.resolve("") is None
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du téléchargement des modèles Ollama (game/ollama_installer.py), sans serveur Ollama
+"""
+
+import json
+
+import pytest
+import requests
+
+from game import ollama_installer
+
+
+class _Response:
+    def __init__(self, lines, status_code=200):
+        self.status_code = status_code
+        self.text = ""
+        self.closed = False
+        self._lines = [json.dumps(line).encode("utf-8") for line in lines]
+
+    def iter_lines(self):
+        return iter(self._lines)
+
+    def close(self):
+        self.closed = True
+
+
+_SUCCESS = [
+    {"status": "pulling manifest"},
+    {"status": "pulling abc", "digest": "sha256:abc", "total": 100, "completed": 40},
+    {"status": "pulling abc", "digest": "sha256:abc", "total": 100, "completed": 100},
+    {"status": "success"},
+]
+
+
+# Pulls with /api/pull answered by `answers` in turn (a response, or an exception to raise)
+def _pull(monkeypatch, answers, retries=3):
+    calls = []
+
+    def post(url, **kwargs):
+        calls.append(url)
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(ollama_installer.requests, "post", post)
+    monkeypatch.setattr(ollama_installer.time, "sleep", lambda seconds: None)
+    result = {"done": False, "error": None, "progress": []}
+    handle = ollama_installer.pull_model_async(
+        "mistral",
+        on_done=lambda: result.update(done=True),
+        on_error=lambda msg: result.update(error=msg),
+        on_update=result["progress"].append,
+        retries=retries,
+    )
+    assert handle.join(5)
+    return result, calls
+
+
+def test_pull_reports_progress_until_success(monkeypatch):
+    result, calls = _pull(monkeypatch, [_Response(_SUCCESS)])
+    assert result["done"] and result["error"] is None
+    assert len(calls) == 1
+    assert [(p.status, p.percent) for p in result["progress"][1:]] == [
+        ("pulling abc", 40), ("pulling abc", 100), ("success", 100)]
+
+
+@pytest.mark.parametrize("failure", [
+    requests.ConnectionError("connexion refusée"),
+    requests.Timeout("délai dépassé"),
+])
+def test_pull_retries_when_the_connection_fails(monkeypatch, failure):
+    result, calls = _pull(monkeypatch, [failure, _Response(_SUCCESS)])
+    assert result["done"] and result["error"] is None
+    assert len(calls) == 2
+
+
+def test_pull_retries_a_stream_cut_before_success(monkeypatch):
+    cut = _Response(_SUCCESS[:2])
+    result, calls = _pull(monkeypatch, [cut, _Response(_SUCCESS)])
+    assert result["done"]
+    assert cut.closed and len(calls) == 2
+
+
+def test_pull_gives_up_after_the_retries(monkeypatch):
+    answers = [requests.ConnectionError("connexion refusée") for _ in range(3)]
+    result, calls = _pull(monkeypatch, answers, retries=2)
+    assert not result["done"]
+    assert "connexion refusée" in result["error"]
+    assert len(calls) == 3
+
+
+def test_pull_http_errors_are_not_retried(monkeypatch):
+    response = _Response([], status_code=500)
+    response.json = lambda: {"error": "modèle inconnu"}
+    result, calls = _pull(monkeypatch, [response])
+    assert result["error"] == "HTTP 500 : modèle inconnu"
+    assert len(calls) == 1
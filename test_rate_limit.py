@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de la régulation des appels aux API (ai/rate_limit.py), sans réseau
+"""
+
+import pytest
+
+from ai.rate_limit import RateLimiter, RateLimitExceeded, call_with_retry
+
+
+class _HttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_learn_spreads_the_remaining_quota_until_the_reset():
+    limiter = RateLimiter(1.0, burst=8)
+    limiter.learn({"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "20"})
+    assert limiter.rate == pytest.approx(0.5)
+    assert limiter.min_rate == pytest.approx(1.0 / 16.0)
+
+    # late in the window with little quota left: the rate drops, it does not climb
+    limiter.learn({"x-ratelimit-limit": "20", "x-ratelimit-remaining": "1", "x-ratelimit-reset": "2"})
+    assert limiter.rate == pytest.approx(0.5)
+    limiter.learn({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "2"})
+    assert limiter.rate == limiter.min_rate
+    assert not limiter.try_acquire()
+
+    # one sample never lowers the floor
+    assert limiter.min_rate == pytest.approx(1.0 / 16.0)
+
+
+def test_learn_caps_the_bucket_and_the_rate():
+    limiter = RateLimiter(1.0, burst=8)
+    limiter.learn({"x-ratelimit-remaining": "1000", "x-ratelimit-reset": "1"})
+    assert limiter.rate == limiter.max_rate
+
+    limiter.learn({"x-ratelimit-remaining": "1"})
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+    limiter.learn({})  # no headers: unchanged
+    assert limiter.rate == limiter.max_rate
+
+
+def test_aimd():
+    limiter = RateLimiter(2.0)
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(1.0)
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(1.0 + limiter.min_rate / 4.0)
+
+
+def test_call_with_retry_retries_transient_errors_only():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _HttpError(503)
+        return "ok"
+
+    assert call_with_retry(flaky, max_retries=3, base_delay=0.0) == "ok"
+    assert len(calls) == 3
+
+    def broken():
+        raise _HttpError(400)
+
+    with pytest.raises(_HttpError):
+        call_with_retry(broken, max_retries=3, base_delay=0.0)
+
+
+def test_call_with_retry_gives_up_on_persistent_throttling():
+    def throttled():
+        raise _HttpError(429)
+
+    with pytest.raises(RateLimitExceeded):
+        call_with_retry(throttled, max_retries=1, base_delay=0.0)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du journal de partie et de son rejeu (game/replay.py), sur le mode algorithmique
+"""
+
+import dataclasses
+
+import pytest
+
+from ai.journal import get_journal
+from config import JournalConfig
+from game import replay
+from game.engine_default import GameEngine
+
+
+# Plays a whole seeded game with the journal written to `path`, voting for the
+# first alive player; returns the engine once the journal is closed
+def _record_game(path, digests, seed=5, before_call=None):
+    config = JournalConfig(path=path, max_bytes=1024 * 1024, backups=1, capacity=10000,
+                           policy="block", fsync_interval=1.0, digests=digests)
+    get_journal(config)
+    try:
+        engine = GameEngine(8, seed=seed)
+        engine.start_day()
+        while engine.get_winner() is None:
+            if before_call is not None:
+                before_call(engine)
+            if engine.phase == "JourVote":
+                engine.cast_vote(engine.alive_indexes()[0])
+            else:
+                engine.advance()
+    finally:
+        get_journal(dataclasses.replace(config, path=""))
+    return engine
+
+
+def test_state_digests_are_opt_in(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    _record_game(path, digests=False)
+    assert not [r for r in replay.read_records(path) if r["kind"] == "state"]
+
+    game = replay.load_game(path)
+    assert game.calls and all(d is None for d in game.digests)
+    # without digests the replay still compares the published events
+    assert replay.replay(game).identical
+
+
+def test_replay_matches_the_recorded_game(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    engine = _record_game(path, digests=True)
+
+    game = replay.load_game(path)
+    assert (game.mode, game.seed) == ("game.engine_default", engine.seed)
+    assert any(d is not None for d in game.digests)
+
+    result = replay.replay(game)
+    assert result.identical, result.mismatches
+    assert result.engine.state_digest() == engine.state_digest()
+
+
+def test_player_notes_do_not_break_the_replay(tmp_path):
+    # the player annotates suspects between the calls, as the interface does
+    def annotate(engine):
+        for n, i in enumerate(engine.alive_indexes()):
+            engine.players[i].note = (n + engine.day_count) % 4
+
+    path = str(tmp_path / "journal.jsonl")
+    engine = _record_game(path, digests=True, before_call=annotate)
+    assert any(p.note for p in engine.players)
+
+    result = replay.replay(replay.load_game(path))
+    assert result.identical, result.mismatches
+    assert not any(p.note for p in result.engine.players)
+
+
+def test_replay_reports_a_divergent_game(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    _record_game(path, digests=True)
+    game = replay.load_game(path)
+    game.events[-1] = ("Système", "autre fin")
+    assert not replay.replay(game).identical
+
+
+def test_load_game_without_games(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text("")
+    with pytest.raises(replay.ReplayError):
+        replay.load_game(str(path))
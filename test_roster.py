@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du suivi des joueurs vivants et des rôles (game/roster.py)
+"""
+
+from game.roster import PlayerRoster
+from game.structure_ai import Player
+
+
+def _players():
+    return [
+        Player("Gérard", "loup"),
+        Player("Alice", "villageois"),
+        Player("Bob", "villageois"),
+        Player("Chloé", "loup"),
+        Player("David", "villageois"),
+        Player("Emma", "villageois"),
+    ]
+
+
+def test_roster_tracks_deaths_and_winner():
+    roster = PlayerRoster(_players())
+    assert roster.alive_wolf_indexes() == [0, 3]
+    assert roster.alive_villager_indexes() == [1, 2, 4, 5]
+    assert roster.winner() is None
+
+    roster.kill(1)
+    roster.kill(2)
+    assert not roster.is_alive(1)
+    assert roster.alive_indexes() == [0, 3, 4, 5]
+    assert roster.alive_villagers_count == 2
+    assert roster.winner() == "loups"
+
+    roster.kill(0)
+    roster.kill(3)
+    assert roster.winner() == "village"
+    assert roster.all_wolves_names() == ["Gérard", "Chloé"]
+
+
+def test_kill_resets_the_note():
+    players = _players()
+    players[4].note = 3
+    roster = PlayerRoster(players)
+    roster.kill(4)
+    assert players[4].alive is False and players[4].note == 0
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests des tirages pondérés (tables cumulées) de ai/rules.py
+"""
+
+import random
+
+from ai.rules import TargetSampler, WeightedSampler, pick_target_weighted
+from ai.suspicion import MessageAnalysis, SuspicionMatrix
+
+
+# Former linear scan of pick_target_weighted (reference)
+def _linear_pick(rng, weights, candidates):
+    total = sum(max(0.0, weights.get(c, 0.0)) for c in candidates)
+    if total <= 1e-9:
+        return rng.choice(candidates) if candidates else None
+    r = rng.random() * total
+    acc = 0.0
+    for c in candidates:
+        acc += max(0.0, weights.get(c, 0.0))
+        if r <= acc:
+            return c
+    return candidates[-1]
+
+
+def test_weighted_sampler_matches_rng_choices():
+    """Un tirage consomme le rng comme rng.choices(items, weights)[0]"""
+    items, weights = ["accuse", "question", "hedge"], [0.5, 0.2, 0.3]
+    sampler = WeightedSampler(items, weights)
+    a, b = random.Random(7), random.Random(7)
+    for _ in range(500):
+        assert sampler.draw(a) == b.choices(items, weights)[0]
+
+
+def test_target_sampler_matches_linear_scan():
+    candidates = ["Alice", "Bob", "Chloé", "David"]
+    weights = {"Alice": 0.4, "Bob": -1.0, "Chloé": 2.5, "David": 0.0}
+    sampler = TargetSampler(weights, candidates)
+    a, b = random.Random(3), random.Random(3)
+    for _ in range(500):
+        assert sampler.draw(a) == _linear_pick(b, weights, candidates)
+
+
+def test_target_sampler_without_suspicion_picks_uniformly():
+    candidates = ["Alice", "Bob"]
+    a, b = random.Random(1), random.Random(1)
+    for _ in range(50):
+        assert pick_target_weighted(a, {}, candidates) == b.choice(candidates)
+    assert TargetSampler({}, []).draw(random.Random(0)) is None
+
+
+def test_target_sampler_reads_matrix_rows_like_dicts():
+    names = ["Alice", "Bob", "Chloé"]
+    matrix = SuspicionMatrix(names)
+    matrix.observe(MessageAnalysis("Bob", True, frozenset({"Chloé"})))
+    row = matrix.row("Alice")
+
+    a, b = random.Random(5), random.Random(5)
+    from_row = TargetSampler(row, ["Bob", "Chloé"])
+    from_dict = TargetSampler(dict(row), ["Bob", "Chloé"])
+    assert [from_row.draw(a) for _ in range(100)] == [from_dict.draw(b) for _ in range(100)]
+
+
+def test_matrix_rows_reuse_the_sampler_until_the_next_message():
+    names = ["Alice", "Bob", "Chloé"]
+    matrix = SuspicionMatrix(names)
+    matrix.observe(MessageAnalysis("Bob", True, frozenset({"Chloé"})))
+    row = matrix.row("Alice")
+
+    built = []
+    def build():
+        built.append(1)
+        return TargetSampler(row, ["Bob", "Chloé"])
+
+    first = row.cached("targets", build)
+    assert row.cached("targets", build) is first and len(built) == 1
+
+    matrix.observe(MessageAnalysis("Chloé", False, frozenset({"Bob"})))
+    assert row.cached("targets", build) is not first and len(built) == 2
+
+    # the cached sampler draws like a new one
+    a, b = random.Random(9), random.Random(9)
+    for _ in range(50):
+        assert pick_target_weighted(a, row, ["Bob", "Chloé"]) == TargetSampler(dict(row), ["Bob", "Chloé"]).draw(b)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de la sauvegarde de partie (game/snapshot.py) : format binaire et reprise à chaque phase
+"""
+
+import pickle
+import zlib
+
+import pytest
+
+from game import snapshot
+from game.engine_default import GameEngine
+
+
+# Saves and restores through the file format, as a resumed game would
+def _round_trip(engine):
+    return snapshot.restore(snapshot.decode(snapshot.encode(snapshot.capture(engine))))
+
+
+# Plays both engines to the end of the game, checking they publish the same events
+def _assert_same_game(engine, restored):
+    assert restored.state_digest() == engine.state_digest()
+    for _ in range(40):
+        if engine.get_winner() is not None:
+            break
+        if engine.phase == "JourVote":
+            target = engine.alive_indexes()[0]
+            expected, events = engine.cast_vote(target), restored.cast_vote(target)
+        else:
+            expected, events = engine.advance(), restored.advance()
+        assert [(ev.name_ia, ev.text) for ev in events] == [(ev.name_ia, ev.text) for ev in expected]
+        assert restored.state_digest() == engine.state_digest()
+    assert restored.get_winner() == engine.get_winner() is not None
+
+
+def test_encode_decode_round_trip():
+    state = {"engine": "game.engine_default", "game": {"rng": (3, (1, 2), None), "data": b"\x00\xff", "x": [1.5, "é"]}}
+    assert snapshot.decode(snapshot.encode(state)) == state
+
+
+def test_decode_rejects_damaged_files():
+    data = snapshot.encode({"game": {}})
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.decode(data[:5])
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.decode(b"NOTSAV" + data[6:])
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.decode(data[:-1] + bytes([data[-1] ^ 1]))
+
+
+def test_decode_refuses_objects():
+    payload = zlib.compress(pickle.dumps({"game": snapshot.SnapshotError("x")}))
+    data = snapshot._HEADER.pack(snapshot.MAGIC, snapshot.VERSION, zlib.crc32(payload)) + payload
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.decode(data)
+
+
+def test_restore_rejects_unknown_modes():
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.restore({"engine": "os", "game": {}})
+
+
+@pytest.mark.parametrize("steps, phase", [
+    (1, "JourDiscussion"),  # day 1
+    (2, "Nuit"),  # first night
+    (4, "JourVote"),
+    (5, "Nuit"),  # right after the vote, the victim not chosen yet
+    (6, "JourDiscussion"),  # morning after that night
+])
+def test_game_resumed_at_each_phase_continues_identically(steps, phase):
+    engine = GameEngine(8, seed=11)
+    engine.start_day()
+    for _ in range(steps - 1):
+        if engine.phase == "JourVote":
+            engine.cast_vote(engine.alive_indexes()[0])
+        else:
+            engine.advance()
+    assert engine.phase == phase
+    assert not engine.night.in_progress()
+    _assert_same_game(engine, _round_trip(engine))
+
+
+def test_save_file_round_trip(tmp_path):
+    engine = GameEngine(6, seed=2)
+    engine.start_day()
+    path = str(tmp_path / "partie.snap")
+    snapshot.save_async(engine, path).join()
+    assert snapshot.exists(path)
+    _assert_same_game(engine, snapshot.resume(path))
+
+    snapshot.discard(path)
+    assert snapshot.resume(path) is None
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests de la spéculation pendant le vote (game/speculation.py), sur le mode algorithmique
+"""
+
+from game.engine_default import GameEngine
+from game.speculation import Speculator, start_speculation
+
+
+# Seeded game at its first vote (day 2)
+def _engine_at_vote(seed=6):
+    engine = GameEngine(8, seed=seed)
+    engine.start_day()
+    engine.advance()
+    engine.advance()
+    engine.advance()
+    assert engine.phase == "JourVote"
+    return engine
+
+
+def test_speculation_is_opt_in(monkeypatch):
+    monkeypatch.delenv("SPECULATIVE_BRANCHES", raising=False)
+    engine = _engine_at_vote()
+    assert engine.speculative_branches == 0
+    assert start_speculation(engine) is None
+
+    monkeypatch.setenv("SPECULATIVE_BRANCHES", "1")
+    speculator = start_speculation(engine)
+    assert isinstance(speculator, Speculator)
+    assert len(speculator.branches) == 1
+    speculator.cancel()
+
+
+def test_branch_plays_the_same_night_as_the_game():
+    engine = _engine_at_vote()
+    speculator = Speculator(engine, 2)
+    target = next(iter(speculator.branches))
+    branch = speculator.take(target)
+    assert branch is not None and not speculator.branches
+
+    streamed = []
+    rest = branch.collect(streamed.append)
+    branch.adopt()
+
+    engine.cast_vote(target)
+    expected = engine.advance()
+    assert [(ev.name_ia, ev.text) for ev in streamed + rest] == [(ev.name_ia, ev.text) for ev in expected]
+    assert branch.engine.state_digest() == engine.state_digest()